@@ -1,17 +1,234 @@
-def advanced_prediction(stats):
+"""
+Modèle 1X2 vectorisé (forme, xG, avantage du terrain, risque de carton rouge).
+
+    python ai_predictor.py fit [DIR]     ajuste la calibration sur des saisons Understat enregistrées
+
+Le journal des pronostics ne garde ni les colonnes d'entrée ni les probabilités
+brutes : l'ajustement rejoue donc les saisons enregistrées par
+"python xg_store.py ingest --record DIR" (forme et xG d'avant-match, résultat réel)
+et écrit predictor_calibration.json, relu à l'import.
+"""
+import os
+import sys
+import math
+import json
+import datetime
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Colonnes attendues par batch_prediction (une valeur par match)
+COLUMNS = [
+    "home_form", "home_xg", "home_home_adv", "home_red_risk",
+    "away_form", "away_xg", "away_home_adv", "away_red_risk",
+]
+
+# Poids du score linéaire historique
+W_FORM = 0.3
+W_XG = 0.4
+W_HOME_ADV = 0.2
+W_RED_RISK = 0.1
+
+# Effet de l'écart de score sur les buts attendus (log-échelle)
+STRENGTH_EFFECT = 0.35
+MIN_EXPECTED_GOALS = 0.05
+MAX_GOALS = 10
+
+# Calibration : température sur les log-probabilités 1X2 et ajustement des nuls.
+# Neutres tant qu'elles n'ont pas été ajustées sur des matchs soldés (fit_calibration)
+CALIBRATION_FILE = "predictor_calibration.json"
+TEMPERATURE = 1.0
+DRAW_INFLATION = 1.0
+
+# Grille de recherche et minimum de matchs soldés pour l'ajustement
+TEMPERATURE_GRID = np.linspace(0.5, 2.0, 31)
+DRAW_INFLATION_GRID = np.linspace(0.8, 1.5, 29)
+MIN_FIT_SAMPLES = 200
+
+# Rejeu Understat : matchs récents pris en compte et historique minimal par équipe
+FORM_WINDOW = 5
+XG_WINDOW = 10
+MIN_HISTORY = 3
+
+_GOALS = np.arange(MAX_GOALS + 1)
+_LOG_FACTORIALS = np.array([math.lgamma(k + 1) for k in _GOALS])
+
+
+def linear_scores(c: Dict[str, np.ndarray]):
     score_home = (
-        stats["home_form"] * 0.3 +
-        stats["home_xg"] * 0.4 +
-        stats["home_home_adv"] * 0.2 -
-        stats["home_red_risk"] * 0.1
+        c["home_form"] * W_FORM +
+        c["home_xg"] * W_XG +
+        c["home_home_adv"] * W_HOME_ADV -
+        c["home_red_risk"] * W_RED_RISK
     )
 
     score_away = (
-        stats["away_form"] * 0.3 +
-        stats["away_xg"] * 0.4 -
-        stats["away_home_adv"] * 0.2 -
-        stats["away_red_risk"] * 0.1
+        c["away_form"] * W_FORM +
+        c["away_xg"] * W_XG -
+        c["away_home_adv"] * W_HOME_ADV -
+        c["away_red_risk"] * W_RED_RISK
     )
+    return score_home, score_away
+
+
+def poisson_matrix(lam: np.ndarray) -> np.ndarray:
+    """P(k goals) for k in 0..MAX_GOALS, one row per fixture"""
+    log_p = _GOALS[None, :] * np.log(lam)[:, None] - lam[:, None] - _LOG_FACTORIALS[None, :]
+    return np.exp(log_p)
+
+
+def apply_calibration(p: np.ndarray, temperature: float, draw_inflation: float) -> np.ndarray:
+    """Inflate draws, sharpen or flatten with a temperature, renormalize (rows of 1X2)"""
+    p = p * np.array([1.0, draw_inflation, 1.0])
+    p = np.power(np.maximum(p, 1e-12), 1.0 / temperature)
+    return p / p.sum(axis=-1, keepdims=True)
+
+
+def fit_calibration(probabilities: Sequence, outcomes: Sequence[int]) -> Tuple[float, float]:
+    """
+    Temperature and draw inflation minimizing the log-loss of settled fixtures.
+    `probabilities` are uncalibrated 1X2 rows (batch_prediction(..., calibrate=False)),
+    `outcomes` the index of what happened (0 home win, 1 draw, 2 away win).
+    """
+    p = np.asarray(probabilities, dtype=float)
+    y = np.asarray(outcomes, dtype=np.int64)
+    if len(y) < MIN_FIT_SAMPLES:
+        return TEMPERATURE, DRAW_INFLATION
+
+    rows = np.arange(len(y))
+    best = (math.inf, TEMPERATURE, DRAW_INFLATION)
+    for draw_inflation in DRAW_INFLATION_GRID:
+        inflated = p * np.array([1.0, draw_inflation, 1.0])
+        logs = np.log(np.maximum(inflated, 1e-12))
+        for temperature in TEMPERATURE_GRID:
+            scaled = logs / temperature
+            scaled -= scaled.max(axis=1, keepdims=True)
+            log_norm = np.log(np.exp(scaled).sum(axis=1))
+            loss = float(np.mean(log_norm - scaled[rows, y]))
+            if loss < best[0]:
+                best = (loss, float(temperature), float(draw_inflation))
+    return round(best[1], 3), round(best[2], 3)
+
+
+def save_calibration(temperature: float, draw_inflation: float, path: str = CALIBRATION_FILE) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"temperature": temperature, "draw_inflation": draw_inflation}, f)
+
+
+def load_calibration(path: str = CALIBRATION_FILE) -> None:
+    """Use the last fitted parameters, if any"""
+    global TEMPERATURE, DRAW_INFLATION
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        TEMPERATURE = float(data["temperature"])
+        DRAW_INFLATION = float(data["draw_inflation"])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Calibration {path} illisible, paramètres neutres :", e)
+
+
+def batch_prediction(
+    columns: Dict[str, Sequence[float]],
+    temperature: float = None,
+    draw_inflation: float = None,
+    calibrate: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized 1X2 probabilities and expected goals for many fixtures.
+    `columns` maps each name of COLUMNS to one value per fixture.
+    """
+    c = {name: np.asarray(columns[name], dtype=float) for name in COLUMNS}
+    score_home, score_away = linear_scores(c)
+    diff = score_home - score_away
+
+    # Buts attendus : xG de chaque équipe corrigés par l'écart de score
+    home_xg = np.maximum(MIN_EXPECTED_GOALS, c["home_xg"] * np.exp(STRENGTH_EFFECT * diff / 2))
+    away_xg = np.maximum(MIN_EXPECTED_GOALS, c["away_xg"] * np.exp(-STRENGTH_EFFECT * diff / 2))
+
+    # P(dom > ext) = somme_k P(dom = k) * P(ext < k), via les fonctions de répartition
+    ph = poisson_matrix(home_xg)
+    pa = poisson_matrix(away_xg)
+    p = np.stack([
+        (ph[:, 1:] * np.cumsum(pa, axis=1)[:, :-1]).sum(axis=1),
+        (ph * pa).sum(axis=1),
+        (pa[:, 1:] * np.cumsum(ph, axis=1)[:, :-1]).sum(axis=1),
+    ], axis=1)
+
+    if calibrate:
+        p = apply_calibration(
+            p,
+            TEMPERATURE if temperature is None else temperature,
+            DRAW_INFLATION if draw_inflation is None else draw_inflation
+        )
+    else:
+        # Masse au-delà de MAX_GOALS négligée : simple renormalisation
+        p = p / p.sum(axis=1, keepdims=True)
+
+    return {
+        "home_win": p[:, 0],
+        "draw": p[:, 1],
+        "away_win": p[:, 2],
+        "home_xg": home_xg,
+        "away_xg": away_xg,
+        "score_home": score_home,
+        "score_away": score_away,
+    }
+
+
+def log_loss(probabilities: np.ndarray, outcomes: np.ndarray) -> float:
+    rows = np.arange(len(outcomes))
+    return float(-np.mean(np.log(np.maximum(probabilities[rows, outcomes], 1e-12))))
+
+
+def columns_from_understat(matches: Iterable[Dict]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Pre-match COLUMNS and outcome (0 home win, 1 draw, 2 away win) of every played
+    Understat match whose two teams already have MIN_HISTORY matches in the list.
+    Form is the mean points share over FORM_WINDOW matches, xG the mean over XG_WINDOW;
+    red-card risk is unknown in Understat data and left at 0.
+    """
+    played = []
+    for m in matches:
+        try:
+            if m.get("isResult"):
+                played.append((
+                    datetime.datetime.strptime(m["datetime"], "%Y-%m-%d %H:%M:%S"),
+                    m["h"]["title"], m["a"]["title"],
+                    int(m["goals"]["h"]), int(m["goals"]["a"]),
+                    float(m["xG"]["h"]), float(m["xG"]["a"])
+                ))
+        except (KeyError, TypeError, ValueError):
+            continue
+    played.sort(key=lambda r: r[0])
+
+    # équipe -> (points sur 1, xG pour) des derniers matchs
+    history: Dict[str, deque] = {}
+    columns: Dict[str, List[float]] = {name: [] for name in COLUMNS}
+    outcomes = []
+    for _, home, away, goals_h, goals_a, xg_h, xg_a in played:
+        h = history.setdefault(home, deque(maxlen=XG_WINDOW))
+        a = history.setdefault(away, deque(maxlen=XG_WINDOW))
+        if len(h) >= MIN_HISTORY and len(a) >= MIN_HISTORY:
+            for side, past, home_adv in (("home", h, 1.0), ("away", a, 0.0)):
+                recent = list(past)[-FORM_WINDOW:]
+                columns[f"{side}_form"].append(sum(p for p, _ in recent) / len(recent))
+                columns[f"{side}_xg"].append(sum(x for _, x in past) / len(past))
+                columns[f"{side}_home_adv"].append(home_adv)
+                columns[f"{side}_red_risk"].append(0.0)
+            outcomes.append(0 if goals_h > goals_a else 1 if goals_h == goals_a else 2)
+        points_h = 1.0 if goals_h > goals_a else 1 / 3 if goals_h == goals_a else 0.0
+        h.append((points_h, xg_h))
+        a.append((1.0 - points_h if goals_h != goals_a else points_h, xg_a))
+    return {name: np.asarray(v, dtype=float) for name, v in columns.items()}, np.asarray(outcomes, dtype=np.int64)
+
+
+def advanced_prediction(stats):
+    result = batch_prediction({name: [stats[name]] for name in COLUMNS})
+    score_home = result["score_home"][0]
+    score_away = result["score_away"][0]
 
     if score_home > score_away:
         return "Victoire domicile", "2-1"
@@ -19,3 +236,49 @@ def advanced_prediction(stats):
         return "Victoire extérieur", "1-2"
     else:
         return "Match nul", "1-1"
+
+
+load_calibration()
+
+
+def fit_from_recorded(directory: str) -> int:
+    """Fit and save the calibration from recorded Understat seasons; 1 when there is too little data"""
+    from xg_store import SYNTHETIC_SUFFIX, load_recorded
+
+    recorded = load_recorded(directory) if os.path.isdir(directory) else {}
+    # Un échantillon écrit à la main ne doit pas servir à calibrer
+    recorded = {name: m for name, m in recorded.items() if not name.endswith(SYNTHETIC_SUFFIX)}
+    parts = [columns_from_understat(matches) for matches in recorded.values()]
+    parts = [(c, y) for c, y in parts if len(y)]
+    if not parts:
+        print(f"❌ Aucun match exploitable dans {directory}")
+        return 1
+    columns = {name: np.concatenate([c[name] for c, _ in parts]) for name in COLUMNS}
+    outcomes = np.concatenate([y for _, y in parts])
+
+    raw = batch_prediction(columns, calibrate=False)
+    p = np.stack([raw["home_win"], raw["draw"], raw["away_win"]], axis=1)
+    print(f"[INFO] {len(recorded)} saison(s), {len(outcomes)} match(s), log-loss brute {log_loss(p, outcomes):.4f}")
+    if len(outcomes) < MIN_FIT_SAMPLES:
+        print(f"❌ {len(outcomes)} match(s) < {MIN_FIT_SAMPLES}, calibration inchangée")
+        return 1
+
+    temperature, draw_inflation = fit_calibration(p, outcomes)
+    calibrated = apply_calibration(p, temperature, draw_inflation)
+    save_calibration(temperature, draw_inflation)
+    print(f"✅ T={temperature}, nuls x{draw_inflation}, log-loss {log_loss(calibrated, outcomes):.4f} "
+          f"→ {CALIBRATION_FILE}")
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = list(argv if argv is not None else sys.argv[1:])
+    if argv[:1] != ["fit"]:
+        print(__doc__)
+        return 1
+    from xg_store import RECORDED_DIR
+    return fit_from_recorded(argv[1] if len(argv) > 1 else RECORDED_DIR)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+import post_archive
+
+# Limite Telegram pour un message texte
+MAX_MESSAGE_LENGTH = 4096
+
+# Fenêtre de regroupement des alertes (secondes)
+LATENCY_WINDOW = 20
+# Une alerte urgente part seule si rien n'a été envoyé depuis ce délai
+QUIET_PERIOD = 10
+FLUSH_TICK = 1
+
+DIGEST_SEPARATOR = "\n➖➖➖➖➖\n"
+LATENCY_SAMPLES = 1000
+
+
+class PendingAlert:
+    __slots__ = ("text", "submitted_at")
+
+    def __init__(self, text: str, submitted_at: float):
+        self.text = text
+        self.submitted_at = submitted_at
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def digest_groups(texts: List[str], max_length: int = MAX_MESSAGE_LENGTH) -> List[List[int]]:
+    """Indexes of the alerts merged into each digest, in order"""
+    if len(texts) == 1:
+        return [[0]]
+
+    groups = []
+    current = []
+    size = 0
+
+    for i, text in enumerate(texts):
+        length = len(text.strip()[:max_length - 100])
+        added = length + (len(DIGEST_SEPARATOR) if current else 0)
+        if current and size + added > max_length - 100:
+            groups.append(current)
+            current, size = [], 0
+            added = length
+        current.append(i)
+        size += added
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def plan_digests(texts: List[str], max_length: int = MAX_MESSAGE_LENGTH) -> List[Tuple[List[int], str]]:
+    """(indexes of the alerts, message) for each digest"""
+    if len(texts) == 1:
+        return [([0], texts[0][:max_length])]
+
+    plan = []
+    for group in digest_groups(texts, max_length):
+        parts = [texts[i].strip()[:max_length - 100] for i in group]
+        header = f"⚡ **EN DIRECT – {len(parts)} alertes**\n\n" if len(parts) > 1 else ""
+        plan.append((group, header + DIGEST_SEPARATOR.join(parts)))
+    return plan
+
+
+def build_digests(texts: List[str], max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Merge alerts into as few messages as possible, each under max_length"""
+    return [message for _, message in plan_digests(texts, max_length)]
+
+
+class AlertCoalescer:
+    """Buffers live alerts per channel and sends them as digests"""
+
+    def __init__(
+        self,
+        send: Callable[[str, str], None],
+        window: float = LATENCY_WINDOW,
+        quiet_period: float = QUIET_PERIOD,
+        max_length: int = MAX_MESSAGE_LENGTH
+    ):
+        self.send = send
+        self.window = window
+        self.quiet_period = quiet_period
+        self.max_length = max_length
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[PendingAlert]] = {}
+        self._last_sent: Dict[str, float] = {}
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.messages_sent = 0
+        self.alerts_sent = 0
+        self.alerts_dropped = 0
+
+    def submit(self, channel: str, text: str, urgent: bool = False) -> None:
+        now = time.time()
+
+        with self._lock:
+            queue = self._queues.setdefault(channel, [])
+            quiet = not queue and now - self._last_sent.get(channel, 0) >= self.quiet_period
+            if not (urgent and quiet):
+                queue.append(PendingAlert(text, now))
+                metrics.set_gauge("queue_depth", len(queue), queue="coalescer", channel=channel)
+                return
+
+        self._deliver(channel, [PendingAlert(text, now)])
+
+    def for_channel(self, channel: str, urgent: bool = True) -> Callable[[str], None]:
+        """Single-argument sender, e.g. for live_poller.run_live_loop"""
+        return lambda text: self.submit(channel, text, urgent=urgent)
+
+    def flush(self, force: bool = False) -> int:
+        """Send every channel queue whose oldest alert has waited a full window"""
+        now = time.time()
+        ready = {}
+
+        with self._lock:
+            for channel, queue in self._queues.items():
+                if queue and (force or now - queue[0].submitted_at >= self.window):
+                    ready[channel] = queue[:]
+                    queue.clear()
+                    metrics.set_gauge("queue_depth", 0, queue="coalescer", channel=channel)
+
+        for channel, alerts in ready.items():
+            self._deliver(channel, alerts)
+        return len(ready)
+
+    def _deliver(self, channel: str, alerts: List[PendingAlert]) -> None:
+        delivered = []
+        for group, message in plan_digests([a.text for a in alerts], self.max_length):
+            try:
+                with metrics.timer("telegram_send_seconds", channel=channel):
+                    sent = self.send(channel, message)
+                message_id = getattr(sent, "message_id", None)
+                if not message_id:
+                    raise RuntimeError("envoi non confirmé par Telegram")
+                self.messages_sent += 1
+                delivered.extend(alerts[i] for i in group)
+                post_archive.record(channel, message, "live", message_id=message_id)
+            except Exception as e:
+                metrics.inc("telegram_send_errors_total", channel=channel)
+                print(f"Erreur envoi digest sur {channel} :", e)
+
+        # Seules les alertes d'un digest confirmé comptent comme livrées
+        now = time.time()
+        with self._lock:
+            self._last_sent[channel] = now
+            self.alerts_sent += len(delivered)
+            self.alerts_dropped += len(alerts) - len(delivered)
+            self._latencies.extend(now - a.submitted_at for a in delivered)
+        for a in delivered:
+            metrics.observe("alert_delay_seconds", now - a.submitted_at)
+        if len(delivered) < len(alerts):
+            metrics.inc("alerts_dropped_total", len(alerts) - len(delivered), channel=channel)
+
+    # ---------------- THREAD ----------------
+    def start(self) -> "AlertCoalescer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-coalescer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush(force=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(FLUSH_TICK):
+            self.flush()
+
+    # ---------------- STATS ----------------
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    def latency_report(self) -> Dict:
+        with self._lock:
+            values = list(self._latencies)
+        return {
+            "alerts": self.alerts_sent,
+            "dropped": self.alerts_dropped,
+            "messages": self.messages_sent,
+            "pending": self.pending(),
+            "p50": round(percentile(values, 50), 2),
+            "p95": round(percentile(values, 95), 2),
+            "p99": round(percentile(values, 99), 2)
+        }
@@ -0,0 +1,85 @@
+"""
+Journalisation non bloquante : les appels à logger.* ne font que mettre
+l'enregistrement en file, un thread d'écriture s'occupe des E/S.
+
+    LOG_FORMAT=json      une ligne JSON par enregistrement sur la sortie standard
+    LOG_FILE=bot.jsonl   copie JSON lines dans un fichier, quel que soit LOG_FORMAT
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_FILE = os.getenv("LOG_FILE", "")
+
+# Attributs standard d'un LogRecord, les autres viennent de extra={...}
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    fmt: str = "%(asctime)s - %(levelname)s - %(message)s",
+    datefmt: Optional[str] = None,
+    level: int = logging.INFO
+) -> QueueListener:
+    """Route the root logger through a queue drained by a background writer thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(fmt, datefmt))
+        handlers = [console]
+        if LOG_FILE:
+            file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+
+        records = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(records))
+        root.setLevel(level)
+
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Vider la file avant la fin du processus
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,280 @@
+"""
+Micro-benchmarks des fonctions chaudes, sur données synthétiques.
+
+    python benchmarks.py                      # compare à benchmarks-baseline.json
+    python benchmarks.py --save               # enregistre la nouvelle référence
+    python benchmarks.py --only predict_match --sizes 10,10000 --threshold 0.3
+
+Code de sortie 1 si une mesure régresse au-delà du seuil.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+from typing import Callable, Dict, List, Tuple
+
+# Les modules lisent leur configuration à l'import
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("CHANNEL_ID", "@benchmark")
+os.environ.setdefault("CHANNELS", "@benchmark")
+
+from loadtest import git_revision
+
+BASELINE_FILE = "benchmarks-baseline.json"
+REGRESSION_THRESHOLD = 0.20
+REPEATS = 5
+# Durée minimale d'une répétition, on boucle sinon
+MIN_REPEAT_SECONDS = 0.02
+
+TEAM_NAMES = [
+    "Real Madrid", "Barcelona", "Manchester City", "Arsenal", "Liverpool", "Chelsea",
+    "Brighton", "Wolverhampton Wanderers", "Stade Rennais", "OGC Nice", "Real Sociedad",
+    "Atalanta", "Bologna", "VfB Stuttgart", "Eintracht Frankfurt", "Lens", "Girona", "Aston Villa",
+]
+LEAGUES = ["eng.1", "esp.1", "ita.1", "ger.1", "fra.1", "uefa.champions"]
+WORDS = ("goal but victoire défaite score titre championnat afrique international résultat "
+         "match joueur entraîneur transfert blessure saison derby stade supporters arbitre").split()
+
+
+# ---------------- GÉNÉRATEURS ----------------
+def make_entries(n: int, rng: random.Random) -> List[Dict]:
+    """RSS entries shaped like feedparser's"""
+    return [
+        {
+            "id": f"https://example.com/{i}",
+            "title": " ".join(rng.choices(WORDS, k=8)).capitalize(),
+            "summary": "<p>" + " ".join(rng.choices(WORDS, k=rng.randint(20, 80))) + "</p>",
+        }
+        for i in range(n)
+    ]
+
+
+def make_form(rng: random.Random):
+    from main3 import TeamForm
+    wins = rng.randint(0, 5)
+    draws = rng.randint(0, 5 - wins)
+    losses = 5 - wins - draws
+    return TeamForm(wins, draws, losses, rng.randint(0, 15), rng.randint(0, 15), 5)
+
+
+def make_fixtures(n: int, rng: random.Random) -> List[Tuple]:
+    fixtures = []
+    for i in range(n):
+        home, away = rng.sample(TEAM_NAMES, 2)
+        fixtures.append((home, away, make_form(rng), make_form(rng), rng.choice(LEAGUES),
+                         str(1000 + rng.randint(0, 500)), str(1000 + rng.randint(0, 500))))
+    return fixtures
+
+
+def make_predictions(n: int, rng: random.Random, draw_share: float = 0.6) -> List:
+    from main3 import MatchPrediction
+    return [
+        MatchPrediction(
+            home_team=home, away_team=away,
+            prediction="draw" if rng.random() < draw_share else rng.choice(["home_win", "away_win"]),
+            confidence=round(rng.uniform(4.5, 9.0), 1), odds=round(rng.uniform(1.3, 4.0), 2),
+            analysis_text="Analyse synthétique.", league=league.split(".")[0].upper(),
+            score_probable=rng.choice(["1-0", "2-1", "1-1", "0-2"]),
+            expected_home_goals=rng.uniform(0.5, 2.5), expected_away_goals=rng.uniform(0.5, 2.5),
+            fixture_id=str(i)
+        )
+        for i, (home, away, _, _, league, _, _) in enumerate(make_fixtures(n, rng))
+    ]
+
+
+def make_finished_match(goals: int, rng: random.Random) -> Dict:
+    """API-Football fixture with events, as fetch_match_details returns it"""
+    events = [
+        {"type": "Goal", "detail": rng.choice(["Normal Goal", "Penalty", "Missed Penalty"]),
+         "player": {"name": f"Joueur {k}"}, "time": {"elapsed": rng.randint(1, 90)}}
+        for k in range(goals)
+    ] + [{"type": "Card", "detail": "Yellow Card", "player": {"name": "X"}, "time": {"elapsed": 30}}]
+    return {
+        "teams": {"home": {"name": rng.choice(TEAM_NAMES)}, "away": {"name": rng.choice(TEAM_NAMES)}},
+        "goals": {"home": goals // 2, "away": goals - goals // 2},
+        "league": {"name": "Premier League"},
+        "events": events,
+    }
+
+
+# ---------------- CAS ----------------
+def case_compute_importance(n, rng):
+    import main
+    entries = make_entries(n, rng)
+    return lambda: [main.compute_importance(e) for e in entries]
+
+
+def case_select_most_important(n, rng):
+    import main
+    entries = make_entries(n, rng)
+    posted = {e["id"] for e in entries[: n // 2]}
+    return lambda: main.select_most_important(entries, posted)
+
+
+def case_analyze_match_locally(n, rng):
+    import main3
+    fixtures = make_fixtures(n, rng)
+    return lambda: [main3.analyze_match_locally(*f) for f in fixtures]
+
+
+def case_predict_match(n, rng):
+    import main3
+    main3.DEEPSEEK_API_KEY = ""  # jamais de réseau dans un benchmark
+    fixtures = make_fixtures(n, rng)
+    return lambda: [main3.predict_match(*f) for f in fixtures]
+
+
+def case_diversify_predictions(n, rng):
+    import main3
+    predictions = make_predictions(n, rng)
+    # diversify modifie ses entrées : copie neuve à chaque appel, hors mesure
+    return lambda: main3.diversify_predictions(copy.deepcopy(predictions)), \
+        lambda: copy.deepcopy(predictions)
+
+
+def case_format_combo_message(n, rng):
+    import main3
+    predictions = make_predictions(n, rng, draw_share=0.2)
+    return lambda: main3.format_combo_message("🔵 COMBINÉ SÉCURISÉ", predictions, "MEDIUM")
+
+
+def case_detect_competition(n, rng):
+    from formatter import detect_competition
+    leagues = ["Ligue 1", "Premier League", "Serie A", "Bundesliga", "Champions League", ""]
+    texts = [" ".join(rng.choices(WORDS, k=25)) + " " + rng.choice(leagues) for _ in range(n)]
+    return lambda: [detect_competition(t) for t in texts]
+
+
+def case_generate_summary(n, rng):
+    from match_summary import generate_summary
+    matches = [make_finished_match(rng.randint(0, 7), rng) for _ in range(n)]
+    return lambda: [generate_summary(m) for m in matches]
+
+
+# nom -> (fabrique, tailles réalistes et de stress)
+CASES: Dict[str, Tuple[Callable, List[int]]] = {
+    "compute_importance": (case_compute_importance, [30, 1000, 10000]),
+    "select_most_important": (case_select_most_important, [30, 1000, 10000]),
+    "analyze_match_locally": (case_analyze_match_locally, [10, 1000, 10000]),
+    "predict_match": (case_predict_match, [10, 1000, 10000]),
+    "diversify_predictions": (case_diversify_predictions, [5, 100, 10000]),
+    "format_combo_message": (case_format_combo_message, [3, 5, 10]),
+    "detect_competition": (case_detect_competition, [30, 1000, 10000]),
+    "generate_summary": (case_generate_summary, [10, 1000, 10000]),
+}
+
+
+def measure(factory: Callable, size: int, repeats: int, seed: int) -> Dict:
+    made = factory(size, random.Random(seed))
+    func, copy_cost = made if isinstance(made, tuple) else (made, None)
+
+    func()  # échauffement (imports, caches)
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    loops = max(1, int(MIN_REPEAT_SECONDS / once)) if once > 0 else 1000
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+
+    # Coût de la copie défensive retiré de la mesure
+    if copy_cost is not None:
+        overheads = []
+        for _ in range(3):
+            start = time.perf_counter()
+            copy_cost()
+            overheads.append(time.perf_counter() - start)
+        overhead = min(overheads)
+        timings = [max(0.0, t - overhead) for t in timings]
+
+    best = min(timings)
+    return {
+        "best_ms": round(best * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "per_item_us": round(best / size * 1e6, 3),
+        "loops": loops,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, sizes in results.items():
+        for size, r in sizes.items():
+            old = baseline.get("results", {}).get(name, {}).get(size)
+            if not old or not old.get("best_ms"):
+                continue
+            change = (r["best_ms"] - old["best_ms"]) / old["best_ms"]
+            r["change"] = round(change, 3)
+            if change > threshold:
+                regressions.append(f"{name}[{size}] {old['best_ms']}ms → {r['best_ms']}ms ({change:+.0%})")
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n⏱ Benchmarks {report['revision']} (Python {report['python']})")
+    print(f"  {'fonction':<24} {'taille':>7} {'meilleur ms':>12} {'médian ms':>11} {'µs/élément':>11} {'vs réf.':>8}")
+    for name, sizes in report["results"].items():
+        for size, r in sizes.items():
+            change = f"{r['change']:+.0%}" if "change" in r else "—"
+            print(f"  {name:<24} {size:>7} {r['best_ms']:>12} {r['median_ms']:>11} {r['per_item_us']:>11} {change:>8}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des fonctions chaudes")
+    parser.add_argument("--only", default="", help="fonctions à mesurer, séparées par des virgules")
+    parser.add_argument("--sizes", default="", help="tailles à utiliser à la place des tailles par défaut")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="régression tolérée (0.2 = +20%%)")
+    parser.add_argument("--save", action="store_true", help="écrire les résultats comme nouvelle référence")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(CASES)
+    custom_sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "results": {}
+    }
+    for name in names:
+        factory, sizes = CASES[name]
+        report["results"][name] = {}
+        for size in custom_sizes or sizes:
+            # Clés JSON : les tailles sont des chaînes, aussi dans la référence
+            report["results"][name][str(size)] = measure(factory, size, args.repeats, args.seed)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report["results"], json.load(f), args.threshold)
+    print_report(report)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Référence enregistrée : {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\n✅ Aucune régression" if os.path.exists(args.baseline) else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 import os
+import json
 import time
+import asyncio
 import schedule
 from telegram import Bot
 
+import http_client
+import metrics
+import memory_watchdog
+import post_archive
 from sources import fetch_news
 from formatter import format_post
 from pinned_message import pin_message
@@ -10,18 +16,29 @@ from pinned_message import pin_message
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHANNEL_ID = os.getenv("CHANNEL_ID")
 
-bot = Bot(BOT_TOKEN)
+# Pause entre deux publications (anti flood Telegram)
+POST_DELAY = 4
+# Liens déjà publiés, conservés lors d'un redémarrage du chien de garde mémoire
+STATE_FILE = "bot_state.json"
+
+bot = Bot(BOT_TOKEN, base_url=http_client.TELEGRAM_BASE_URL, base_file_url=http_client.TELEGRAM_BASE_FILE_URL)
 posted_links = set()
+latest_links = set()
+
+# Les méthodes du Bot (python-telegram-bot 20) sont des coroutines : une boucle
+# unique les exécute depuis la boucle synchrone de schedule
+_loop = asyncio.new_event_loop()
 
-# 🔒 Épinglage sécurisé (1 seule fois par lancement)
-try:
-    pin_message(bot, CHANNEL_ID)
-except Exception as e:
-    print("Pin message ignoré :", e)
+
+def run(coro):
+    """Run a Bot coroutine to completion and return its result"""
+    return _loop.run_until_complete(coro)
 
 
 def publish_news():
     news = fetch_news()
+    latest_links.clear()
+    latest_links.update(item["link"] for item in news)
 
     for item in news:
         if item["link"] in posted_links:
@@ -30,40 +47,80 @@ def publish_news():
         message, image = format_post(item)
 
         try:
-            if image:
-                bot.send_photo(
-                    chat_id=CHANNEL_ID,
-                    photo=image,
-                    caption=message,
-                    parse_mode="Markdown"
-                )
-            else:
-                bot.send_message(
-                    chat_id=CHANNEL_ID,
-                    text=message,
-                    parse_mode="Markdown"
-                )
-
+            with metrics.timer("telegram_send_seconds", channel=CHANNEL_ID):
+                if image:
+                    sent = run(bot.send_photo(
+                        chat_id=CHANNEL_ID,
+                        photo=image,
+                        caption=message,
+                        parse_mode="Markdown"
+                    ))
+                else:
+                    sent = run(bot.send_message(
+                        chat_id=CHANNEL_ID,
+                        text=message,
+                        parse_mode="Markdown"
+                    ))
+
+            # Sans message_id, rien ne prouve que le message est en ligne : pas d'archive
+            message_id = getattr(sent, "message_id", None)
+            if not message_id:
+                raise RuntimeError(f"envoi non confirmé par Telegram ({item['link']})")
             posted_links.add(item["link"])
-            time.sleep(4)
+            post_archive.record(CHANNEL_ID, message, item["link"], message_id=message_id)
+            time.sleep(POST_DELAY)
 
         except Exception as e:
+            metrics.inc("telegram_send_errors_total", channel=CHANNEL_ID)
             print("Erreur publication news :", e)
 
 
+def trim_memory():
+    """Soft memory limit: forget links no longer in the feeds, drop the HTTP cache"""
+    if latest_links:
+        posted_links.intersection_update(latest_links)
+    http_client.client.clear_memory()
+
+
+def save_state():
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(sorted(posted_links), f, ensure_ascii=False)
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            posted_links.update(json.load(f))
+        os.remove(STATE_FILE)
+
+
 def heartbeat():
     print("🤖 Bot actif – API en attente")
 
 
-# ⏱️ TÂCHES SANS API
-schedule.every(30).minutes.do(publish_news)
-schedule.every(10).minutes.do(heartbeat)
+def main():
+    load_state()
+    memory_watchdog.watch(trim=trim_memory, save_state=save_state)
 
-print("🤖 BOT FOOTBALL LANCÉ (MODE SANS API)")
+    # 🔒 Épinglage sécurisé (1 seule fois par lancement)
+    try:
+        run(pin_message(bot, CHANNEL_ID))
+    except Exception as e:
+        print("Pin message ignoré :", e)
 
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+    # ⏱️ TÂCHES SANS API
+    schedule.every(30).minutes.do(publish_news)
+    schedule.every(10).minutes.do(heartbeat)
+
+    print("🤖 BOT FOOTBALL LANCÉ (MODE SANS API)")
+
+    while True:
+        schedule.run_pending()
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
 
 
 
@@ -0,0 +1,417 @@
+"""
+Lecture de canaux Telegram comme source d'articles, à côté des flux RSS.
+
+    SOURCE_CHANNELS=canal1,canal2     canaux à lire (sans @)
+    TG_API_ID / TG_API_HASH           identifiants https://my.telegram.org
+    INGEST_SESSION=ingest             fichier de session Telethon
+    INGEST_BACKFILL=20                messages repris au premier passage d'un canal
+
+Chaque canal est d'abord rattrapé depuis son curseur (channel_cursors.json) avec
+iter_messages, puis suivi en direct par NewMessage. Les articles passent par une
+file bornée que la boucle de publication vide à chaque cycle. Le gestionnaire
+NewMessage n'attend jamais : file pleine, le canal est marqué en retard et relu
+depuis Telegram dès que la file se libère. Le curseur n'avance qu'une fois
+l'article publié (ou écarté) par le pipeline, via commit() : un redémarrage
+reprend au plus ancien article non traité, sans relire le reste de l'historique.
+
+    python channel_ingest.py check     vérification contre un client Telethon simulé
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from telethon import TelegramClient, events
+
+import metrics
+
+SOURCE_CHANNELS = [ch.strip().lstrip("@") for ch in os.getenv("SOURCE_CHANNELS", "").split(",") if ch.strip()]
+API_ID = int(os.getenv("TG_API_ID", "0") or 0)
+API_HASH = os.getenv("TG_API_HASH", "")
+SESSION = os.getenv("INGEST_SESSION", "ingest")
+BACKFILL = int(os.getenv("INGEST_BACKFILL", "20") or 0)
+
+CURSOR_FILE = "channel_cursors.json"
+QUEUE_SIZE = 100
+TITLE_MAX = 120
+
+logger = logging.getLogger("channel_ingest")
+
+
+def normalize(channel: str, message) -> Optional[Dict]:
+    """Telegram message -> article shaped like a feedparser entry (None if no text)"""
+    text = (getattr(message, "message", None) or getattr(message, "text", None) or "").strip()
+    if not text:
+        return None
+    first_line, _, rest = text.partition("\n")
+    title = first_line.strip()[:TITLE_MAX]
+    return {
+        "id": f"tg:{channel}:{message.id}",
+        "title": title,
+        "summary": rest.strip() or text,
+        "link": f"https://t.me/{channel}/{message.id}",
+        "published": message.date.isoformat() if getattr(message, "date", None) else "",
+        "channel": channel,
+        "message_id": message.id,
+    }
+
+
+class CursorStore:
+    """Per channel, the id up to which every article has been posted or discarded"""
+
+    def __init__(self, path: str = CURSOR_FILE):
+        self.path = path
+        self.cursors: Dict[str, int] = {}
+        self.dirty = False
+
+    def get(self, channel: str) -> int:
+        return self.cursors.get(channel, 0)
+
+    def advance(self, channel: str, message_id: int) -> None:
+        if message_id > self.get(channel):
+            self.cursors[channel] = message_id
+            self.dirty = True
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.cursors, f, indent=2)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str = CURSOR_FILE) -> "CursorStore":
+        store = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    store.cursors = {k: int(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logger.warning(f"{path} illisible, reprise depuis les derniers messages : {e}")
+        return store
+
+
+class ChannelIngestor:
+    """Backfills each channel from its cursor, then follows it live"""
+
+    def __init__(
+        self,
+        client,
+        channels: List[str],
+        cursors: Optional[CursorStore] = None,
+        queue_size: int = QUEUE_SIZE,
+        backfill: int = BACKFILL
+    ):
+        self.client = client
+        self.channels = channels
+        self.cursors = cursors or CursorStore.load()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.backfill_limit = backfill
+        # Dernier id mis en file (en avance sur le curseur persisté)
+        self._read: Dict[str, int] = {}
+        # Messages reçus en direct pendant le rattrapage du canal
+        self._pending: Dict[str, List] = {}
+        # Canaux dont un message n'a pas trouvé de place dans la file
+        self._behind: Set[str] = set()
+        # Articles remis au pipeline mais pas encore publiés ni écartés
+        self._outstanding: Dict[str, Set[int]] = {}
+        self._committed: Dict[str, int] = {}
+        self._entities: Dict[str, object] = {}
+        self._names: Dict[int, str] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.live = False
+
+    async def _enqueue(self, channel: str, message) -> None:
+        # En retard : ce message sera relu par le rattrapage, dans l'ordre
+        if channel in self._behind or message.id <= self._read.get(channel, 0):
+            return
+        article = normalize(channel, message)
+        if article is not None:
+            try:
+                self.queue.put_nowait(article)
+            except asyncio.QueueFull:
+                self._behind.add(channel)
+                metrics.inc("ingest_overflow_total", channel=channel)
+                return
+            metrics.set_gauge("ingest_queue_depth", self.queue.qsize())
+            metrics.inc("ingest_articles_total", channel=channel)
+        self._read[channel] = message.id
+
+    async def backfill(self, channel: str, entity) -> int:
+        cursor = self.cursors.get(channel)
+        self._read[channel] = cursor
+        count = 0
+        if cursor:
+            # Du plus ancien au plus récent, page par page
+            count = await self.backfill_from(channel, cursor)
+        elif self.backfill_limit:
+            # Premier passage : seulement les derniers messages
+            recent = [m async for m in self.client.iter_messages(entity, limit=self.backfill_limit)]
+            if recent:
+                # Un redémarrage avant publication relit ces mêmes messages, pas plus
+                self.cursors.advance(channel, recent[-1].id - 1)
+            for message in reversed(recent):
+                await self._enqueue(channel, message)
+                if channel in self._behind:
+                    break
+                count += 1
+        else:
+            # Aucun historique voulu : on part du dernier message
+            async for message in self.client.iter_messages(entity, limit=1):
+                self._read[channel] = message.id
+                self.cursors.advance(channel, message.id)
+        return count
+
+    async def _catch_up(self, channel: str) -> None:
+        """Re-read a channel that overflowed the queue, from the last article queued"""
+        self._behind.discard(channel)
+        self._pending[channel] = []
+        try:
+            count = await self.backfill_from(channel, self._read.get(channel, 0))
+            logger.info(f"📡 {channel} : {count} message(s) repris après saturation de la file")
+        except Exception as e:
+            logger.error(f"❌ Reprise {channel} : {e}")
+        for message in self._pending.pop(channel, []):
+            await self._enqueue(channel, message)
+
+    async def backfill_from(self, channel: str, min_id: int) -> int:
+        """Queue every message after min_id, oldest first, until the queue is full"""
+        count = 0
+        async for message in self.client.iter_messages(self._entities[channel], min_id=min_id, reverse=True):
+            await self._enqueue(channel, message)
+            if channel in self._behind:
+                break
+            count += 1
+        return count
+
+    async def _on_message(self, event) -> None:
+        channel = self._names.get(event.chat_id)
+        if channel is None:
+            return
+        if channel in self._pending:
+            self._pending[channel].append(event.message)
+            return
+        await self._enqueue(channel, event.message)
+
+    async def start(self) -> None:
+        """Resolve channels, register the live handler, then catch up on each channel"""
+        for channel in self.channels:
+            try:
+                entity = await self.client.get_entity(channel)
+            except Exception as e:
+                logger.error(f"❌ Canal {channel} introuvable : {e}")
+                continue
+            self._entities[channel] = entity
+            self._names[await self.client.get_peer_id(entity)] = channel
+            self._pending[channel] = []
+
+        if not self._entities:
+            return
+        # Le gestionnaire est posé avant le rattrapage : aucun message ne tombe entre les deux
+        self.client.add_event_handler(self._on_message, events.NewMessage(chats=list(self._entities.values())))
+
+        for channel, entity in self._entities.items():
+            try:
+                count = await self.backfill(channel, entity)
+                logger.info(f"📡 {channel} : {count} message(s) rattrapé(s) depuis #{self.cursors.get(channel)}")
+            except Exception as e:
+                logger.error(f"❌ Rattrapage {channel} : {e}")
+            for message in self._pending.pop(channel):
+                await self._enqueue(channel, message)
+        if self.cursors.dirty:
+            self.cursors.save()
+        self.live = True
+        logger.info(f"👁️ Suivi en direct de {len(self._entities)} canal(aux)")
+
+    async def run(self) -> None:
+        await self.client.start()
+        await self.start()
+        await self.client.run_until_disconnected()
+
+    def drain(self, limit: int = QUEUE_SIZE) -> List[Dict]:
+        """Take queued articles for the publishing pipeline; call commit() once each is handled"""
+        articles = []
+        while len(articles) < limit:
+            try:
+                article = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            articles.append(article)
+            self._outstanding.setdefault(article["channel"], set()).add(article["message_id"])
+        metrics.set_gauge("ingest_queue_depth", self.queue.qsize())
+
+        # De la place s'est libérée : les canaux en retard sont relus en tâche de fond
+        if self.live and not self.queue.full():
+            for channel in list(self._behind):
+                if channel not in self._pending:
+                    task = asyncio.get_running_loop().create_task(self._catch_up(channel))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        return articles
+
+    def commit(self, article: Dict) -> None:
+        """Mark a drained article as posted or discarded; the cursor moves past it when safe"""
+        channel, message_id = article.get("channel"), article.get("message_id")
+        outstanding = self._outstanding.get(channel)
+        if outstanding is None or message_id not in outstanding:
+            return  # entrée RSS, ou article déjà traité
+        outstanding.discard(message_id)
+        self._committed[channel] = max(self._committed.get(channel, 0), message_id)
+        # Jamais au-delà d'un article encore en attente de publication
+        self.cursors.advance(channel, min(outstanding) - 1 if outstanding else self._committed[channel])
+        if self.cursors.dirty:
+            self.cursors.save()
+
+    def can_reappear(self, key: str) -> bool:
+        """Is `key` the id of a channel article above its cursor, i.e. one a restart would read again?"""
+        prefix, _, rest = str(key).partition(":")
+        channel, _, message_id = rest.rpartition(":")
+        if prefix != "tg" or not message_id.isdigit():
+            return False
+        return int(message_id) > self.cursors.get(channel)
+
+
+def start_ingest(channels: List[str] = None) -> Optional[ChannelIngestor]:
+    """Start ingestion in the running loop, or do nothing when unconfigured"""
+    channels = SOURCE_CHANNELS if channels is None else channels
+    if not channels:
+        return None
+    if not (API_ID and API_HASH):
+        logger.warning("⚠️ SOURCE_CHANNELS défini sans TG_API_ID/TG_API_HASH, canaux ignorés")
+        return None
+    ingestor = ChannelIngestor(TelegramClient(SESSION, API_ID, API_HASH), channels)
+    task = asyncio.get_running_loop().create_task(ingestor.run())
+    task.add_done_callback(
+        lambda t: t.cancelled() or t.exception() is None
+        or logger.error(f"❌ Lecture des canaux arrêtée : {t.exception()}")
+    )
+    return ingestor
+
+
+# ---------------- VÉRIFICATION ----------------
+class StandInClient:
+    """In-memory stand-in for the few TelegramClient calls the ingestor makes"""
+
+    def __init__(self, history: Dict[str, List[str]]):
+        # canal -> messages, ids 1..n comme sur Telegram
+        self.messages: Dict[str, List] = {}
+        self.handlers = []
+        for channel, texts in history.items():
+            for text in texts:
+                self._new(channel, text)
+
+    def _new(self, channel: str, text: str):
+        from types import SimpleNamespace
+        messages = self.messages.setdefault(channel, [])
+        message = SimpleNamespace(id=len(messages) + 1, message=text, date=None)
+        messages.append(message)
+        return message
+
+    async def get_entity(self, channel: str):
+        if channel not in self.messages:
+            raise ValueError(f"canal {channel} inconnu")
+        return channel
+
+    async def get_peer_id(self, entity) -> int:
+        return -1000 - sorted(self.messages).index(entity)
+
+    def add_event_handler(self, callback, event=None) -> None:
+        self.handlers.append(callback)
+
+    async def iter_messages(self, entity, limit=None, min_id=0, reverse=False):
+        found = [m for m in self.messages[entity] if m.id > min_id]
+        found = found if reverse else found[::-1]
+        for message in found[:limit]:
+            await asyncio.sleep(0)  # une page Telegram : la main passe aux gestionnaires
+            yield message
+
+    async def post(self, channel: str, text: str) -> None:
+        """Publish a message and run the live handlers, as Telethon would"""
+        from types import SimpleNamespace
+        message = self._new(channel, text)
+        event = SimpleNamespace(chat_id=await self.get_peer_id(channel), message=message)
+        for handler in self.handlers:
+            await handler(event)
+
+
+async def _check_ingest(path: str) -> List[str]:
+    problems = []
+
+    def ids(articles):
+        return [a["message_id"] for a in articles]
+
+    # Premier passage : seuls les INGEST_BACKFILL derniers messages, dans l'ordre
+    client = StandInClient({"a": [f"a{i}" for i in range(1, 11)], "b": ["b1", "", "b3"]})
+    ingestor = ChannelIngestor(client, ["a", "b", "absent"], CursorStore(path), queue_size=5, backfill=3)
+    start = asyncio.ensure_future(ingestor.start())
+    await asyncio.sleep(0)
+    await client.post("a", "a11")  # reçu pendant le rattrapage
+    await start
+    first = ingestor.drain()
+    if [(a["channel"], a["message_id"]) for a in first] != [("a", 8), ("a", 9), ("a", 10), ("a", 11), ("b", 1)]:
+        problems.append(f"rattrapage initial inattendu : {[(a['channel'], a['message_id']) for a in first]}")
+
+    # File pleine : le gestionnaire n'attend pas, le canal est relu une fois la file vidée
+    for i in range(12, 20):
+        await asyncio.wait_for(client.post("a", f"a{i}"), timeout=1)
+    if "a" not in ingestor._behind:
+        problems.append("file pleine sans canal marqué en retard")
+    later = []
+    for _ in range(10):
+        later += ingestor.drain()
+        await asyncio.sleep(0.01)
+    expected = [3] + list(range(12, 20))
+    got = sorted(ids([a for a in later if a["channel"] == "b"])) + ids([a for a in later if a["channel"] == "a"])
+    if got != expected:
+        problems.append(f"reprise après saturation : {got} au lieu de {expected}")
+
+    # Le curseur ne dépasse jamais un article remis mais pas encore publié
+    by_id = {(a["channel"], a["message_id"]): a for a in first + later}
+    for key in [("a", 9), ("a", 10), ("a", 8)]:
+        ingestor.commit(by_id[key])
+    if ingestor.cursors.get("a") != 10:
+        problems.append(f"curseur a={ingestor.cursors.get('a')} après publication de 8 à 10, attendu 10")
+    ingestor.commit(by_id[("a", 13)])
+    if ingestor.cursors.get("a") != 10:
+        problems.append("curseur avancé au-delà de l'article 11 non publié")
+    if not ingestor.can_reappear("tg:a:13") or ingestor.can_reappear("tg:a:9") \
+            or ingestor.can_reappear("https://exemple.fr/article"):
+        problems.append("can_reappear ne suit pas le curseur")
+
+    # Redémarrage : tout ce qui n'a pas été publié revient ; 13, publié après 11, aussi
+    # (main.py l'écarte grâce à posted.json), mais rien sous le curseur
+    restarted = ChannelIngestor(client, ["a", "b"], CursorStore.load(path), queue_size=50, backfill=3)
+    await restarted.start()
+    again = [(a["channel"], a["message_id"]) for a in restarted.drain()]
+    wanted = [("a", i) for i in range(11, 20)] + [("b", 1), ("b", 3)]
+    if sorted(again) != sorted(wanted):
+        problems.append(f"après redémarrage : {sorted(again)} au lieu de {sorted(wanted)}")
+    return problems
+
+
+def check() -> List[str]:
+    """Run the ingestor against StandInClient; returns the problems found (empty when all is well)"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        return asyncio.run(_check_ingest(os.path.join(tmp, CURSOR_FILE)))
+
+
+def main(argv=None) -> int:
+    argv = list(argv if argv is not None else sys.argv[1:])
+    if argv[:1] != ["check"]:
+        print(__doc__)
+        return 1
+    logging.basicConfig(level=logging.CRITICAL)
+    problems = check()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Rattrapage, saturation, curseurs et redémarrage conformes")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
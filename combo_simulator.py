@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+N_SAMPLES = 200_000
+# Fraction de Kelly appliquée (Kelly complet = trop agressif)
+KELLY_FRACTION = 0.25
+
+HOME_WIN = "home_win"
+AWAY_WIN = "away_win"
+DRAW = "draw"
+
+# (buts attendus domicile, buts attendus extérieur, pronostic, cote)
+Leg = Tuple[float, float, str, float]
+
+
+@dataclass
+class ComboStats:
+    win_probability: float
+    leg_probabilities: List[float]
+    total_odds: float
+    expected_return: float  # par unité misée, mise déduite
+    variance: float         # du gain net par unité misée
+    kelly_fraction: float   # fraction de bankroll conseillée (déjà fractionnée)
+    samples: int
+
+    @property
+    def std_dev(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def stake(self, bankroll: float, max_stake: Optional[float] = None) -> float:
+        stake = bankroll * self.kelly_fraction
+        if max_stake is not None:
+            stake = min(stake, max_stake)
+        return round(stake, 2)
+
+
+def simulate_combo(
+    legs: Sequence[Leg],
+    n_samples: int = N_SAMPLES,
+    kelly_fraction: float = KELLY_FRACTION,
+    seed: Optional[int] = None
+) -> ComboStats:
+    """Monte Carlo of a combo: Poisson scores per leg, all legs must win"""
+    rng = np.random.default_rng(seed)
+
+    lam_home = np.array([max(0.05, leg[0]) for leg in legs])
+    lam_away = np.array([max(0.05, leg[1]) for leg in legs])
+    picks = [leg[2] for leg in legs]
+    total_odds = float(np.prod([leg[3] for leg in legs])) if legs else 1.0
+
+    home_goals = rng.poisson(lam_home, size=(n_samples, len(legs)))
+    away_goals = rng.poisson(lam_away, size=(n_samples, len(legs)))
+
+    won = np.empty((n_samples, len(legs)), dtype=bool)
+    for i, pick in enumerate(picks):
+        if pick == HOME_WIN:
+            won[:, i] = home_goals[:, i] > away_goals[:, i]
+        elif pick == AWAY_WIN:
+            won[:, i] = home_goals[:, i] < away_goals[:, i]
+        else:
+            won[:, i] = home_goals[:, i] == away_goals[:, i]
+
+    p = float(won.all(axis=1).mean()) if legs else 0.0
+
+    # Gain net par unité : total_odds - 1 si gagné, -1 sinon
+    expected_return = p * total_odds - 1
+    variance = p * (1 - p) * total_odds ** 2
+
+    kelly = 0.0
+    if total_odds > 1:
+        kelly = max(0.0, expected_return / (total_odds - 1)) * kelly_fraction
+
+    return ComboStats(
+        win_probability=p,
+        leg_probabilities=[float(x) for x in won.mean(axis=0)],
+        total_odds=total_odds,
+        expected_return=expected_return,
+        variance=variance,
+        kelly_fraction=kelly,
+        samples=n_samples
+    )
+
+
+def goals_from_score(score: str) -> Tuple[float, float]:
+    """'2-1' -> (2.0, 1.0), used when a prediction carries no expected goals"""
+    try:
+        home, away = score.split("-")
+        return float(home), float(away)
+    except (AttributeError, ValueError):
+        return 1.3, 1.1
@@ -0,0 +1,316 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+DEFAULT_TIMEOUT = 15
+POOL_SIZE = 10
+MAX_MEMORY_ENTRIES = 512
+
+# Cache disque optionnel (survit aux redémarrages)
+DISK_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "")
+
+# Enregistrement / rejeu hors-ligne (voir replay.py)
+RECORD_DIR = os.getenv("HTTP_RECORD_DIR", "")
+REPLAY_URL = os.getenv("HTTP_REPLAY_URL", "").rstrip("/")
+
+# Requêtes simultanées max par hôte
+HOST_CONCURRENCY = {
+    "v3.football.api-sports.io": 2,
+}
+DEFAULT_HOST_CONCURRENCY = 4
+
+# Durée de vie du cache par endpoint (secondes), première règle qui matche
+TTL_RULES = [
+    (re.compile(r"api-sports\.io/fixtures\?.*live="), 10),
+    (re.compile(r"api-sports\.io/fixtures\?.*ids="), 3600),
+    (re.compile(r"api-sports\.io/fixtures\?.*date="), 600),
+    (re.compile(r"espn\.com/.*/scoreboard"), 300),
+    (re.compile(r"espn\.com/.*/schedule"), 6 * 3600),
+]
+DEFAULT_TTL = 0
+
+
+class CachedResponse:
+    """Minimal response object, the same for network, memory and disk hits"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class CacheEntry:
+    __slots__ = ("expires", "response", "etag", "last_modified")
+
+    def __init__(self, expires: float, response: CachedResponse):
+        self.expires = expires
+        self.response = response
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+
+class _InFlight:
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def resolve_url(url: str) -> str:
+    """Redirect https://host/path to the local replay server when HTTP_REPLAY_URL is set"""
+    if not REPLAY_URL:
+        return url
+    parts = urlsplit(url)
+    return f"{REPLAY_URL}/{parts.netloc}{url.split(parts.netloc, 1)[1]}"
+
+
+# Base URLs for python-telegram-bot's Bot(base_url=..., base_file_url=...)
+TELEGRAM_BASE_URL = resolve_url("https://api.telegram.org/bot")
+TELEGRAM_BASE_FILE_URL = resolve_url("https://api.telegram.org/file/bot")
+
+
+def ttl_for(url: str) -> float:
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class HttpClient:
+    """Pooled, cached and coalesced GETs shared by every fetcher"""
+
+    def __init__(self, disk_dir: str = DISK_CACHE_DIR):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, _InFlight] = {}
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
+
+    # ---------------- HELPERS ----------------
+    @staticmethod
+    def full_url(url: str, params: Optional[Dict] = None) -> str:
+        if not params:
+            return url
+        sep = "&" if "?" in url else "?"
+        return url + sep + urlencode(sorted(params.items()))
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY))
+                self._host_limits[host] = sem
+            return sem
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+        metrics.inc("http_cache_total", result=key)
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._memory[key] = entry
+            while len(self._memory) > MAX_MEMORY_ENTRIES:
+                self._memory.pop(next(iter(self._memory)))
+
+        if self.disk_dir:
+            self._write_disk(key, entry)
+
+    # ---------------- DISK ----------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode()).hexdigest())
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._disk_path(key)
+        try:
+            with open(path + ".body", "wb") as f:
+                f.write(entry.response.content)
+            with open(path + ".json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": entry.response.url,
+                    "expires": entry.expires,
+                    "status": entry.response.status_code,
+                    "headers": dict(entry.response.headers)
+                }, f)
+        except OSError:
+            pass
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        path = self._disk_path(key)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(path + ".body", "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        response = CachedResponse(meta["url"], meta["status"], meta["headers"], content)
+        return CacheEntry(meta["expires"], response)
+
+    # ---------------- GET ----------------
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        ttl: Optional[float] = None
+    ) -> CachedResponse:
+        key = self.full_url(url, params)
+        ttl = ttl_for(key) if ttl is None else ttl
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and self.disk_dir and ttl:
+            entry = self._read_disk(key)
+            if entry is not None and entry.expires > now:
+                self._count("disk_hits")
+                with self._lock:
+                    self._memory[key] = entry
+                return entry.response
+        if entry is not None and entry.expires > now:
+            self._count("hits")
+            return entry.response
+
+        # Même URL déjà en cours de téléchargement : on attend son résultat
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+        if not leader:
+            self._count("coalesced")
+            flight.done.wait(timeout)
+            if flight.error:
+                raise flight.error
+            if flight.response is not None:
+                return flight.response
+            return self.get(url, params, headers, timeout, ttl)
+
+        try:
+            flight.response = self._fetch(key, headers, timeout, ttl, entry)
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            self._count("errors")
+            raise
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch(self, key, headers, timeout, ttl, stale: Optional[CacheEntry]) -> CachedResponse:
+        request_headers = dict(headers or {})
+        if stale is not None:
+            if stale.etag:
+                request_headers["If-None-Match"] = stale.etag
+            if stale.last_modified:
+                request_headers["If-Modified-Since"] = stale.last_modified
+
+        host = urlsplit(key).netloc
+        with self._host_limit(host):
+            with metrics.timer("http_fetch_seconds", host=host):
+                r = self.session.get(resolve_url(key), headers=request_headers, timeout=timeout)
+        metrics.inc("http_responses_total", host=host, status=r.status_code)
+
+        if RECORD_DIR and r.status_code != 304:
+            import replay
+            replay.record("GET", key, r.status_code, dict(r.headers), r.content)
+
+        if r.status_code == 304 and stale is not None:
+            self._count("revalidated")
+            stale.expires = time.time() + ttl
+            self._store(key, stale)
+            return stale.response
+
+        self._count("misses")
+        response = CachedResponse(r.url, r.status_code, dict(r.headers), r.content)
+        if ttl and r.status_code == 200:
+            self._store(key, CacheEntry(time.time() + ttl, response))
+        return response
+
+    def post(self, url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+        """Uncached POST through the pooled session and the host limit"""
+        host = urlsplit(url).netloc
+        with self._host_limit(host):
+            with metrics.timer("http_post_seconds", host=host):
+                return self.session.post(resolve_url(url), timeout=timeout, **kwargs)
+
+    def clear_memory(self) -> int:
+        """Drop the in-memory cache (the disk cache, if any, stays)"""
+        with self._lock:
+            count = len(self._memory)
+            self._memory.clear()
+        return count
+
+    # ---------------- STATS ----------------
+    def hit_rate(self) -> float:
+        s = self.stats
+        served = s["hits"] + s["disk_hits"] + s["revalidated"] + s["coalesced"]
+        total = served + s["misses"]
+        return served / total if total else 0.0
+
+    def report(self) -> Dict:
+        with self._lock:
+            report = dict(self.stats)
+            report["entries"] = len(self._memory)
+        report["hit_rate"] = round(self.hit_rate(), 3)
+        return report
+
+
+client = HttpClient()
+
+
+def get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+        timeout: float = DEFAULT_TIMEOUT, ttl: Optional[float] = None) -> CachedResponse:
+    return client.get(url, params=params, headers=headers, timeout=timeout, ttl=ttl)
+
+
+def post(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    return client.post(url, timeout=timeout, **kwargs)
+
+
+def stats() -> Dict:
+    return client.report()
@@ -0,0 +1,198 @@
+"""
+Publication des pronostics peu avant le coup d'envoi.
+
+Chaque match devient une tâche due à (coup d'envoi - PUBLISH_OFFSET_MIN), rangée
+dans un tas : planifier ou extraire coûte O(log n). Une replanification pousse
+simplement une nouvelle entrée ; l'ancienne, devenue périmée, est ignorée quand
+elle remonte en tête (suppression paresseuse). Les matchs dont les coups d'envoi
+sont à moins de PUBLISH_GROUP_MIN les uns des autres partent dans un même message.
+Une tâche extraite n'est marquée publiée (mark_done) qu'après un envoi réussi ;
+sinon retry() la replanifie RETRY_DELAY plus tard, tant que le match n'a pas commencé.
+
+    PUBLISH_OFFSET_MIN=60      publication 60 minutes avant le coup d'envoi
+    PUBLISH_GROUP_MIN=15       regroupement des coups d'envoi proches
+
+Le planning est conservé dans schedule.json et survit aux redémarrages.
+"""
+import os
+import json
+import time
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+PUBLISH_OFFSET = int(os.getenv("PUBLISH_OFFSET_MIN", "60")) * 60
+GROUP_WINDOW = int(os.getenv("PUBLISH_GROUP_MIN", "15")) * 60
+
+SCHEDULE_FILE = "schedule.json"
+# Un message regroupe au plus ce nombre de matchs (limite de 4096 caractères)
+MAX_GROUP_SIZE = 8
+# Matchs déjà publiés oubliés après ce délai
+DONE_FORGET_AFTER = 2 * 86400
+# Le tas est reconstruit quand les entrées périmées dépassent les vivantes
+COMPACT_MIN = 64
+# Nouvel essai après un envoi échoué
+RETRY_DELAY = 5 * 60
+
+
+class KickoffScheduler:
+    """Min-heap of publish jobs keyed by fixture, with lazy deletion"""
+
+    def __init__(self, path: str = SCHEDULE_FILE, offset: int = PUBLISH_OFFSET, group_window: int = GROUP_WINDOW):
+        self.path = path
+        self.offset = offset
+        self.group_window = group_window
+        # (échéance, numéro, clé) ; une entrée n'est vivante que si son numéro est celui de jobs[clé]
+        self.heap: List[Tuple[float, int, str]] = []
+        # clé -> {"due", "kickoff", "seq", "data"}
+        self.jobs: Dict[str, Dict] = {}
+        # clé -> coup d'envoi, pour ne jamais publier deux fois
+        self.done: Dict[str, float] = {}
+        # Tâches extraites par pop_due, en attente de mark_done ou retry
+        self.claimed: Dict[str, Dict] = {}
+        self.seq = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    # ---------------- PLANIFICATION ----------------
+    def schedule(self, key: str, kickoff: float, data: Optional[Dict] = None) -> bool:
+        """Add or move the publish job of a fixture; False if it was already published"""
+        key = str(key)
+        if key in self.done:
+            return False
+        job = self.jobs.get(key)
+        if job is not None and job["kickoff"] == kickoff:
+            job["data"] = data or job["data"]
+            return True
+        self.seq += 1
+        due = kickoff - self.offset
+        self.jobs[key] = {"due": due, "kickoff": kickoff, "seq": self.seq, "data": data or {}}
+        heapq.heappush(self.heap, (due, self.seq, key))
+        self._maybe_compact()
+        return True
+
+    def cancel(self, key: str) -> bool:
+        """Drop a pending job; its heap entry is skipped later"""
+        return self.jobs.pop(str(key), None) is not None
+
+    def is_done(self, key: str) -> bool:
+        return str(key) in self.done
+
+    def _live(self, entry: Tuple[float, int, str]) -> bool:
+        job = self.jobs.get(entry[2])
+        return job is not None and job["seq"] == entry[1]
+
+    def _drop_stale(self) -> None:
+        while self.heap and not self._live(self.heap[0]):
+            heapq.heappop(self.heap)
+
+    def _maybe_compact(self) -> None:
+        if len(self.heap) > 2 * len(self.jobs) + COMPACT_MIN:
+            self.heap = [(j["due"], j["seq"], k) for k, j in self.jobs.items()]
+            heapq.heapify(self.heap)
+
+    def next_due(self) -> Optional[float]:
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    # ---------------- EXTRACTION ----------------
+    def pop_due(self, now: Optional[float] = None) -> List[List[Dict]]:
+        """Jobs due now, plus those kicking off close to them, grouped by nearby kick-offs"""
+        now = now or time.time()
+        ready = []
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not self._live(entry):
+                continue
+            job = self.jobs.pop(entry[2])
+            if job["kickoff"] <= now:
+                # Échéance manquée (arrêt prolongé) : le match a commencé
+                self.done[entry[2]] = job["kickoff"]
+                self.expired += 1
+                continue
+            self.claimed[entry[2]] = job
+            ready.append((entry[2], job))
+        if not ready:
+            return []
+
+        # Les coups d'envoi proches partent avec les tâches échues
+        horizon = max(job["kickoff"] for _, job in ready) + self.group_window
+        while self.heap and self.heap[0][0] <= horizon - self.offset:
+            entry = heapq.heappop(self.heap)
+            if self._live(entry):
+                job = self.jobs.pop(entry[2])
+                self.claimed[entry[2]] = job
+                ready.append((entry[2], job))
+
+        ready.sort(key=lambda item: item[1]["kickoff"])
+        groups: List[List[Dict]] = []
+        for key, job in ready:
+            item = {"key": key, "kickoff": job["kickoff"], **job["data"]}
+            if (groups and len(groups[-1]) < MAX_GROUP_SIZE
+                    and job["kickoff"] - groups[-1][0]["kickoff"] <= self.group_window):
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        return groups
+
+    def mark_done(self, keys: List[str]) -> None:
+        """Jobs returned by pop_due whose message was sent: never published again"""
+        for key in keys:
+            job = self.claimed.pop(str(key), None)
+            if job is not None:
+                self.done[str(key)] = job["kickoff"]
+
+    def retry(self, keys: List[str], delay: float = RETRY_DELAY, now: Optional[float] = None) -> int:
+        """Put jobs returned by pop_due back `delay` seconds from now; returns how many were requeued"""
+        now = now or time.time()
+        requeued = 0
+        for key in map(str, keys):
+            job = self.claimed.pop(key, None)
+            if job is None:
+                continue
+            if now + delay >= job["kickoff"]:
+                # Plus de nouvel essai possible avant le coup d'envoi
+                self.done[key] = job["kickoff"]
+                self.expired += 1
+                continue
+            self.seq += 1
+            job.update(due=now + delay, seq=self.seq)
+            self.jobs[key] = job
+            heapq.heappush(self.heap, (job["due"], self.seq, key))
+            requeued += 1
+        return requeued
+
+    # ---------------- PERSISTANCE ----------------
+    def save(self) -> None:
+        now = time.time()
+        self.done = {k: t for k, t in self.done.items() if t + DONE_FORGET_AFTER > now}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # Une tâche en cours d'envoi reste à publier si le processus s'arrête avant mark_done
+            json.dump({"seq": self.seq, "jobs": {**self.claimed, **self.jobs}, "done": self.done}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    @classmethod
+    def load(cls, path: str = SCHEDULE_FILE, offset: int = PUBLISH_OFFSET, group_window: int = GROUP_WINDOW) -> "KickoffScheduler":
+        scheduler = cls(path, offset, group_window)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                scheduler.seq = data.get("seq", 0)
+                scheduler.done = data.get("done", {})
+                for key, job in data.get("jobs", {}).items():
+                    # L'écart a pu changer depuis l'enregistrement
+                    job["due"] = job["kickoff"] - offset
+                    scheduler.jobs[key] = job
+                scheduler.heap = [(j["due"], j["seq"], k) for k, j in scheduler.jobs.items()]
+                heapq.heapify(scheduler.heap)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[WARN] {path} illisible, planning vide : {e}")
+        return scheduler
+
+    def report(self) -> str:
+        due = self.next_due()
+        when = time.strftime("%d/%m %H:%M", time.localtime(due)) if due else "—"
+        return f"{len(self.jobs)} publication(s) planifiée(s), prochaine {when}, {self.expired} expirée(s)"
@@ -0,0 +1,201 @@
+import os
+import time
+import datetime
+import threading
+import http_client
+import metrics
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+API_KEY = "API_FOOTBALL_KEY"
+URL = "https://v3.football.api-sports.io/fixtures?live=all"
+FIXTURES_URL = "https://v3.football.api-sports.io/fixtures?date="
+HEADERS = {"x-apisports-key": API_KEY}
+
+# Un même poll sert tous les détecteurs : le diff du tracker ne se consomme qu'une fois.
+# Même durée que le cache HTTP de fixtures?live=all
+SNAPSHOT_MAX_AGE = 10
+
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+CHANNEL_ID = os.getenv("CHANNEL_ID")
+
+
+@dataclass
+class LiveSnapshot:
+    """One parsed `fixtures?live=all` payload, shared by every detector of a tick"""
+    fetched_at: float
+    matches: List[Dict]
+    by_id: Dict[int, Dict] = field(default_factory=dict)
+    quota_remaining: Optional[int] = None
+    events: List = field(default_factory=list)
+
+    @classmethod
+    def from_response(cls, matches: List[Dict], quota_remaining: Optional[int] = None) -> "LiveSnapshot":
+        by_id = {m["fixture"]["id"]: m for m in matches}
+        return cls(fetched_at=time.time(), matches=matches, by_id=by_id,
+                   quota_remaining=quota_remaining)
+
+
+# Un détecteur reçoit le snapshot du tick et retourne ses alertes
+Detector = Callable[[LiveSnapshot], List[str]]
+
+detectors: List[Detector] = []
+
+
+def register_detector(detector: Detector) -> Detector:
+    """Add a detector to the live poller (usable as a decorator)"""
+    if detector not in detectors:
+        detectors.append(detector)
+    return detector
+
+
+def fetch_live_snapshot() -> LiveSnapshot:
+    """Fetch `fixtures?live=all` and diff it against the per-fixture live state"""
+    from live_state import tracker
+
+    r = http_client.get(URL, headers=HEADERS, timeout=15)
+    data = r.json()
+    # Quota épuisé, clé invalide... : "errors" rempli et "response" vide, ce n'est
+    # pas un flux sans match et le tracker ne doit pas le voir
+    if data.get("errors"):
+        raise RuntimeError(f"API-Football : {data['errors']}")
+    remaining = r.headers.get("x-ratelimit-requests-remaining")
+    snapshot = LiveSnapshot.from_response(
+        data["response"],
+        quota_remaining=int(remaining) if remaining and remaining.isdigit() else None
+    )
+    snapshot.events = tracker.update(snapshot)
+    metrics.set_gauge("live_fixtures", len(snapshot.matches))
+    if snapshot.quota_remaining is not None:
+        metrics.set_gauge("apifootball_quota_remaining", snapshot.quota_remaining)
+    global _last_snapshot
+    _last_snapshot = snapshot
+    return snapshot
+
+
+_last_snapshot: Optional[LiveSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def current_snapshot(max_age: float = SNAPSHOT_MAX_AGE) -> LiveSnapshot:
+    """Snapshot of the current poll, fetched and diffed at most once per max_age seconds"""
+    with _snapshot_lock:
+        snapshot = _last_snapshot
+        if snapshot is not None and time.time() - snapshot.fetched_at < max_age:
+            return snapshot
+        return fetch_live_snapshot()
+
+
+def fetch_last_kickoff(day: Optional[datetime.date] = None) -> Optional[float]:
+    """Latest kick-off timestamp in the day's fixture list (one API call)"""
+    r = http_client.get(FIXTURES_URL + str(day or datetime.date.today()), headers=HEADERS, timeout=15)
+    data = r.json()
+    if data.get("errors"):
+        raise RuntimeError(f"API-Football : {data['errors']}")
+    kickoffs = [m["fixture"].get("timestamp") for m in data.get("response") or []]
+    kickoffs = [t for t in kickoffs if t]
+    return float(max(kickoffs)) if kickoffs else None
+
+
+def refresh_last_kickoff(controller) -> None:
+    """Once a day, give the controller the last kick-off so the quota lasts until then"""
+    if not controller.needs_last_kickoff():
+        return
+    try:
+        last_kickoff = fetch_last_kickoff(controller.day)
+        controller.count_request()
+    except Exception as e:
+        print("Erreur liste des matchs du jour :", e)
+        controller.count_request(ok=False)
+        last_kickoff = None
+    # Un échec n'est pas retenté avant demain : horizon de fin de journée
+    controller.set_last_kickoff(last_kickoff)
+    if last_kickoff:
+        print(f"📅 Dernier coup d'envoi du jour : {datetime.datetime.fromtimestamp(last_kickoff):%H:%M}")
+
+
+def run_detectors(snapshot: LiveSnapshot) -> List[str]:
+    alerts = []
+
+    for detector in detectors:
+        try:
+            alerts.extend(detector(snapshot))
+        except Exception as e:
+            print(f"Erreur détecteur {getattr(detector, '__name__', detector)} :", e)
+
+    return alerts
+
+
+def poll_live(controller=None) -> List[str]:
+    """Fetch the live snapshot once and hand it to every registered detector"""
+    try:
+        snapshot = fetch_live_snapshot()
+    except Exception as e:
+        print("Erreur récupération live :", e)
+        if controller:
+            controller.record_request(None)
+        return []
+
+    if controller:
+        controller.record_request(snapshot)
+
+    return run_detectors(snapshot)
+
+
+def run_live_loop(send: Callable[[str], None], controller=None) -> None:
+    """Poll forever, sleeping as long as the polling controller decides"""
+    from polling_controller import PollingController
+
+    controller = controller or PollingController()
+    register_default_detectors()
+
+    while True:
+        refresh_last_kickoff(controller)
+        for alert in poll_live(controller):
+            try:
+                send(alert)
+            except Exception as e:
+                print("Erreur envoi alerte live :", e)
+
+        delay = controller.next_interval()
+        metrics.set_gauge("live_poll_interval_seconds", delay)
+        print(f"⏱ Prochain poll live dans {delay:.0f}s — {controller.format_report()}")
+        time.sleep(delay)
+
+
+def register_default_detectors() -> None:
+    from scores_live import detect_goals
+    from red_cards import detect_red_cards
+    from match_status import detect_status_changes
+
+    register_detector(detect_goals)
+    register_detector(detect_red_cards)
+    register_detector(detect_status_changes)
+
+
+def send_alert(channel: str, text: str):
+    """Blocking Bot API sendMessage, returns the sent message (message_id)"""
+    r = http_client.post(f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage", json={
+        "chat_id": channel,
+        "text": text,
+        "parse_mode": "Markdown",
+        "disable_web_page_preview": True
+    }, timeout=10)
+    r.raise_for_status()
+    return SimpleNamespace(message_id=r.json().get("result", {}).get("message_id"))
+
+
+def main():
+    from alert_coalescer import AlertCoalescer
+
+    coalescer = AlertCoalescer(send_alert).start()
+    print("📡 SUIVI LIVE LANCÉ")
+    try:
+        run_live_loop(coalescer.for_channel(CHANNEL_ID))
+    finally:
+        coalescer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Types d'événements émis par le tracker
+KICK_OFF = "kick_off"
+GOAL = "goal"
+GOAL_CANCELLED = "goal_cancelled"
+RED_CARD = "red_card"
+# Joueur ou minute d'un événement déjà annoncé corrigés par l'API
+GOAL_CORRECTED = "goal_corrected"
+RED_CARD_CORRECTED = "red_card_corrected"
+HALF_TIME = "half_time"
+FULL_TIME = "full_time"
+
+FINISHED_STATUSES = {"FT", "AET", "PEN"}
+TERMINATED_STATUSES = {"ABD", "CANC", "AWD", "WO"}
+RED_CARD_DETAILS = {"Red Card", "Second Yellow card"}
+CANCELLED_GOAL_WORDS = ("goal cancelled", "goal disallowed")
+
+# Un match absent d'un flux live non vide pendant autant de polls est considéré terminé
+MISSING_POLLS_FOR_FULL_TIME = 2
+# Un match qu'aucun flux ne confirme depuis ce délai est oublié sans alerte
+STALE_AFTER = 4 * 3600
+KICK_OFF_MAX_ELAPSED = 5
+
+CORRECTION_KINDS = {GOAL: GOAL_CORRECTED, RED_CARD: RED_CARD_CORRECTED}
+
+EventKey = Tuple
+
+
+@dataclass
+class LiveEvent:
+    kind: str
+    fixture_id: int
+    home: str
+    away: str
+    league: str
+    score: str
+    minute: Optional[int] = None
+    team: Optional[str] = None
+    player: Optional[str] = None
+    detail: Optional[str] = None
+
+
+def is_goal(event: Dict) -> bool:
+    return event.get("type") == "Goal" and event.get("detail") != "Missed Penalty"
+
+
+def is_cancelled_goal(event: Dict) -> bool:
+    detail = (event.get("detail") or "").lower()
+    return event.get("type") == "Var" and any(w in detail for w in CANCELLED_GOAL_WORDS)
+
+
+def event_kind(event: Dict) -> Optional[str]:
+    """Alert kind of an API-Football event, None for events we do not alert on"""
+    if is_goal(event):
+        return GOAL
+    if event.get("type") == "Card" and event.get("detail") in RED_CARD_DETAILS:
+        return RED_CARD
+    if is_cancelled_goal(event):
+        return GOAL_CANCELLED
+    return None
+
+
+def event_key(event: Dict, ordinal: int) -> EventKey:
+    """Stable identity of an event across polls: team, kind and rank within them.
+
+    Player and minute are left out, API-Football corrects them after the fact.
+    """
+    return ((event.get("team") or {}).get("id"), event_kind(event), ordinal)
+
+
+def event_details(event: Dict) -> Tuple:
+    """The correctable part of an event"""
+    t = event.get("time") or {}
+    player = event.get("player") or {}
+    return (player.get("id") or player.get("name"), t.get("elapsed"), t.get("extra"), event.get("detail"))
+
+
+def group_events(events: List[Dict]) -> Dict[Tuple, List[Dict]]:
+    """Alertable events by (team id, kind), in feed order; an event's ordinal is its index"""
+    groups: Dict[Tuple, List[Dict]] = {}
+    for e in events:
+        kind = event_kind(e)
+        if kind is not None:
+            groups.setdefault(event_key(e, 0)[:2], []).append(e)
+    return groups
+
+
+def align(old: List[Dict], new: List[Dict]) -> Tuple[List[Tuple[Dict, Dict]], List[Dict], List[Dict]]:
+    """Pair the events of one (team, kind) across two polls -> (pairs, added, removed)"""
+    if len(new) >= len(old):
+        return list(zip(old, new)), new[len(old):], []
+    # Un événement a disparu (VAR) : ceux qui restent sont retrouvés par leurs détails
+    remaining = list(old)
+    pairs, unmatched = [], []
+    for e in new:
+        match = next((o for o in remaining if event_details(o) == event_details(e)), None)
+        if match is None:
+            unmatched.append(e)
+        else:
+            remaining.remove(match)
+            pairs.append((match, e))
+    pairs += list(zip(remaining, unmatched))
+    return pairs, [], remaining[len(unmatched):]
+
+
+class FixtureState:
+    """What we already know about one live fixture"""
+    __slots__ = ("fixture_id", "home", "away", "league", "score", "status",
+                 "events", "half_time_sent", "missing", "last_seen")
+
+    def __init__(self, fixture_id: int):
+        self.fixture_id = fixture_id
+        self.home = self.away = self.league = ""
+        self.score = (0, 0)
+        self.status = None
+        # (équipe, type) -> événements déjà vus, dans l'ordre du flux
+        self.events: Dict[Tuple, List[Dict]] = {}
+        self.half_time_sent = False
+        self.missing = 0
+        self.last_seen = time.time()
+
+    def _event(self, kind: str, event: Optional[Dict] = None) -> LiveEvent:
+        live_event = LiveEvent(
+            kind=kind,
+            fixture_id=self.fixture_id,
+            home=self.home,
+            away=self.away,
+            league=self.league,
+            score=f"{self.score[0]}-{self.score[1]}"
+        )
+        if event:
+            live_event.minute = (event.get("time") or {}).get("elapsed")
+            live_event.team = (event.get("team") or {}).get("name")
+            live_event.player = (event.get("player") or {}).get("name")
+            live_event.detail = event.get("detail")
+        return live_event
+
+    def update(self, match: Dict, first_seen: bool) -> List[LiveEvent]:
+        self.missing = 0
+        self.last_seen = time.time()
+        self.home = match["teams"]["home"]["name"]
+        self.away = match["teams"]["away"]["name"]
+        self.league = match["league"]["name"]
+
+        previous_score = self.score
+        self.score = (match["goals"]["home"] or 0, match["goals"]["away"] or 0)
+        status = match["fixture"]["status"]
+        self.status = status.get("short")
+
+        events = match.get("events")
+        groups = group_events(events or [])
+
+        # Premier passage (ex. redémarrage du bot) : on mémorise sans alerter
+        if first_seen:
+            self.events = groups
+            self.half_time_sent = self.status != "1H"
+            if self.status == "1H" and (status.get("elapsed") or 0) <= KICK_OFF_MAX_ELAPSED:
+                return [self._event(KICK_OFF)]
+            return []
+
+        out = []
+
+        if events is not None:
+            removed_goals = []
+            for group in list(self.events) + [g for g in groups if g not in self.events]:
+                kind = group[1]
+                pairs, added, removed = align(self.events.get(group, []), groups.get(group, []))
+                for old, new in pairs:
+                    if kind in CORRECTION_KINDS and event_details(old) != event_details(new):
+                        out.append(self._event(CORRECTION_KINDS[kind], new))
+                out.extend(self._event(kind, e) for e in added)
+                if kind == GOAL:
+                    removed_goals += removed
+            self.events = groups
+
+            # But retiré de la liste sans événement VAR explicite
+            if not any(ev.kind == GOAL_CANCELLED for ev in out):
+                out.extend(self._event(GOAL_CANCELLED, goal) for goal in removed_goals)
+
+        # Flux sans événements : repli sur la comparaison des scores
+        if events is None and sum(self.score) > sum(previous_score):
+            out.append(self._event(GOAL))
+
+        if self.status == "HT" and not self.half_time_sent:
+            self.half_time_sent = True
+            out.append(self._event(HALF_TIME))
+
+        if self.status in FINISHED_STATUSES:
+            out.append(self._event(FULL_TIME))
+
+        return out
+
+
+class LiveTracker:
+    """Per-fixture state machines, holding only the fixtures currently in play"""
+
+    def __init__(self):
+        self.fixtures: Dict[int, FixtureState] = {}
+
+    def update(self, snapshot) -> List[LiveEvent]:
+        out = []
+
+        for fixture_id, match in snapshot.by_id.items():
+            state = self.fixtures.get(fixture_id)
+            first_seen = state is None
+            if first_seen:
+                state = self.fixtures[fixture_id] = FixtureState(fixture_id)
+
+            out.extend(state.update(match, first_seen))
+
+            if state.status in FINISHED_STATUSES or state.status in TERMINATED_STATUSES:
+                del self.fixtures[fixture_id]
+
+        # Les matchs terminés disparaissent de fixtures?live=all. Un flux vide ne prouve
+        # rien (quota, panne) : seule l'absence dans un flux qui liste d'autres matchs compte
+        for fixture_id in [f for f in self.fixtures if f not in snapshot.by_id]:
+            state = self.fixtures[fixture_id]
+            if snapshot.by_id:
+                state.missing += 1
+            if state.missing >= MISSING_POLLS_FOR_FULL_TIME:
+                out.append(state._event(FULL_TIME))
+                del self.fixtures[fixture_id]
+            elif snapshot.fetched_at - state.last_seen > STALE_AFTER:
+                del self.fixtures[fixture_id]
+
+        return out
+
+
+tracker = LiveTracker()
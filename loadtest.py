@@ -0,0 +1,231 @@
+"""
+Test de charge des chemins de publication contre un faux Bot API local.
+
+    python loadtest.py --messages 500 --concurrency 8 --latency 0.05 --flood-rate 0.05
+    python loadtest.py --compare loadtest-<ancienne-rev>.json
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import asyncio
+import argparse
+import platform
+import resource
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from alert_coalescer import percentile
+from replay import FakeBotAPI, FixtureStore, ReplayServer
+
+PATHS = ["send_telegram", "post_entry", "publish_news"]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def synthetic_rss(index: int, items: int = 3) -> bytes:
+    entries = "".join(
+        f"<item><title>Match {index}-{i} : victoire à domicile</title>"
+        f"<link>https://example.com/{index}/{i}</link>"
+        f"<description>Résumé du match {index}-{i}, but à la dernière minute.</description></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'.encode()
+
+
+# ---------------- CHEMINS DE PUBLICATION ----------------
+def path_send_telegram(n: int, concurrency: int) -> List[float]:
+    import main3
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        main3.send_telegram(f"<b>Test de charge</b> message {i}")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(one, range(n)))
+
+
+def path_post_entry(n: int, concurrency: int) -> List[float]:
+    import main
+
+    main.POSTED_FILE = os.path.join(tempfile.mkdtemp(), "posted.json")
+
+    async def run() -> List[float]:
+        posted = set()
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> float:
+            entry = {
+                "id": f"load-{i}",
+                "title": f"Match {i} : victoire à domicile",
+                "summary": "Résumé du match, but à la dernière minute.",
+                "link": f"https://example.com/{i}"
+            }
+            async with limit:
+                start = time.perf_counter()
+                await main.post_entry(entry, posted)
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(one(i) for i in range(n)))
+
+    return asyncio.run(run())
+
+
+def path_publish_news(n: int, concurrency: int) -> List[float]:
+    import bot
+
+    bot.POST_DELAY = 0
+    latencies = []
+    while len(latencies) < n:
+        bot.posted_links.clear()
+        start = time.perf_counter()
+        bot.publish_news()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+PATH_FUNCTIONS: Dict[str, Callable[[int, int], List[float]]] = {
+    "send_telegram": path_send_telegram,
+    "post_entry": path_post_entry,
+    "publish_news": path_publish_news,
+}
+
+
+def run_path(name: str, server: ReplayServer, n: int, concurrency: int) -> Dict:
+    server.bot_api.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    try:
+        latencies = PATH_FUNCTIONS[name](n, concurrency)
+    except ImportError as e:
+        tracemalloc.stop()
+        return {"skipped": f"dépendance manquante : {e.name}"}
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    api = server.bot_api
+    delivered = len(api.sent)
+    if latencies and not delivered:
+        # Des appels sans aucun message reçu : envoi jamais exécuté (coroutine non attendue...)
+        return {"failed": f"{len(latencies)} appel(s), aucun message reçu par le faux Bot API"}
+    return {
+        "calls": len(latencies),
+        "delivered": delivered,
+        "requests": api.requests,
+        "retries": max(0, api.requests - len(latencies)) if name != "publish_news" else None,
+        "flood_429": api.floods,
+        "errors_5xx": api.errors,
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(delivered / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "peak_traced_kb": round(peak / 1024, 1),
+    }
+
+
+def print_report(report: Dict, previous: Dict = None) -> None:
+    print(f"\n📊 Test de charge {report['revision']} — {report['config']}")
+    for name, r in report["results"].items():
+        if "skipped" in r:
+            print(f"  {name:14} ignoré ({r['skipped']})")
+            continue
+        if "failed" in r:
+            print(f"  {name:14} ❌ ÉCHEC : {r['failed']}")
+            continue
+        line = (
+            f"  {name:14} {r['messages_per_second']:>8} msg/s | p50 {r['latency_p50_ms']}ms "
+            f"p95 {r['latency_p95_ms']}ms p99 {r['latency_p99_ms']}ms | "
+            f"429 {r['flood_429']} retries {r['retries']} | pic {r['peak_traced_kb']}KB"
+        )
+        old = (previous or {}).get("results", {}).get(name)
+        if old and old.get("messages_per_second"):
+            delta = (r["messages_per_second"] - old["messages_per_second"]) / old["messages_per_second"] * 100
+            line += f" | {delta:+.1f}% vs {previous['revision']}"
+        print(line)
+    print(f"  RSS max du processus : {report['max_rss_kb']} KB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge des publications Telegram")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="latence du faux Bot API (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part de réponses 500")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="part de réponses 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after des réponses 429 (s)")
+    parser.add_argument("--paths", default=",".join(PATHS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--compare", default="", help="résultats d'une version précédente")
+    args = parser.parse_args(argv)
+
+    # Flux RSS synthétiques pour publish_news
+    fixtures = tempfile.mkdtemp(prefix="loadtest-")
+    store = FixtureStore(fixtures)
+    for i, url in enumerate(["https://www.lequipe.fr/rss/actu_rss_Football.xml",
+                             "https://feeds.bbci.co.uk/sport/football/rss.xml",
+                             "https://www.goal.com/fr/feeds/news"]):
+        store.save("GET", url, 200, {"Content-Type": "application/rss+xml"}, synthetic_rss(i))
+
+    bot_api = FakeBotAPI(latency=args.latency, error_rate=args.error_rate,
+                         flood_rate=args.flood_rate, retry_after=args.retry_after, seed=args.seed)
+    server = ReplayServer(fixtures, bot_api=bot_api).start()
+
+    # Les modules lisent leur configuration à l'import
+    os.environ["HTTP_REPLAY_URL"] = server.url
+    os.environ.setdefault("BOT_TOKEN", "0:loadtest")
+    os.environ.setdefault("CHANNEL_ID", "@loadtest")
+    os.environ.setdefault("CHANNELS", "@loadtest")
+    # Archive des publications jetable, comme posted.json
+    os.environ.setdefault("POST_ARCHIVE", os.path.join(tempfile.mkdtemp(), "posts.db"))
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "config": {
+            "messages": args.messages, "concurrency": args.concurrency, "latency": args.latency,
+            "error_rate": args.error_rate, "flood_rate": args.flood_rate,
+            "retry_after": args.retry_after, "seed": args.seed
+        },
+        "results": {}
+    }
+
+    try:
+        for name in [p.strip() for p in args.paths.split(",") if p.strip()]:
+            report["results"][name] = run_path(name, server, args.messages, args.concurrency)
+    finally:
+        server.stop()
+
+    report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    output = args.output or f"loadtest-{report['revision']}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Résultats : {output}")
+    return 1 if any("failed" in r for r in report["results"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
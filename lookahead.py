@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+LOOKAHEAD_FILE = "lookahead.json"
+
+# Une forme reste valable tant que l'équipe n'a pas rejoué...
+MATCH_DURATION = 2 * 3600
+# ...avec un plafond pour les matchs hors ligues suivies (coupes, sélections)
+FORM_MAX_AGE = 3 * 86400
+# Au-delà, une forme non réutilisée est oubliée
+FORM_FORGET_AFTER = 30 * 86400
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable short hash of everything a prediction depends on"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_kickoff(value: str) -> Optional[float]:
+    """ESPN date ('2024-05-01T19:00Z') -> timestamp"""
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class LookaheadStore:
+    """Team forms and predictions kept between runs, invalidated by their inputs"""
+
+    def __init__(self, path: str = LOOKAHEAD_FILE):
+        self.path = path
+        # clé équipe -> {"form": [...], "fetched_at": ts, "next_kickoff": ts | None}
+        self.forms: Dict[str, Dict] = {}
+        # id match -> {"fingerprint": str, "kickoff": ts, "prediction": {...}}
+        self.predictions: Dict[str, Dict] = {}
+        # clé équipe -> coups d'envoi de la fenêtre courante (non persistés)
+        self.kickoffs: Dict[str, List[float]] = {}
+        self.form_hits = self.form_misses = 0
+        self.reused = self.recomputed = 0
+
+    # ---------------- FORMES ----------------
+    def note_kickoffs(self, kickoffs: Dict[str, Iterable[float]]) -> None:
+        """Remember each team's upcoming kick-offs, for forms stored now or later in the run"""
+        self.kickoffs = {key: [t for t in times if t is not None] for key, times in kickoffs.items()}
+        for key, entry in self.forms.items():
+            upcoming = self.next_kickoff(key, entry["fetched_at"])
+            current = entry.get("next_kickoff")
+            if upcoming is not None:
+                entry["next_kickoff"] = min(upcoming, current) if current else upcoming
+
+    def next_kickoff(self, key: str, after: float) -> Optional[float]:
+        upcoming = [t for t in self.kickoffs.get(key, ()) if t >= after]
+        return min(upcoming) if upcoming else None
+
+    def form(self, key: str, now: float = None) -> Optional[List]:
+        now = now or time.time()
+        entry = self.forms.get(key)
+        fresh = (
+            entry is not None
+            and now - entry["fetched_at"] < FORM_MAX_AGE
+            and (not entry.get("next_kickoff") or now < entry["next_kickoff"] + MATCH_DURATION)
+        )
+        if not fresh:
+            self.form_misses += 1
+            return None
+        self.form_hits += 1
+        return entry["form"]
+
+    def store_form(self, key: str, values: List, now: float = None) -> None:
+        # Les coups d'envoi sont connus avant les formes : la prochaine date est posée tout de suite
+        now = now or time.time()
+        self.forms[key] = {"form": list(values), "fetched_at": now, "next_kickoff": self.next_kickoff(key, now)}
+
+    # ---------------- PRONOSTICS ----------------
+    def prediction(self, fixture_id: str, fp: str) -> Optional[Dict]:
+        entry = self.predictions.get(str(fixture_id))
+        if entry is None or entry["fingerprint"] != fp:
+            self.recomputed += 1
+            return None
+        self.reused += 1
+        return entry["prediction"]
+
+    def store_prediction(self, fixture_id: str, fp: str, kickoff: Optional[float], data: Dict) -> None:
+        self.predictions[str(fixture_id)] = {"fingerprint": fp, "kickoff": kickoff, "prediction": data}
+
+    def prune(self, now: float = None) -> None:
+        now = now or time.time()
+        self.predictions = {
+            k: v for k, v in self.predictions.items()
+            if not v.get("kickoff") or v["kickoff"] + MATCH_DURATION > now
+        }
+        self.forms = {k: v for k, v in self.forms.items() if now - v["fetched_at"] < FORM_FORGET_AFTER}
+
+    def report(self) -> str:
+        return (
+            f"formes {self.form_hits} en cache / {self.form_misses} récupérée(s), "
+            f"pronostics {self.reused} réutilisé(s) / {self.recomputed} recalculé(s)"
+        )
+
+    # ---------------- PERSISTANCE ----------------
+    def save(self) -> None:
+        self.prune()
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"forms": self.forms, "predictions": self.predictions}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str = LOOKAHEAD_FILE) -> "LookaheadStore":
+        store = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                store.forms = data.get("forms", {})
+                store.predictions = data.get("predictions", {})
+            except (OSError, ValueError) as e:
+                print(f"[WARN] {path} illisible, cache ignoré : {e}")
+        return store
@@ -0,0 +1,94 @@
+"""
+Détection des blocages de la boucle asyncio.
+
+Une tâche se réveille toutes les LOOP_MONITOR_INTERVAL secondes et mesure son
+retard. Un thread de garde surveille ces réveils : si la boucle ne répond plus
+depuis LOOP_LAG_MS, il capture la pile du thread de la boucle à cet instant,
+c'est-à-dire l'appel bloquant en cours.
+
+    LOOP_LAG_MS=100    seuil de signalement (0 = désactivé)
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+import metrics
+
+LAG_THRESHOLD = float(os.getenv("LOOP_LAG_MS", "100") or 0) / 1000
+INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05") or 0.05)
+STACK_DEPTH = 12
+
+logger = logging.getLogger("loop_monitor")
+
+
+class LoopLagMonitor:
+    """Heartbeat task in the loop plus a watchdog thread that catches it stalling"""
+
+    def __init__(self, threshold: float = LAG_THRESHOLD, interval: float = INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stall_reported = False
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def _beat(self) -> None:
+        while True:
+            start = time.monotonic()
+            self._heartbeat = start
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - start - self.interval
+            self._heartbeat = time.monotonic()
+            metrics.observe("event_loop_lag_seconds", lag)
+            if lag >= self.threshold:
+                self.stalls += 1
+                self.max_lag = max(self.max_lag, lag)
+                metrics.inc("event_loop_stalls_total")
+                logger.warning(f"🐢 Boucle bloquée {lag * 1000:.0f} ms", extra={"lag_ms": round(lag * 1000)})
+            self._stall_reported = False
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            blocked = time.monotonic() - self._heartbeat - self.interval
+            if blocked < self.threshold or self._stall_reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._stall_reported = True
+            stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH))
+            logger.warning(
+                f"🐢 Boucle bloquée depuis {blocked * 1000:.0f} ms, pile en cours :\n{stack}",
+                extra={"lag_ms": round(blocked * 1000), "stack": stack}
+            )
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> "LoopLagMonitor":
+        """Call from inside the running loop (e.g. first line of main_loop)"""
+        loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = loop.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+
+def monitor_loop() -> Optional[LoopLagMonitor]:
+    """Start the lag monitor in the running loop unless LOOP_LAG_MS=0"""
+    if LAG_THRESHOLD <= 0:
+        return None
+    return LoopLagMonitor().start()
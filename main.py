@@ -6,6 +6,13 @@ import feedparser
 import logging
 import aiohttp
 import asyncio
+import http_client
+import metrics
+import memory_watchdog
+import async_logging
+import loop_monitor
+import post_archive
+import channel_ingest
 from telegram import Bot
 from deep_translator import GoogleTranslator
 
@@ -16,14 +23,12 @@ RSS_FEED = "https://feeds.bbci.co.uk/sport/football/rss.xml"
 TEMP_IMAGE_FILE = "/tmp/image.jpg"
 POSTED_FILE = "posted.json"
 POST_INTERVAL = 30 * 60  # 30 minutes
+MAX_CHANNEL_ENTRIES = 30
 
 # ---------------- LOGGING ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+async_logging.setup_logging("%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
-bot = Bot(token=BOT_TOKEN)
+bot = Bot(token=BOT_TOKEN, base_url=http_client.TELEGRAM_BASE_URL, base_file_url=http_client.TELEGRAM_BASE_FILE_URL)
 
 # ---------------- VARIANTES ----------------
 TITLE_VARIANTS = [
@@ -68,6 +73,22 @@ def save_posted(posted):
     with open(POSTED_FILE, "w", encoding="utf-8") as f:
         json.dump(list(posted), f, ensure_ascii=False, indent=2)
 
+# ---------------- MÉMOIRE ----------------
+def entry_key(entry):
+    return entry.get("id") or entry.get("link") or entry.get("title")
+
+def trim_memory(posted, feed_entries, ingestor=None):
+    """Soft memory limit: forget posted IDs no longer in the RSS feed, drop the HTTP cache"""
+    # Flux vide (erreur RSS) : rien ne prouve que ses articles ont disparu
+    if feed_entries:
+        keep = {entry_key(e) for e in feed_entries}
+        if ingestor:
+            # Article de canal encore au-dessus du curseur : il peut être relu après un redémarrage
+            keep.update(key for key in posted if ingestor.can_reappear(key))
+        posted.intersection_update(keep)
+        save_posted(posted)
+    http_client.client.clear_memory()
+
 # ---------------- IMAGE ----------------
 def extract_image(entry):
     if "media_content" in entry:
@@ -78,27 +99,37 @@ def extract_image(entry):
     match = re.search(r'<img[^>]+src="([^">]+)"', html)
     return match.group(1) if match else None
 
+def write_image(data):
+    with open(TEMP_IMAGE_FILE, "wb") as f:
+        f.write(data)
+
 async def download_image(url):
     if not url:
         return None
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
+            async with session.get(http_client.resolve_url(url)) as resp:
                 if resp.status == 200:
-                    with open(TEMP_IMAGE_FILE, "wb") as f:
-                        f.write(await resp.read())
+                    data = await resp.read()
+                    await asyncio.to_thread(write_image, data)
                     return TEMP_IMAGE_FILE
     except Exception as e:
         logger.error(f"❌ Image error : {e}")
     return None
 
 # ---------------- TRANSLATION ----------------
-async def translate(text):
+def translate_sync(text):
     try:
-        return GoogleTranslator(source="auto", target="fr").translate(text)
+        with metrics.timer("translation_seconds"):
+            return GoogleTranslator(source="auto", target="fr").translate(text)
     except Exception:
+        metrics.inc("translation_errors_total")
         return text
 
+async def translate(text):
+    # Appel HTTP bloquant : exécuté hors de la boucle asyncio
+    return await asyncio.to_thread(translate_sync, text)
+
 # ---------------- FORMAT MESSAGE ----------------
 def format_message(title, summary):
     header = random.choice(TITLE_VARIANTS)
@@ -142,7 +173,7 @@ def compute_importance(entry):
     return score
 
 def select_most_important(entries, posted):
-    candidates = [e for e in entries if (e.get("id") or e.get("link") or e.get("title")) not in posted]
+    candidates = [e for e in entries if entry_key(e) not in posted]
     if not candidates:
         return None
     candidates.sort(key=compute_importance, reverse=True)
@@ -156,6 +187,11 @@ async def post_entry(entry, posted):
 
     if entry_id in posted:
         return False
+    # Même article déjà publié depuis une autre source (autre flux, canal Telegram)
+    if await asyncio.to_thread(post_archive.posted_about, post_archive.phrase(title)):
+        logger.info(f"⏭️ Déjà publié aujourd'hui : {title}")
+        posted.add(entry_id)
+        return False
 
     image_url = extract_image(entry)
     image_path = await download_image(image_url)
@@ -163,41 +199,75 @@ async def post_entry(entry, posted):
 
     for ch in CHANNELS:
         try:
-            if image_path:
-                with open(image_path, "rb") as img:
-                    await bot.send_photo(
+            with metrics.timer("telegram_send_seconds", channel=ch):
+                if image_path:
+                    with open(image_path, "rb") as img:
+                        sent = await bot.send_photo(
+                            chat_id=ch,
+                            photo=img,
+                            caption=message[:1024],
+                            parse_mode="HTML"
+                        )
+                else:
+                    sent = await bot.send_message(
                         chat_id=ch,
-                        photo=img,
-                        caption=message[:1024],
-                        parse_mode="HTML"
+                        text=message,
+                        parse_mode="HTML",
+                        disable_web_page_preview=True
                     )
-            else:
-                await bot.send_message(
-                    chat_id=ch,
-                    text=message,
-                    parse_mode="HTML",
-                    disable_web_page_preview=True
-                )
+            # Sans message_id, rien ne prouve que le message est en ligne : pas d'archive
+            message_id = getattr(sent, "message_id", None)
+            if not message_id:
+                raise RuntimeError(f"envoi non confirmé par Telegram sur {ch}")
             logger.info(f"✅ Publié sur {ch} : {title}")
+            post_archive.record(ch, message, entry.get("link") or RSS_FEED, message_id=message_id)
         except Exception as e:
+            metrics.inc("telegram_send_errors_total", channel=ch)
             logger.error(f"❌ Telegram error : {e}")
 
     posted.add(entry_id)
-    save_posted(posted)
+    await asyncio.to_thread(save_posted, set(posted))
     return True
 
 # ---------------- MAIN LOOP ----------------
+def fetch_feed():
+    try:
+        return feedparser.parse(http_client.get(RSS_FEED, ttl=0).content)
+    except Exception as e:
+        logger.error(f"❌ RSS error : {e}")
+        return feedparser.parse(b"")
+
 async def main_loop():
+    loop_monitor.monitor_loop()
     posted = load_posted()
+    feed_entries = []
+    # Articles des canaux Telegram en attente, notés comme ceux du flux RSS
+    channel_entries = []
+    ingestor = channel_ingest.start_ingest()
+    memory_watchdog.watch(
+        trim=lambda: trim_memory(posted, feed_entries, ingestor),
+        save_state=lambda: save_posted(posted)
+    )
     logger.info("🤖 Bot lancé et va poster un seul post toutes les 30 minutes")
 
     while True:
-        feed = feedparser.parse(RSS_FEED)
-        entries = feed.entries[:30]
+        feed = await asyncio.to_thread(fetch_feed)
+        if ingestor:
+            # Ce qui ne tient pas reste dans la file du lecteur, rien n'est jeté
+            drained = ingestor.drain(max(0, MAX_CHANNEL_ENTRIES - len(channel_entries)))
+            for e in channel_entries + drained:
+                if entry_key(e) in posted:
+                    ingestor.commit(e)
+            channel_entries = [e for e in channel_entries + drained if entry_key(e) not in posted]
+        feed_entries = feed.entries[:30]
+        entries = feed_entries + channel_entries
 
         post_to_send = select_most_important(entries, posted)
         if post_to_send:
             await post_entry(post_to_send, posted)
+            if ingestor:
+                # Le curseur du canal n'avance qu'une fois l'article traité
+                ingestor.commit(post_to_send)
         else:
             logger.info("⚠️ Aucun nouveau post à publier")
 
@@ -1,11 +1,26 @@
 import requests
+import http_client
+import metrics
+import tracing
+import post_archive
+import async_logging
+import logging
+from ratings import EloRatings, result_from_espn_event
+from teams import TEAMS, attach_ratings
+from combo_simulator import goals_from_score, simulate_combo
+from prediction_ledger import PredictionLedger
+from lookahead import LookaheadStore, fingerprint, parse_kickoff
+from xg_store import XGStore
+from kickoff_scheduler import KickoffScheduler, PUBLISH_OFFSET
+import argparse
 import datetime
 import os
 import sys
+import time
 import statistics
 import math
-from typing import List, Dict, Any, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import asdict, dataclass, replace
 
 # ================= ENV =================
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -17,10 +32,6 @@ print("DEBUG BOT_TOKEN:", "OK" if BOT_TOKEN else "MANQUANT")
 print("DEBUG CHANNEL_ID:", "OK" if CHANNEL_ID else "MANQUANT")
 print("DEBUG DEEPSEEK_API_KEY:", "OK" if DEEPSEEK_API_KEY else "MANQUANT - Utilisation de l'analyse locale")
 
-if not BOT_TOKEN or not CHANNEL_ID:
-    print("❌ Variables BOT_TOKEN ou CHANNEL_ID manquantes")
-    sys.exit(1)
-
 # ================= CONFIG =================
 LEAGUES = [
     "uefa.champions",
@@ -33,11 +44,27 @@ LEAGUES = [
     "ned.1"
 ]
 
-BIG_TEAMS = [
-    "Real Madrid", "Barcelona", "Manchester City", "Bayern Munich",
-    "Paris Saint-Germain", "Liverpool", "Arsenal", "Inter",
-    "Juventus", "AC Milan", "Chelsea", "Borussia Dortmund"
-]
+# Grosses équipes : tier 1 de l'index d'équipes (voir teams.py)
+BIG_TEAMS = TEAMS.big_team_names()
+
+# Bankroll de référence pour la mise Kelly des combinés (€)
+BANKROLL = 100.0
+
+# Nouvelles tentatives sur réponse 429 de Telegram
+TELEGRAM_MAX_RETRIES = 3
+
+# Seuils de confiance des deux combinés
+MEDIUM_MIN_CONFIDENCE = 6.0
+RISK_MIN_CONFIDENCE = 4.5
+
+# Mode --daemon : intervalle entre deux rafraîchissements (secondes)
+DAEMON_INTERVAL = int(os.getenv("DAEMON_INTERVAL", "600"))
+# Écart de confiance à partir duquel un pronostic déjà publié est republié
+REPUBLISH_CONFIDENCE_DELTA = 0.5
+# Statuts ESPN d'un match qui ne se jouera pas à l'horaire prévu
+CANCELLED_STATUSES = {"STATUS_POSTPONED", "STATUS_CANCELED", "STATUS_SUSPENDED", "STATUS_ABANDONED"}
+# Un match absent d'autant de lectures réussies de sa ligue est considéré comme retiré
+MISSING_REFRESHES_FOR_CANCEL = 3
 
 # Facteurs de pondération pour l'analyse locale
 WEIGHTS = {
@@ -45,9 +72,25 @@ WEIGHTS = {
     "big_team": 0.8,
     "form_recent": 1.5,
     "goals_difference": 0.3,
-    "champions_league": 0.9  # Réduit les nuls en Champions
+    "champions_league": 0.9,  # Réduit les nuls en Champions
+    "rating": 2.0  # Par tranche de 400 points Elo d'écart
 }
 
+# Notes Elo mises à jour à chaque résultat vu (voir ratings.py)
+RATINGS = EloRatings.load()
+attach_ratings(RATINGS)
+
+# Historique des pronostics et de leurs résultats (voir prediction_ledger.py)
+LEDGER = PredictionLedger()
+PENDING_RESULTS: Dict[int, str] = {}
+_calibration_tables: Dict[str, Dict] = {}
+
+# Formes et pronostics conservés d'un passage à l'autre (voir lookahead.py)
+LOOKAHEAD = LookaheadStore.load()
+
+# xG par équipe, alimenté hors ligne par `python xg_store.py ingest`
+XG = XGStore.load()
+
 # ================= DATA CLASSES =================
 @dataclass
 class TeamForm:
@@ -57,6 +100,8 @@ class TeamForm:
     gf: int
     ga: int
     matches_analyzed: int
+    xg_for: Optional[float] = None      # moyenne par match (xg_store.py)
+    xg_against: Optional[float] = None
     
     @property
     def points_per_game(self) -> float:
@@ -72,12 +117,16 @@ class TeamForm:
     
     @property
     def attack_strength(self) -> float:
+        if self.xg_for is not None:
+            return self.xg_for
         if self.matches_analyzed == 0:
             return 1.5
         return self.gf / self.matches_analyzed
     
     @property
     def defense_strength(self) -> float:
+        if self.xg_against is not None:
+            return self.xg_against
         if self.matches_analyzed == 0:
             return 1.5
         return self.ga / self.matches_analyzed
@@ -92,6 +141,11 @@ class MatchPrediction:
     analysis_text: str
     league: str
     score_probable: str
+    expected_home_goals: Optional[float] = None
+    expected_away_goals: Optional[float] = None
+    fixture_id: str = ""
+    # Confiance du modèle avant calibration, celle que le registre conserve
+    raw_confidence: Optional[float] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -114,13 +168,19 @@ class MatchPrediction:
             return "Match nul"
 
 # ================= UTILS =================
+async_logging.setup_logging("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+logger = logging.getLogger("main3")
+
 def log(msg: str) -> None:
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {msg}")
-    sys.stdout.flush()
+    # Écrit par le thread de async_logging, sans flush à chaque ligne
+    logger.info(msg)
 
 def send_telegram(message: str) -> bool:
     """Send message to Telegram channel"""
+    with tracing.span("telegram.send"):
+        return _send_telegram(message)
+
+def _send_telegram(message: str) -> bool:
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     try:
         # Échapper les caractères HTML problématiques
@@ -129,36 +189,71 @@ def send_telegram(message: str) -> bool:
                               .replace('>', '&gt;')
                               .replace('"', '&quot;'))
         
-        r = requests.post(url, json={
-            "chat_id": CHANNEL_ID,
-            "text": safe_message,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True
-        }, timeout=10)
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            with metrics.timer("telegram_send_seconds", channel=CHANNEL_ID):
+                r = http_client.post(url, json={
+                    "chat_id": CHANNEL_ID,
+                    "text": safe_message,
+                    "parse_mode": "HTML",
+                    "disable_web_page_preview": True
+                }, timeout=10)
+            metrics.inc("telegram_responses_total", channel=CHANNEL_ID, status=r.status_code)
+            if r.status_code != 429 or attempt == TELEGRAM_MAX_RETRIES:
+                break
+            # Flood control : Telegram indique combien de secondes attendre
+            retry_after = r.json().get("parameters", {}).get("retry_after", 1)
+            log(f"[TELEGRAM] 429, nouvel essai dans {retry_after}s")
+            time.sleep(retry_after)
         r.raise_for_status()
-        log(f"[TELEGRAM] Message envoyé (status={r.status_code})")
-        return True
+        return _confirm_sent(r, message)
     except requests.exceptions.RequestException as e:
+        metrics.inc("telegram_send_errors_total", channel=CHANNEL_ID)
         log(f"[ERROR TELEGRAM] Erreur d'envoi: {e}")
         # Essayer sans HTML en fallback
         try:
-            r = requests.post(url, json={
+            r = http_client.post(url, json={
                 "chat_id": CHANNEL_ID,
                 "text": message[:4090],  # Limite Telegram
                 "parse_mode": None
             }, timeout=10)
             log(f"[TELEGRAM Fallback] status={r.status_code}")
-            return r.status_code == 200
+            return r.status_code == 200 and _confirm_sent(r, message)
         except:
             return False
 
+def _confirm_sent(r: requests.Response, message: str) -> bool:
+    """Archive a send only when Telegram returned its message_id; otherwise count it as an error"""
+    try:
+        message_id = r.json().get("result", {}).get("message_id")
+    except ValueError:
+        message_id = None
+    if not message_id:
+        metrics.inc("telegram_send_errors_total", channel=CHANNEL_ID)
+        log(f"[ERROR TELEGRAM] Envoi non confirmé (status={r.status_code}, pas de message_id)")
+        return False
+    log(f"[TELEGRAM] Message envoyé (status={r.status_code})")
+    post_archive.record(CHANNEL_ID, message, "main3", message_id=message_id)
+    return True
+
 def get_matches_today(league: str) -> List[Dict]:
     """Get today's matches for a specific league"""
-    today = datetime.date.today().strftime("%Y%m%d")
-    url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{league}/scoreboard?dates={today}"
+    return get_matches_range(league, 1)
+
+def get_matches_range(league: str, days: int) -> List[Dict]:
+    """Get the matches of the next `days` days for a league in one request"""
+    return fetch_scoreboard(league, days) or []
+
+def fetch_scoreboard(league: str, days: int) -> Optional[List[Dict]]:
+    """Scoreboard events of the next `days` days, None when ESPN could not be read"""
+    start = datetime.date.today()
+    dates = start.strftime("%Y%m%d")
+    if days > 1:
+        dates += "-" + (start + datetime.timedelta(days=days - 1)).strftime("%Y%m%d")
+    url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{league}/scoreboard?dates={dates}&limit=1000"
     
     try:
-        response = requests.get(url, timeout=15)
+        with tracing.span("espn.scoreboard"):
+            response = http_client.get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
         events = data.get("events", [])
@@ -166,20 +261,21 @@ def get_matches_today(league: str) -> List[Dict]:
         return events
     except requests.exceptions.RequestException as e:
         log(f"[ERROR] {league} → Erreur réseau: {e}")
-        return []
+        return None
     except ValueError as e:
         log(f"[ERROR] {league} → Erreur JSON: {e}")
-        return []
+        return None
 
-def get_team_form(team_id: str, league: str) -> TeamForm:
-    """Get team form from last 5 matches"""
+def get_team_form(team_id: str, league: str, fresh: bool = False) -> TeamForm:
+    """Get team form from last 5 matches (fresh: bypass the HTTP cache)"""
     url = f"https://site.web.api.espn.com/apis/site/v2/sports/soccer/{league}/teams/{team_id}/schedule"
     
     wins = draws = losses = gf = ga = 0
     matches_analyzed = 0
     
     try:
-        response = requests.get(url, timeout=15)
+        with tracing.span("espn.schedule"):
+            response = http_client.get(url, timeout=15, ttl=0 if fresh else None)
         response.raise_for_status()
         data = response.json()
         
@@ -193,6 +289,7 @@ def get_team_form(team_id: str, league: str) -> TeamForm:
                 status_type = e.get("status", {}).get("type", {})
                 if status_type.get("completed") == True or status_type.get("id") == "3":
                     completed_matches.append(e)
+                    observe_result(e)
             except:
                 continue
         
@@ -230,46 +327,124 @@ def get_team_form(team_id: str, league: str) -> TeamForm:
     
     return TeamForm(wins, draws, losses, gf, ga, matches_analyzed)
 
+def cached_team_form(team_id: str, league: str, fresh: bool = False) -> TeamForm:
+    """Team form from the lookahead store, fetched again only once the team has played"""
+    key = f"{league}:{team_id}"
+    values = None if fresh else LOOKAHEAD.form(key)
+    if values is not None:
+        return TeamForm(*values)
+    form = get_team_form(team_id, league, fresh)
+    if form.matches_analyzed:
+        LOOKAHEAD.store_form(key, [form.wins, form.draws, form.losses, form.gf, form.ga, form.matches_analyzed])
+    return form
+
+def with_xg(form: TeamForm, team: str, team_id: str = None) -> TeamForm:
+    """Attach the team's recent xG averages from the local store, if any"""
+    strengths = XG.lookup(team, team_id)
+    if strengths is None:
+        return form
+    return replace(form, xg_for=round(strengths[0], 2), xg_against=round(strengths[1], 2))
+
+def match_fingerprint(home_id: str, away_id: str, home_form: TeamForm, away_form: TeamForm, league: str) -> str:
+    """Everything predict_match reads for one fixture"""
+    return fingerprint(
+        league, prediction_source(), WEIGHTS,
+        asdict(home_form), asdict(away_form),
+        # Notes arrondies : ratings.json ne garde que deux décimales
+        [round(r) if r is not None else None for r in (RATINGS.rating(home_id), RATINGS.rating(away_id))],
+        calibration_table(prediction_source())
+    )
+
+def observe_result(event: Dict) -> bool:
+    """Feed a completed ESPN event to the Elo ratings; True the first time a match is seen"""
+    result = result_from_espn_event(event)
+    if not result:
+        return False
+    match_id, _, home_id, away_id, hg, ag = result
+    if match_id.isdigit():
+        PENDING_RESULTS[int(match_id)] = "home_win" if hg > ag else "away_win" if ag > hg else "draw"
+    return RATINGS.update(match_id, home_id, away_id, hg, ag)
+
+def prediction_source() -> str:
+    return "deepseek" if DEEPSEEK_API_KEY else "local"
+
+def calibration_table(source: str) -> Dict:
+    if source not in _calibration_tables:
+        _calibration_tables[source] = LEDGER.hit_rate_by_confidence(source)
+    return _calibration_tables[source]
+
+def calibrate(confidence: float) -> float:
+    """Replace a confidence by the hit rate its bucket actually achieved, when known"""
+    source = prediction_source()
+    return LEDGER.calibrated_confidence(confidence, source, calibration_table(source))
+
+def record_predictions(predictions: List[MatchPrediction]) -> int:
+    """Append today's predictions to the ledger (each fixture once per source)"""
+    rows = [p for p in predictions if str(p.fixture_id).isdigit()]
+    if not rows:
+        return 0
+    source = prediction_source()
+    known = LEDGER.has_fixture([p.fixture_id for p in rows], source)
+    # La confiance brute : calibrer depuis des valeurs déjà calibrées bouclerait sur elle-même
+    return LEDGER.append(
+        (p.fixture_id, p.league, source, p.prediction,
+         p.confidence if p.raw_confidence is None else p.raw_confidence, p.odds)
+        for p, seen in zip(rows, known) if not seen
+    )
+
+def expected_goals(home_form: TeamForm, away_form: TeamForm) -> Tuple[float, float]:
+    """Expected goals from attack/defense strengths (simplified Poisson means)"""
+    expected_home_goals = max(0.1, (home_form.attack_strength + away_form.defense_strength) / 2)
+    expected_away_goals = max(0.1, (away_form.attack_strength + home_form.defense_strength) / 2)
+    return expected_home_goals, expected_away_goals
+
+def is_big_team(team: str, team_id: str = None) -> bool:
+    return TEAMS.is_big(team, team_id)
+
+def strength_bonus(team: str, team_id: str = None) -> float:
+    """Elo-based strength above the 1500 baseline, big-team bonus while unrated"""
+    rating = RATINGS.rating(team_id) if team_id else None
+    if rating is not None:
+        return (rating - 1500.0) / 400 * WEIGHTS["rating"]
+    return WEIGHTS["big_team"] if is_big_team(team, team_id) else 0
+
 # ================= LOCAL ANALYSIS (INTELLIGENT FALLBACK) =================
 def analyze_match_locally(
     home_team: str,
     away_team: str,
     home_form: TeamForm,
     away_form: TeamForm,
-    league: str
+    league: str,
+    home_id: str = None,
+    away_id: str = None
 ) -> Tuple[str, float, str, str]:
     """
     Analyse locale intelligente basée sur les statistiques
     Retourne: (prediction, confidence, analysis_text, probable_score)
     """
     
-    is_home_big = home_team in BIG_TEAMS
-    is_away_big = away_team in BIG_TEAMS
+    is_home_big = is_big_team(home_team, home_id)
+    is_away_big = is_big_team(away_team, away_id)
     is_champions = "champions" in league
+    home_rating = RATINGS.rating(home_id) if home_id else None
+    away_rating = RATINGS.rating(away_id) if away_id else None
     
     # Calcul des forces de base
     home_strength = (
         home_form.points_per_game * WEIGHTS["form_recent"] +
         home_form.goal_difference_per_game * WEIGHTS["goals_difference"] +
         (WEIGHTS["home_advantage"] if not is_champions else WEIGHTS["home_advantage"] * 0.9) +
-        (WEIGHTS["big_team"] if is_home_big else 0)
+        strength_bonus(home_team, home_id)
     )
     
     away_strength = (
         away_form.points_per_game * WEIGHTS["form_recent"] +
         away_form.goal_difference_per_game * WEIGHTS["goals_difference"] +
-        (WEIGHTS["big_team"] if is_away_big else 0)
+        strength_bonus(away_team, away_id)
     )
     
-    # Calcul des attaques/défenses attendues
-    home_attack = home_form.attack_strength
-    home_defense = home_form.defense_strength
-    away_attack = away_form.attack_strength
-    away_defense = away_form.defense_strength
-    
     # Buts attendus (formule Poisson simplifiée)
-    expected_home_goals = max(0.1, (home_attack + away_defense) / 2)
-    expected_away_goals = max(0.1, (away_attack + home_defense) / 2)
+    expected_home_goals, expected_away_goals = expected_goals(home_form, away_form)
     
     # Probabilités des résultats
     # Victoire domicile
@@ -344,7 +519,9 @@ def analyze_match_locally(
         if form_desc:
             analysis_parts.append(f"Forme: {home_team} en {form_desc[0]}, {away_team} en {form_desc[1]}.")
     
-    if is_home_big or is_away_big:
+    if home_rating is not None and away_rating is not None:
+        analysis_parts.append(f"Elo: {home_team} {home_rating:.0f} / {away_team} {away_rating:.0f}.")
+    elif is_home_big or is_away_big:
         big_teams = []
         if is_home_big:
             big_teams.append(home_team)
@@ -380,12 +557,14 @@ def analyze_match_with_deepseek(
     away_team: str,
     home_form: TeamForm,
     away_form: TeamForm,
-    league: str
+    league: str,
+    home_id: str = None,
+    away_id: str = None
 ) -> Tuple[str, float, str, str]:
     """Analyze match using DeepSeek API (if available)"""
     
     if not DEEPSEEK_API_KEY:
-        return analyze_match_locally(home_team, away_team, home_form, away_form, league)
+        return analyze_match_locally(home_team, away_team, home_form, away_form, league, home_id, away_id)
     
     try:
         from openai import OpenAI
@@ -410,7 +589,7 @@ def analyze_match_with_deepseek(
         Forme {away_team} (5 derniers): {away_form.wins}V, {away_form.draws}N, {away_form.losses}D
         Buts: {away_form.gf} pour, {away_form.ga} contre
         
-        Grosse équipe: {home_team in BIG_TEAMS} / {away_team in BIG_TEAMS}
+        Grosse équipe: {is_big_team(home_team, home_id)} / {is_big_team(away_team, away_id)}
         
         Réponds exactement dans ce format:
         PRONOSTIC: ...
@@ -419,15 +598,16 @@ def analyze_match_with_deepseek(
         ANALYSE: ...
         """
         
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": "Expert en analyse footballistique. Sois concis et précis."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=200
-        )
+        with tracing.span("deepseek"):
+            response = client.chat.completions.create(
+                model="deepseek-chat",
+                messages=[
+                    {"role": "system", "content": "Expert en analyse footballistique. Sois concis et précis."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=200
+            )
         
         result = response.choices[0].message.content.strip()
         lines = result.split('\n')
@@ -458,7 +638,7 @@ def analyze_match_with_deepseek(
     except Exception as e:
         log(f"[WARN] DeepSeek non disponible: {e}")
         # Fallback sur l'analyse locale
-        return analyze_match_locally(home_team, away_team, home_form, away_form, league)
+        return analyze_match_locally(home_team, away_team, home_form, away_form, league, home_id, away_id)
 
 def calculate_odds(prediction: str, confidence: float, home_big: bool, away_big: bool) -> float:
     """Calculate realistic odds"""
@@ -482,25 +662,32 @@ def predict_match(
     away_team: str,
     home_form: TeamForm,
     away_form: TeamForm,
-    league: str
+    league: str,
+    home_id: str = None,
+    away_id: str = None
 ) -> MatchPrediction:
     """Create match prediction"""
     
     # Utiliser DeepSeek si disponible, sinon analyse locale
     if DEEPSEEK_API_KEY:
         prediction, confidence, analysis, score = analyze_match_with_deepseek(
-            home_team, away_team, home_form, away_form, league
+            home_team, away_team, home_form, away_form, league, home_id, away_id
         )
     else:
         prediction, confidence, analysis, score = analyze_match_locally(
-            home_team, away_team, home_form, away_form, league
+            home_team, away_team, home_form, away_form, league, home_id, away_id
         )
     
+    raw_confidence = confidence
+    confidence = calibrate(raw_confidence)
+    
     # Calcul des cotes
-    is_home_big = home_team in BIG_TEAMS
-    is_away_big = away_team in BIG_TEAMS
+    is_home_big = is_big_team(home_team, home_id)
+    is_away_big = is_big_team(away_team, away_id)
     odds = calculate_odds(prediction, confidence, is_home_big, is_away_big)
     
+    expected_home_goals, expected_away_goals = expected_goals(home_form, away_form)
+    
     # Format de la ligue
     league_parts = league.split(".")
     if len(league_parts) > 1:
@@ -516,7 +703,10 @@ def predict_match(
         odds=odds,
         analysis_text=analysis[:200],  # Limiter la longueur
         league=league_name,
-        score_probable=score
+        score_probable=score,
+        expected_home_goals=expected_home_goals,
+        expected_away_goals=expected_away_goals,
+        raw_confidence=raw_confidence
     )
 
 # ================= DIVERSIFICATION =================
@@ -539,9 +729,11 @@ def diversify_predictions(predictions: List[MatchPrediction]) -> List[MatchPredi
             # Changer en victoire domicile (simplifié)
             pred.prediction = "home_win"
             pred.confidence *= 0.85  # Réduire la confiance après modification
+            if pred.raw_confidence is not None:
+                pred.raw_confidence *= 0.85
             # Recalculer la cote
-            is_home_big = pred.home_team in BIG_TEAMS
-            is_away_big = pred.away_team in BIG_TEAMS
+            is_home_big = is_big_team(pred.home_team)
+            is_away_big = is_big_team(pred.away_team)
             pred.odds = calculate_odds("home_win", pred.confidence, is_home_big, is_away_big)
             pred.analysis_text = "Match initialement équilibré, léger avantage domicile."
             pred.score_probable = "1-0"
@@ -590,19 +782,30 @@ def format_combo_message(title: str, predictions: List[MatchPrediction], risk_le
             f"   <i>{pred.analysis_text[:80]}...</i>\n\n"
         )
     
-    # Calcul de la mise recommandée
-    if risk_level == "MEDIUM":
-        stake = min(15, max(3, round(25 / total_odds, 2)))
-    else:
-        stake = min(8, max(1, round(15 / total_odds, 2)))
+    # Simulation Monte Carlo du combiné (scores Poisson par match)
+    legs = []
+    for pred in predictions:
+        if pred.expected_home_goals is not None and pred.expected_away_goals is not None:
+            lam_home, lam_away = pred.expected_home_goals, pred.expected_away_goals
+        else:
+            lam_home, lam_away = goals_from_score(pred.score_probable)
+        legs.append((lam_home, lam_away, pred.prediction, pred.odds))
+    combo = simulate_combo(legs)
+    
+    # Mise recommandée : Kelly fractionné, plafonné selon le niveau de risque
+    max_stake = 15 if risk_level == "MEDIUM" else 8
+    stake = combo.stake(BANKROLL, max_stake)
     
     potential_win = round(stake * total_odds, 2)
-    roi = round((potential_win - stake) / stake * 100, 1)
+    roi = round((total_odds - 1) * 100, 1)
+    stake_text = f"{stake}€" if stake > 0 else "0€ (pas de value)"
     
     message += (
         f"<b>📈 RÉCAPITULATIF</b>\n"
         f"• Cote combinée: <b>{round(total_odds, 2)}</b>\n"
-        f"• Mise conseillée: <b>{stake}€</b>\n"
+        f"• Probabilité estimée: <b>{combo.win_probability * 100:.1f}%</b>\n"
+        f"• Espérance: <b>{combo.expected_return * 100:+.1f}%</b> (écart-type {combo.std_dev:.2f})\n"
+        f"• Mise conseillée (Kelly ¼): <b>{stake_text}</b>\n"
         f"• Gain potentiel: <b>{potential_win}€</b> (+{roi}%)\n\n"
         f"<i>⚠️ Paris responsables | Résultats basés sur analyse statistique</i>"
     )
@@ -610,81 +813,124 @@ def format_combo_message(title: str, predictions: List[MatchPrediction], risk_le
     return message
 
 # ================= MAIN =================
-def main():
-    log("🚀 Bot de pronostics avancé démarré")
-    send_telegram("🤖 <b>Bot Pronostics activé</b>\nAnalyse en cours...")
+def fetch_fixtures(days: int = 1) -> Tuple[List[Tuple[str, Dict]], set]:
+    """(league, ESPN event) for every fixture of the window, and the leagues that could not be read"""
+    fixtures = []
+    failed = set()
+    kickoffs: Dict[str, List[float]] = {}
+    with tracing.span("fixtures"):
+        for league in LEAGUES:
+            events = fetch_scoreboard(league, days)
+            if events is None:
+                failed.add(league)
+                continue
+            for match in events:
+                fixtures.append((league, match))
+                kickoff = parse_kickoff(match.get("date", ""))
+                for c in match.get("competitions", [{}])[0].get("competitors", []):
+                    kickoffs.setdefault(f"{league}:{c.get('team', {}).get('id')}", []).append(kickoff)
+        LOOKAHEAD.note_kickoffs(kickoffs)
+    return fixtures, failed
+
+def predict_fixture(league: str, match: Dict, fresh: bool = False) -> Optional[Tuple[MatchPrediction, Optional[float]]]:
+    """Prediction for one scheduled fixture, reused from the lookahead store when its inputs are unchanged"""
+    comp = match.get("competitions", [{}])[0]
+    competitors = comp.get("competitors", [])
     
-    all_predictions = []
+    if len(competitors) < 2:
+        return None
     
-    log("📊 Collecte des matchs du jour...")
+    h, a = competitors[0], competitors[1]
+    home_team = h.get("team", {}).get("displayName", "Inconnu")
+    away_team = a.get("team", {}).get("displayName", "Inconnu")
+    home_id = h.get("team", {}).get("id")
+    away_id = a.get("team", {}).get("id")
     
-    for league in LEAGUES:
-        events = get_matches_today(league)
-        
-        for match in events:
-            try:
-                comp = match.get("competitions", [{}])[0]
-                competitors = comp.get("competitors", [])
-                
-                if len(competitors) < 2:
-                    continue
-                
-                h, a = competitors[0], competitors[1]
-                home_team = h.get("team", {}).get("displayName", "Inconnu")
-                away_team = a.get("team", {}).get("displayName", "Inconnu")
-                home_id = h.get("team", {}).get("id")
-                away_id = a.get("team", {}).get("id")
-                
-                if not home_id or not away_id:
-                    continue
-                
-                # Vérifier si le match n'a pas encore commencé
-                status = match.get("status", {}).get("type", {})
-                if status.get("id") != "1":  # 1 = programmé
-                    log(f"[SKIP] {home_team} vs {away_team} - Match déjà commencé")
-                    continue
-                
-                # Obtenir les formes des équipes
-                log(f"[ANALYSE] {home_team} vs {away_team}")
-                home_form = get_team_form(home_id, league)
-                away_form = get_team_form(away_id, league)
-                
-                # Générer la prédiction
-                prediction = predict_match(home_team, away_team, home_form, away_form, league)
-                all_predictions.append(prediction)
-                
-                log(f"[PRONO] {home_team} vs {away_team}: {prediction.get_pick_text()} ({prediction.confidence:.1f}/10)")
-                
-            except Exception as e:
-                log(f"[ERROR] Traitement match: {e}")
-                continue
+    if not home_id or not away_id:
+        return None
     
-    if not all_predictions:
-        log("❌ Aucun match à analyser aujourd'hui")
-        send_telegram("ℹ️ <b>Aucun match programmé aujourd'hui</b> dans les ligues suivies.")
-        return
+    # Vérifier si le match n'a pas encore commencé
+    status = match.get("status", {}).get("type", {})
+    if status.get("id") != "1":  # 1 = programmé
+        log(f"[SKIP] {home_team} vs {away_team} - Match déjà commencé")
+        return None
+    
+    # Obtenir les formes des équipes
+    log(f"[ANALYSE] {home_team} vs {away_team}")
+    with tracing.span("form"):
+        home_form = with_xg(cached_team_form(home_id, league, fresh), home_team, home_id)
+        away_form = with_xg(cached_team_form(away_id, league, fresh), away_team, away_id)
+    
+    # Réutiliser le pronostic précédent si rien n'a changé
+    fixture_id = str(match.get("id", ""))
+    kickoff = parse_kickoff(match.get("date", ""))
+    fp = match_fingerprint(home_id, away_id, home_form, away_form, league)
+    cached = LOOKAHEAD.prediction(fixture_id, fp)
+    if cached is not None:
+        prediction = MatchPrediction(**cached)
+    else:
+        with tracing.span("predict"):
+            prediction = predict_match(home_team, away_team, home_form, away_form, league, home_id, away_id)
+        prediction.fixture_id = fixture_id
+        LOOKAHEAD.store_prediction(fixture_id, fp, kickoff, asdict(prediction))
     
+    log(f"[PRONO] {home_team} vs {away_team}: {prediction.get_pick_text()} ({prediction.confidence:.1f}/10)")
+    return prediction, kickoff
+
+def collect_predictions(days: int = 1) -> List[Tuple[MatchPrediction, Optional[float]]]:
+    """Predictions for every upcoming fixture of the window, recomputed only when their inputs changed"""
+    results = []
+    fixtures, _ = fetch_fixtures(days)
+    for league, match in fixtures:
+        try:
+            predicted = predict_fixture(league, match)
+            if predicted is not None:
+                results.append(predicted)
+        except Exception as e:
+            log(f"[ERROR] Traitement match: {e}")
+            continue
+    return results
+
+def save_state() -> int:
+    """Persist ratings, teams and lookahead caches, settle finished predictions"""
+    with tracing.span("save"):
+        RATINGS.save()
+        TEAMS.save()
+        LOOKAHEAD.save()
+        settled = LEDGER.settle(PENDING_RESULTS)
+    if settled:
+        # Nouveaux résultats : les taux de réussite par seau ont changé
+        _calibration_tables.clear()
+    return settled
+
+def publish_predictions(all_predictions: List[MatchPrediction]) -> List[MatchPrediction]:
+    """Send the MEDIUM and RISK combos plus the day's statistics; returns the published predictions"""
     # Trier par confiance
     all_predictions.sort(key=lambda x: x.confidence, reverse=True)
     
     # Sélectionner les pronostics MEDIUM (confiance >= 6.0)
-    medium_predictions = [p for p in all_predictions if p.confidence >= 6.0][:3]
+    medium_predictions = [p for p in all_predictions if p.confidence >= MEDIUM_MIN_CONFIDENCE][:3]
     
     # Sélectionner les pronostics RISK (confiance >= 4.5)
-    remaining = [p for p in all_predictions if p not in medium_predictions and p.confidence >= 4.5]
+    remaining = [p for p in all_predictions if p not in medium_predictions and p.confidence >= RISK_MIN_CONFIDENCE]
     risk_predictions = remaining[:5]
-    risk_predictions = diversify_predictions(risk_predictions)
+    with tracing.span("diversify"):
+        risk_predictions = diversify_predictions(risk_predictions)
     
     # Envoyer les messages Telegram
     if medium_predictions:
-        send_telegram(format_combo_message("🔵 COMBINÉ SÉCURISÉ", medium_predictions, "MEDIUM"))
+        with tracing.span("format"):
+            message = format_combo_message("🔵 COMBINÉ SÉCURISÉ", medium_predictions, "MEDIUM")
+        send_telegram(message)
         log(f"✅ {len(medium_predictions)} pronostic(s) MEDIUM envoyé(s)")
     else:
         send_telegram("ℹ️ <b>Aucun pronostic sécurisé aujourd'hui</b>\n(Seuil de confiance: ≥6.0/10)")
         log("⚠️ Aucun pronostic MEDIUM (confiance < 6.0)")
     
     if risk_predictions:
-        send_telegram(format_combo_message("🔴 COMBINÉ RISK", risk_predictions, "RISK"))
+        with tracing.span("format"):
+            message = format_combo_message("🔴 COMBINÉ RISK", risk_predictions, "RISK")
+        send_telegram(message)
         log(f"✅ {len(risk_predictions)} pronostic(s) RISK envoyé(s)")
     else:
         send_telegram("ℹ️ <b>Aucun pronostic risk aujourd'hui</b>\n(Seuil de confiance: ≥4.5/10)")
@@ -704,7 +950,339 @@ def main():
     )
     send_telegram(stats_msg)
     
+    with tracing.span("ledger"):
+        recorded = record_predictions(all_predictions)
+    log(f"[LEDGER] {recorded} pronostic(s) enregistré(s)")
+    for bucket, (n, rate) in sorted(LEDGER.hit_rate_by_confidence(prediction_source()).items()):
+        log(f"[LEDGER] Confiance {bucket}/10 → {rate * 100:.0f}% de réussite ({n} pronostics)")
+    return medium_predictions + risk_predictions
+
+def main(lookahead_days: int = 1):
+    if not BOT_TOKEN or not CHANNEL_ID:
+        print("❌ Variables BOT_TOKEN ou CHANNEL_ID manquantes")
+        sys.exit(1)
+
+    log("🚀 Bot de pronostics avancé démarré")
+    send_telegram("🤖 <b>Bot Pronostics activé</b>\nAnalyse en cours...")
+    
+    log("📊 Collecte des matchs du jour..." if lookahead_days == 1 else f"📊 Collecte des matchs des {lookahead_days} prochains jours...")
+    today = datetime.date.today()
+    with tracing.span("collect"):
+        collected = collect_predictions(lookahead_days)
+    all_predictions = [
+        p for p, kickoff in collected
+        if lookahead_days == 1 or kickoff is None or datetime.date.fromtimestamp(kickoff) == today
+    ]
+    log(f"[LOOKAHEAD] {LOOKAHEAD.report()}")
+    
+    # Les résultats vus pendant la collecte des formes ont mis à jour les notes
+    settled = save_state()
+    log(f"[LEDGER] {settled} pronostic(s) soldé(s)")
+    
+    if not all_predictions:
+        log("❌ Aucun match à analyser aujourd'hui")
+        send_telegram("ℹ️ <b>Aucun match programmé aujourd'hui</b> dans les ligues suivies.")
+        log("[TRACE] Durée par étape\n" + tracing.summary_table())
+        return
+    
+    publish_predictions(all_predictions)
+    
     log(f"✅ Analyse terminée! {len(all_predictions)} match(s) analysé(s)")
+    log(f"[HTTP] Cache: {http_client.stats()}")
+    log("[TRACE] Durée par étape\n" + tracing.summary_table())
+
+# ================= DAEMON =================
+@dataclass
+class WatchedFixture:
+    league: str
+    signature: Tuple
+    prediction: Optional[MatchPrediction] = None
+    kickoff: Optional[float] = None
+    # Pronostic tel qu'il a été publié (None si le match n'est dans aucun combiné)
+    published: Optional[MatchPrediction] = None
+    # Lectures réussies de la ligue consécutives sans ce match
+    missing: int = 0
+
+def fixture_signature(match: Dict) -> Tuple:
+    """Inputs of a fixture that come from the scoreboard: kick-off, status, teams"""
+    competitors = match.get("competitions", [{}])[0].get("competitors", [])
+    return (
+        match.get("date", ""),
+        match.get("status", {}).get("type", {}).get("name"),
+        tuple(str(c.get("team", {}).get("id")) for c in competitors)
+    )
+
+def fixture_teams(league: str, match: Dict) -> List[str]:
+    return [f"{league}:{c.get('team', {}).get('id')}" for c in match.get("competitions", [{}])[0].get("competitors", [])]
+
+def kickoff_text(kickoff: Optional[float]) -> str:
+    if not kickoff:
+        return "?"
+    moment = datetime.datetime.fromtimestamp(kickoff)
+    return moment.strftime("%H:%M" if moment.date() == datetime.date.today() else "%d/%m %H:%M")
+
+def format_update_message(changes: List[Tuple[str, WatchedFixture, Optional[MatchPrediction]]]) -> str:
+    """Telegram message listing only the predictions that changed since publication"""
+    message = f"<b>🔄 MISE À JOUR DES PRONOSTICS</b>\n📅 {datetime.date.today().strftime('%d/%m/%Y')}\n\n"
+    for kind, watched, before in changes:
+        pred = watched.prediction or before
+        teams = f"<b>{pred.home_team} - {pred.away_team}</b>"
+        if kind == "cancelled":
+            message += f"⏸️ {teams}\n   Match reporté ou annulé, pronostic retiré\n\n"
+            continue
+        line = f"{pred.get_pick_text()} ({pred.confidence:.1f}/10) | 💰 <b>{pred.odds}</b>"
+        if kind == "new":
+            message += f"🆕 {teams} ({kickoff_text(watched.kickoff)})\n   {line}\n\n"
+        elif kind == "kickoff":
+            message += f"🕒 {teams}\n   Nouvel horaire: {kickoff_text(watched.kickoff)} | {line}\n\n"
+        else:
+            message += f"✏️ {teams}\n   Avant: {before.get_pick_text()} ({before.confidence:.1f}/10) → {line}\n\n"
+    return message + "<i>⚠️ Paris responsables | Les autres pronostics du jour restent valables</i>"
+
+class PredictionDaemon:
+    """Keeps the window's fixtures and predictions in memory and only recomputes what changed"""
+
+    def __init__(self, lookahead_days: int = 1, scheduler: Optional[KickoffScheduler] = None):
+        self.days = lookahead_days
+        # Avec un planning, chaque match est publié peu avant son coup d'envoi
+        self.scheduler = scheduler
+        self.fixtures: Dict[str, WatchedFixture] = {}
+        self.day: Optional[datetime.date] = None
+        self.recomputed = 0
+        # Table de calibration utilisée au dernier rafraîchissement
+        self.calibration: Optional[Dict] = None
+
+    def refresh(self) -> List[Tuple[str, WatchedFixture, Optional[MatchPrediction]]]:
+        """Poll the scoreboards, recompute the affected fixtures, return the changes worth re-publishing"""
+        seen: Dict[str, Tuple[str, Dict]] = {}
+        played = set()
+        fixtures, failed = fetch_fixtures(self.days)
+        for league, match in fixtures:
+            fixture_id = str(match.get("id", ""))
+            if not fixture_id:
+                continue
+            seen[fixture_id] = (league, match)
+            # Un nouveau résultat change les notes et la forme de ces deux équipes
+            if observe_result(match):
+                played.update(fixture_teams(league, match))
+
+        # Des pronostics soldés depuis le dernier passage changent la confiance affichée
+        calibration = calibration_table(prediction_source())
+        recalibrated = self.calibration is not None and calibration != self.calibration
+        self.calibration = calibration
+
+        changes = []
+        for fixture_id, watched in list(self.fixtures.items()):
+            # Ligue illisible cette fois : l'absence ne prouve rien
+            if fixture_id in seen or watched.league in failed:
+                continue
+            # Un match reporté garde un statut ESPN ; une seule absence peut être un trou de l'API
+            watched.missing += 1
+            if watched.missing < MISSING_REFRESHES_FOR_CANCEL:
+                continue
+            self.fixtures.pop(fixture_id)
+            if self.scheduler is not None:
+                self.scheduler.cancel(fixture_id)
+            if watched.published and (watched.kickoff is None or watched.kickoff > time.time()):
+                changes.append(("cancelled", watched, watched.published))
+
+        for fixture_id, (league, match) in seen.items():
+            watched = self.fixtures.get(fixture_id)
+            signature = fixture_signature(match)
+            status = match.get("status", {}).get("type", {})
+
+            if status.get("name") in CANCELLED_STATUSES:
+                if watched and watched.published:
+                    changes.append(("cancelled", watched, watched.published))
+                self.fixtures.pop(fixture_id, None)
+                if self.scheduler is not None:
+                    self.scheduler.cancel(fixture_id)
+                continue
+            if status.get("id") != "1":
+                # Commencé ou terminé : plus rien à publier
+                self.fixtures.pop(fixture_id, None)
+                continue
+
+            if watched is not None:
+                watched.missing = 0
+            affected = played.intersection(fixture_teams(league, match))
+            if watched is not None and watched.signature == signature and not affected and not recalibrated:
+                continue  # entrées inchangées, aucun travail
+
+            try:
+                predicted = predict_fixture(league, match, fresh=bool(affected))
+            except Exception as e:
+                log(f"[ERROR] Traitement match: {e}")
+                continue
+            if predicted is None:
+                continue
+            self.recomputed += 1
+            prediction, kickoff = predicted
+            current = WatchedFixture(league, signature, prediction, kickoff,
+                                     watched.published if watched else None)
+            self.fixtures[fixture_id] = current
+
+            if self.scheduler is not None and current.published is None:
+                if self.scheduler.is_done(fixture_id):
+                    # Publié avant un redémarrage : suivi comme les autres publiés
+                    current.published = replace(prediction)
+                elif kickoff and prediction.confidence >= RISK_MIN_CONFIDENCE:
+                    self.scheduler.schedule(fixture_id, kickoff, {"home": prediction.home_team, "away": prediction.away_team})
+                else:
+                    self.scheduler.cancel(fixture_id)
+                continue
+
+            before = current.published
+            if watched is None:
+                if kickoff and datetime.date.fromtimestamp(kickoff) == datetime.date.today() \
+                        and prediction.confidence >= RISK_MIN_CONFIDENCE:
+                    changes.append(("new", current, None))
+            elif before is not None:
+                if watched.kickoff != kickoff:
+                    changes.append(("kickoff", current, before))
+                elif (prediction.prediction != before.prediction
+                      or abs(prediction.confidence - before.confidence) >= REPUBLISH_CONFIDENCE_DELTA):
+                    changes.append(("updated", current, before))
+        return changes
+
+    def today_predictions(self) -> List[MatchPrediction]:
+        today = datetime.date.today()
+        return [
+            w.prediction for w in self.fixtures.values()
+            if w.prediction and (w.kickoff is None or datetime.date.fromtimestamp(w.kickoff) == today)
+        ]
+
+    def mark_published(self, predictions: List[MatchPrediction]) -> None:
+        # Référence : le pronostic calculé, avant diversify_predictions
+        published_ids = {p.fixture_id for p in predictions}
+        for fixture_id, watched in self.fixtures.items():
+            if fixture_id in published_ids and watched.prediction:
+                watched.published = replace(watched.prediction)
+
+    def tick(self) -> None:
+        tracing.reset()
+        with tracing.span("refresh"):
+            changes = self.refresh()
+        settled = save_state()
+        PENDING_RESULTS.clear()
+
+        if self.scheduler is None and self.day != datetime.date.today():
+            # Nouveau jour : publication complète, les changements sont inclus
+            self.day = datetime.date.today()
+            predictions = self.today_predictions()
+            log(f"📊 {len(predictions)} match(s) aujourd'hui, publication des combinés")
+            if predictions:
+                self.mark_published(publish_predictions([replace(p) for p in predictions]))
+            else:
+                send_telegram("ℹ️ <b>Aucun match programmé aujourd'hui</b> dans les ligues suivies.")
+        elif changes:
+            send_telegram(format_update_message(changes))
+            self.mark_published([w.prediction for kind, w, _ in changes if kind != "cancelled"])
+            record_predictions([w.prediction for kind, w, _ in changes if kind == "new"])
+            log(f"🔄 {len(changes)} pronostic(s) republié(s)")
+        if self.scheduler is not None:
+            self.scheduler.save()
+            log(f"[PLANNING] {self.scheduler.report()}")
+        log(f"[DAEMON] {len(self.fixtures)} match(s) suivis, {self.recomputed} recalculé(s), "
+            f"{settled} soldé(s) | {LOOKAHEAD.report()}")
+        self.recomputed = 0
+
+    def publish_due(self) -> int:
+        """Publish the fixtures whose kick-off is near, one message per group of close kick-offs"""
+        if self.scheduler is None:
+            return 0
+        groups = self.scheduler.pop_due()
+        for group in groups:
+            known = [job for job in group if job["key"] in self.fixtures and self.fixtures[job["key"]].prediction]
+            unknown = [job["key"] for job in group if job not in known]
+            if unknown:
+                # Pronostic pas encore (re)calculé : le prochain rafraîchissement peut le fournir
+                requeued = self.scheduler.retry(unknown)
+                log(f"[PLANNING] {len(unknown)} match(s) sans pronostic, {requeued} replanifié(s)")
+            if not known:
+                continue
+            keys = [job["key"] for job in known]
+            try:
+                predictions = [self.fixtures[key].prediction for key in keys]
+                predictions.sort(key=lambda p: p.confidence, reverse=True)
+                risk_level = "MEDIUM" if all(p.confidence >= MEDIUM_MIN_CONFIDENCE for p in predictions) else "RISK"
+                times = sorted({kickoff_text(job["kickoff"]) for job in known})
+                with tracing.span("format"):
+                    message = format_combo_message(f"⏰ COUP D'ENVOI {' / '.join(times)}",
+                                                   [replace(p) for p in predictions], risk_level)
+                sent = send_telegram(message)
+            except Exception as e:
+                log(f"[ERROR] Préparation publication planifiée: {e}")
+                sent = False
+            if not sent:
+                requeued = self.scheduler.retry(keys)
+                log(f"[ERROR] Envoi échoué, {requeued}/{len(keys)} match(s) replanifié(s)")
+                continue
+            self.scheduler.mark_done(keys)
+            self.mark_published(predictions)
+            record_predictions(predictions)
+            log(f"✅ {len(predictions)} pronostic(s) publié(s) avant le coup d'envoi ({', '.join(times)})")
+        if groups:
+            self.scheduler.save()
+        return len(groups)
+
+def run_daemon(lookahead_days: int = 1, interval: int = DAEMON_INTERVAL, kickoff_offset: Optional[int] = None):
+    """Long-running mode: refresh every `interval` seconds and re-publish only what changed
+
+    With kickoff_offset (minutes), each fixture is published that long before its kick-off
+    instead of all combos at the start of the day.
+    """
+    if not BOT_TOKEN or not CHANNEL_ID:
+        print("❌ Variables BOT_TOKEN ou CHANNEL_ID manquantes")
+        sys.exit(1)
+    log(f"🚀 Bot de pronostics démarré en continu (rafraîchissement toutes les {interval}s)")
+    scheduler = None
+    if kickoff_offset is not None:
+        scheduler = KickoffScheduler.load(offset=kickoff_offset * 60)
+        log(f"⏰ Publication {kickoff_offset} min avant chaque coup d'envoi | {scheduler.report()}")
+    daemon = PredictionDaemon(lookahead_days, scheduler)
+    next_refresh = 0.0
+    try:
+        while True:
+            if time.time() >= next_refresh:
+                try:
+                    daemon.tick()
+                except Exception as e:
+                    log(f"[ERROR] Rafraîchissement: {e}")
+                next_refresh = time.time() + interval
+            try:
+                daemon.publish_due()
+            except Exception as e:
+                log(f"[ERROR] Publication planifiée: {e}")
+            # Réveil au prochain rafraîchissement ou à la prochaine publication
+            wake = next_refresh
+            due = scheduler.next_due() if scheduler is not None else None
+            if due is not None:
+                wake = min(wake, due)
+            time.sleep(max(1.0, wake - time.time()))
+    except KeyboardInterrupt:
+        save_state()
+        log("👋 Arrêt du mode continu")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pronostics football → Telegram")
+    parser.add_argument("--lookahead", type=int, default=1, metavar="N",
+                        help="précalculer les pronostics des N prochains jours (publication du jour seulement)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="FICHIER",
+                        help="profiler le passage (profile.folded ou profile.prof selon --profile-mode par défaut)")
+    parser.add_argument("--profile-mode", choices=["sample", "cprofile"], default="sample",
+                        help="sample : échantillonnage (.folded), cprofile : déterministe (.prof)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="tourner en continu et ne republier que les pronostics modifiés")
+    parser.add_argument("--interval", type=int, default=DAEMON_INTERVAL, metavar="SECONDES",
+                        help="intervalle entre deux rafraîchissements en mode --daemon")
+    parser.add_argument("--kickoff-offset", type=int, nargs="?", const=PUBLISH_OFFSET // 60, metavar="MIN",
+                        help="en mode --daemon, publier chaque match MIN minutes avant son coup d'envoi")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(max(1, args.lookahead), args.interval, args.kickoff_offset)
+    elif args.profile is not None:
+        output = args.profile or ("profile.prof" if args.profile_mode == "cprofile" else "profile.folded")
+        tracing.run_profiled(main, output, args.profile_mode, max(1, args.lookahead))
+    else:
+        main(max(1, args.lookahead))
\ No newline at end of file
@@ -0,0 +1,34 @@
+from live_poller import LiveSnapshot
+from live_state import KICK_OFF, HALF_TIME, FULL_TIME
+
+def detect_status_changes(snapshot: LiveSnapshot):
+    """Kick-off, half-time and full-time alerts from the live state machine"""
+    alerts = []
+
+    for e in snapshot.events:
+        if e.kind == KICK_OFF:
+            alerts.append(
+                f"""🟢 **COUP D'ENVOI !**
+
+⚽ {e.home} 🆚 {e.away}
+🏆 {e.league}
+"""
+            )
+        elif e.kind == HALF_TIME:
+            alerts.append(
+                f"""⏸ **MI-TEMPS**
+
+⚽ {e.home} {e.score} {e.away}
+🏆 {e.league}
+"""
+            )
+        elif e.kind == FULL_TIME:
+            alerts.append(
+                f"""🏁 **FIN DU MATCH**
+
+⚽ {e.home} {e.score} {e.away}
+🏆 {e.league}
+"""
+            )
+
+    return alerts
@@ -1,9 +1,23 @@
-import requests
+import os
+import json
+import datetime
+import http_client
 
 API_KEY = "API_FOOTBALL_KEY"
 HEADERS = {"x-apisports-key": API_KEY}
 
-URL_FINISHED = "https://v3.football.api-sports.io/fixtures?status=FT"
+URL_FIXTURES = "https://v3.football.api-sports.io/fixtures"
+FINISHED_STATUSES = "FT-AET-PEN"
+
+# Ligues API-Football suivies (vide = toutes)
+LEAGUE_IDS = {2, 39, 61, 78, 135, 140}
+
+# L'endpoint ?ids= accepte au plus 20 matchs par requête
+DETAILS_BATCH_SIZE = 20
+
+CURSOR_FILE = "summaries_cursor.json"
+# Jours conservés dans le curseur (matchs finis après minuit)
+CURSOR_DAYS = 2
 
 posted_summaries = set()
 
@@ -15,8 +29,8 @@ def generate_summary(match):
     league = match["league"]["name"]
 
     goals = [
-        e for e in match["events"]
-        if e["type"] == "Goal"
+        e for e in match.get("events") or []
+        if e["type"] == "Goal" and e.get("detail") != "Missed Penalty"
     ]
 
     summary = f"""📝 **RÉSUMÉ DU MATCH**
@@ -33,6 +47,95 @@ def generate_summary(match):
 
     return summary
 
-def fetch_finished_matches():
-    r = requests.get(URL_FINISHED, headers=HEADERS)
-    return r.json()["response"]
+# ---------------- CURSEUR ----------------
+def load_cursor():
+    """Fixture IDs already summarized, per day: {"YYYY-MM-DD": [ids]}"""
+    if os.path.exists(CURSOR_FILE):
+        with open(CURSOR_FILE, "r", encoding="utf-8") as f:
+            cursor = json.load(f)
+    else:
+        cursor = {}
+
+    posted_summaries.clear()
+    for ids in cursor.values():
+        posted_summaries.update(ids)
+    return cursor
+
+def save_cursor(cursor):
+    # On ne garde que les derniers jours pour que le fichier reste petit
+    for day in sorted(cursor)[:-CURSOR_DAYS]:
+        del cursor[day]
+
+    with open(CURSOR_FILE, "w", encoding="utf-8") as f:
+        json.dump(cursor, f)
+
+# ---------------- FETCH ----------------
+def fetch_finished_matches(day=None, leagues=None):
+    """Finished fixtures of one day (list payload, without events)"""
+    day = day or datetime.date.today()
+    leagues = LEAGUE_IDS if leagues is None else leagues
+
+    r = http_client.get(
+        URL_FIXTURES,
+        params={"date": str(day), "status": FINISHED_STATUSES},
+        headers=HEADERS,
+        timeout=15
+    )
+    matches = r.json()["response"]
+
+    if leagues:
+        matches = [m for m in matches if m["league"]["id"] in leagues]
+    return matches
+
+def fetch_match_details(fixture_ids):
+    """Full fixtures (with events), DETAILS_BATCH_SIZE per request"""
+    details = []
+
+    for i in range(0, len(fixture_ids), DETAILS_BATCH_SIZE):
+        batch = fixture_ids[i:i + DETAILS_BATCH_SIZE]
+        r = http_client.get(
+            URL_FIXTURES,
+            params={"ids": "-".join(str(fid) for fid in batch)},
+            headers=HEADERS,
+            timeout=15
+        )
+        details.extend(r.json()["response"])
+
+    return details
+
+# ---------------- PIPELINE ----------------
+def new_summaries(day=None, leagues=None):
+    """(fixture_id, summary) for finished fixtures not summarized yet"""
+    load_cursor()
+
+    finished = fetch_finished_matches(day, leagues)
+    new_ids = [m["fixture"]["id"] for m in finished if m["fixture"]["id"] not in posted_summaries]
+    if not new_ids:
+        return []
+
+    return [
+        (m["fixture"]["id"], generate_summary(m))
+        for m in fetch_match_details(new_ids)
+    ]
+
+def publish_new_summaries(send, day=None, leagues=None):
+    """Send each new summary and record it in the cursor; returns the number sent"""
+    day = day or datetime.date.today()
+    summaries = new_summaries(day, leagues)
+    if not summaries:
+        return 0
+
+    cursor = load_cursor()
+    done = cursor.setdefault(str(day), [])
+    sent = 0
+
+    try:
+        for fixture_id, summary in summaries:
+            send(summary)
+            done.append(fixture_id)
+            posted_summaries.add(fixture_id)
+            sent += 1
+    finally:
+        save_cursor(cursor)
+
+    return sent
@@ -0,0 +1,289 @@
+"""
+Surveillance mémoire des boucles longues (main.py, main2.py, main4.py, bot.py).
+
+    MEMWATCH=1                 active la surveillance (échantillon toutes les MEMWATCH_INTERVAL s)
+    MEMWATCH_SOFT_MB=300       au-delà : rappels de purge + gc
+    MEMWATCH_HARD_MB=450       au-delà : sauvegarde de l'état puis redémarrage (os.execv)
+    MEMWATCH_TRACE_FRAMES=1    profondeur des piles tracemalloc (0 = RSS seulement)
+    MEMWATCH_PORT=9109         http://127.0.0.1:9109/memory, rapport à la demande
+
+    kill -USR1 <pid>           écrit le top des allocations dans les logs
+
+Fixer une limite active aussi la surveillance.
+"""
+import gc
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import resource
+import threading
+import tracemalloc
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+import metrics
+import async_logging
+
+SOFT_LIMIT_MB = float(os.getenv("MEMWATCH_SOFT_MB", "0") or 0)
+HARD_LIMIT_MB = float(os.getenv("MEMWATCH_HARD_MB", "0") or 0)
+INTERVAL = float(os.getenv("MEMWATCH_INTERVAL", "60") or 60)
+TRACE_FRAMES = int(os.getenv("MEMWATCH_TRACE_FRAMES", "1") or 0)
+PORT = int(os.getenv("MEMWATCH_PORT", "0") or 0)
+ENABLED = os.getenv("MEMWATCH", "") not in ("", "0") or bool(SOFT_LIMIT_MB or HARD_LIMIT_MB or PORT)
+
+# Deux purges de suite doivent être espacées d'au moins ce délai
+TRIM_COOLDOWN = 300
+TOP_ALLOCATIONS = 15
+HISTORY = 120
+# Attente max d'un rappel confié à la boucle asyncio (bloquée, elle ne doit pas empêcher le redémarrage)
+LOOP_CALLBACK_TIMEOUT = 30
+
+logger = logging.getLogger("memory_watchdog")
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en Ko sous Linux, en octets sous macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class MemoryWatchdog:
+    """Samples memory, trims caches past the soft limit, restarts past the hard one"""
+
+    def __init__(
+        self,
+        soft_mb: float = SOFT_LIMIT_MB,
+        hard_mb: float = HARD_LIMIT_MB,
+        interval: float = INTERVAL,
+        trace_frames: int = TRACE_FRAMES
+    ):
+        self.soft_mb = soft_mb
+        self.hard_mb = hard_mb
+        self.interval = interval
+        self.trace_frames = trace_frames
+
+        self.trim_callbacks: List[Callable[[], None]] = []
+        self.state_callbacks: List[Callable[[], None]] = []
+        self.history = deque(maxlen=HISTORY)  # (timestamp, rss Mo, tracemalloc Mo)
+        self.trims = 0
+        self._last_trim = 0.0
+        self._baseline = None
+        self._stop = threading.Event()
+        self._report_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server = None
+
+    # ---------------- RAPPELS ----------------
+    def on_trim(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Called past the soft limit: drop caches, shrink sets"""
+        self.trim_callbacks.append(callback)
+        return callback
+
+    def on_restart(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Called before a hard-limit restart: persist what must survive it"""
+        self.state_callbacks.append(callback)
+        return callback
+
+    # ---------------- MESURE ----------------
+    def sample(self) -> float:
+        rss = rss_mb()
+        traced = tracemalloc.get_traced_memory()[0] / (1024 * 1024) if tracemalloc.is_tracing() else 0.0
+        self.history.append((time.time(), round(rss, 1), round(traced, 1)))
+        metrics.set_gauge("process_rss_bytes", rss * 1024 * 1024)
+        if tracemalloc.is_tracing():
+            metrics.set_gauge("tracemalloc_bytes", traced * 1024 * 1024)
+        return rss
+
+    def check(self) -> None:
+        rss = self.sample()
+        if self.hard_mb and rss >= self.hard_mb:
+            logger.error(f"🧠 RSS {rss:.0f} Mo ≥ limite dure {self.hard_mb:.0f} Mo, redémarrage")
+            logger.error(self.top_allocations())
+            self.restart()
+        elif self.soft_mb and rss >= self.soft_mb and time.time() - self._last_trim >= TRIM_COOLDOWN:
+            self.trim()
+            logger.warning(f"🧠 RSS {rss:.0f} Mo ≥ limite douce {self.soft_mb:.0f} Mo, purge → {rss_mb():.0f} Mo")
+
+    def trim(self) -> None:
+        self._last_trim = time.time()
+        self.trims += 1
+        for callback in self.trim_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Erreur purge mémoire : {e}")
+        gc.collect()
+        metrics.inc("memory_trims_total")
+
+    def restart(self) -> None:
+        """Persist state, then replace this process with a fresh copy of itself"""
+        for callback in self.state_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Erreur sauvegarde avant redémarrage : {e}")
+        metrics.dump()
+        # os.execv ne lance pas atexit : la file de async_logging est vidée ici
+        async_logging.stop_logging()
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    # ---------------- RAPPORT ----------------
+    def top_allocations(self, limit: int = TOP_ALLOCATIONS) -> str:
+        lines = [f"🧠 RSS {rss_mb():.1f} Mo, {self.trims} purge(s)"]
+        if not tracemalloc.is_tracing():
+            lines.append("tracemalloc inactif (MEMWATCH_TRACE_FRAMES=0)")
+            return "\n".join(lines)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"tracemalloc : {current / 1048576:.1f} Mo (pic {peak / 1048576:.1f} Mo)")
+
+        lines.append(f"Top {limit} des allocations :")
+        for stat in snapshot.statistics("lineno")[:limit]:
+            lines.append(f"  {stat.size / 1024:>9.1f} Ko {stat.count:>8} blocs  {stat.traceback}")
+
+        # Croissance depuis le démarrage : c'est là que se cachent les fuites
+        if self._baseline is not None:
+            lines.append("Croissance depuis le démarrage :")
+            for stat in snapshot.compare_to(self._baseline, "lineno")[:limit]:
+                if stat.size_diff > 0:
+                    lines.append(f"  {stat.size_diff / 1024:>+9.1f} Ko {stat.count_diff:>+8} blocs  {stat.traceback}")
+        return "\n".join(lines)
+
+    def report(self) -> str:
+        history = "\n".join(
+            f"  {time.strftime('%H:%M:%S', time.localtime(t))} RSS {rss:.1f} Mo, tracé {traced:.1f} Mo"
+            for t, rss, traced in list(self.history)[-10:]
+        )
+        return f"{self.top_allocations()}\nDerniers échantillons :\n{history}\n"
+
+    # ---------------- CYCLE DE VIE ----------------
+    def start(self, port: int = PORT) -> "MemoryWatchdog":
+        if self.trace_frames and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._baseline = tracemalloc.take_snapshot()
+
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, "SIGUSR1"):
+            # Le rapport est écrit par le thread de surveillance, pas dans le gestionnaire
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self._report_requested.set())
+
+        if port:
+            try:
+                self._server = _serve(self, port)
+            except OSError as e:
+                logger.error(f"Endpoint mémoire indisponible sur le port {port} : {e}")
+
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"🧠 Surveillance mémoire active (douce {self.soft_mb or '—'} Mo, "
+            f"dure {self.hard_mb or '—'} Mo, toutes les {self.interval:g}s)"
+        )
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._report_requested.set()
+        if self._server:
+            self._server.shutdown()
+
+    def _run(self) -> None:
+        self.sample()
+        next_check = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            if self._report_requested.wait(max(0.0, next_check - time.monotonic())):
+                self._report_requested.clear()
+                if not self._stop.is_set():
+                    logger.warning(self.report())
+                continue
+            next_check = time.monotonic() + self.interval
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Erreur surveillance mémoire : {e}")
+
+
+def _serve(watchdog: MemoryWatchdog, port: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/memory", "/"):
+                self.send_error(404)
+                return
+            body = watchdog.report().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="memory-endpoint", daemon=True).start()
+    return server
+
+
+def on_loop(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> Callable[[], None]:
+    """Wrap a callback so the watchdog thread runs it on `loop` and waits for it"""
+    def run() -> None:
+        if not loop.is_running():
+            callback()
+            return
+        done: Future = Future()
+
+        def call() -> None:
+            try:
+                done.set_result(callback())
+            except Exception as e:
+                done.set_exception(e)
+
+        loop.call_soon_threadsafe(call)
+        done.result(timeout=LOOP_CALLBACK_TIMEOUT)
+    return run
+
+
+def watch(
+    trim: Optional[Callable[[], None]] = None,
+    save_state: Optional[Callable[[], None]] = None,
+    loop: Optional[asyncio.AbstractEventLoop] = None
+) -> Optional[MemoryWatchdog]:
+    """
+    Start the watchdog configured from the environment, or do nothing when disabled.
+    Called from a coroutine, the callbacks run on that event loop, not on the watchdog thread.
+    """
+    if not ENABLED:
+        return None
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+    if loop is not None:
+        # Les rappels touchent à l'état de la boucle (posted, entries) : pas depuis un autre thread
+        trim = trim and on_loop(loop, trim)
+        save_state = save_state and on_loop(loop, save_state)
+    watchdog = MemoryWatchdog()
+    if trim:
+        watchdog.on_trim(trim)
+    if save_state:
+        watchdog.on_restart(save_state)
+    return watchdog.start()
@@ -0,0 +1,197 @@
+"""
+Registre de métriques partagé par tous les bots.
+
+    METRICS_PORT=9108 python main3.py      # http://127.0.0.1:9108/metrics (format Prometheus)
+    METRICS_DUMP=metrics.json python main3.py   # instantané JSON écrit à la sortie
+
+Sans aucune des deux variables, inc/observe/set_gauge/timer ne font rien.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+PORT = int(os.getenv("METRICS_PORT", "0") or 0)
+DUMP_FILE = os.getenv("METRICS_DUMP", "")
+ENABLED = bool(PORT or DUMP_FILE)
+
+PREFIX = "footbot_"
+
+# Bornes des histogrammes (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[Key, float] = {}
+_gauges: Dict[Key, float] = {}
+_histograms: Dict[Key, list] = {}  # [comptes par borne..., +Inf, somme]
+
+
+def _key(name: str, labels: Dict) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(DEFAULT_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                h[i] += 1
+                break
+        else:
+            h[len(DEFAULT_BUCKETS)] += 1
+        h[-1] += value
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, **labels):
+    """with metrics.timer("telegram_send_seconds", channel=ch): ..."""
+    return _Timer(name, labels) if ENABLED else _NULL_TIMER
+
+
+# ---------------- EXPORT ----------------
+def _labels(labels: Tuple, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render() -> str:
+    """Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+
+    typed = set()
+    for kind, items in (("counter", counters), ("gauge", gauges)):
+        for (name, labels), value in items:
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                typed.add(name)
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {value:g}")
+
+    for (name, labels), h in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(DEFAULT_BUCKETS + ("+Inf",), h[:-1]):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le)} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {h[-1]:g}")
+        lines.append(f"{PREFIX}{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> Dict:
+    def label_str(labels):
+        return ",".join(f"{k}={v}" for k, v in labels)
+
+    with _lock:
+        return {
+            "counters": {f"{n}{{{label_str(l)}}}": v for (n, l), v in _counters.items()},
+            "gauges": {f"{n}{{{label_str(l)}}}": v for (n, l), v in _gauges.items()},
+            "histograms": {
+                f"{n}{{{label_str(l)}}}": {"count": sum(h[:-1]), "sum": round(h[-1], 6),
+                                           "buckets": dict(zip([str(b) for b in DEFAULT_BUCKETS] + ["+Inf"], h[:-1]))}
+                for (n, l), h in _histograms.items()
+            },
+        }
+
+
+def dump(path: str = None) -> None:
+    path = path or DUMP_FILE
+    if not path:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"[WARN] Écriture des métriques impossible : {e}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(port: int = PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+if PORT:
+    try:
+        start_server()
+    except OSError as e:
+        print(f"[WARN] Endpoint métriques indisponible sur le port {PORT} : {e}")
+if DUMP_FILE:
+    atexit.register(dump)
@@ -0,0 +1,200 @@
+import datetime
+import math
+import time
+from typing import Dict, Optional
+
+# Quota API-Football (plan gratuit : 100 requêtes / jour)
+DAILY_BUDGET = 100
+
+# Intervalles en secondes
+HOT_INTERVAL = 30          # fin de match, arrêts de jeu, prolongations
+LIVE_INTERVAL = 60         # matchs en cours
+IDLE_INTERVAL = 15 * 60    # aucun match en direct
+MIN_INTERVAL = 15
+MAX_INTERVAL = 60 * 60
+
+# Phases à forte densité d'événements
+HOT_STATUSES = {"ET", "BT", "P"}
+HOT_MINUTE = 80
+
+# Durée d'un match, coup d'envoi -> coup de sifflet final (minutes)
+MATCH_MINUTES = 115
+
+
+def remaining_minutes(match: Dict) -> float:
+    """Rough number of minutes before a live fixture reaches full-time, from its status"""
+    status = match["fixture"]["status"]
+    short = status.get("short")
+    elapsed = status.get("elapsed") or 0
+
+    if short == "1H":
+        return max(0, 45 - elapsed) + 15 + 50
+    if short == "HT":
+        return 50
+    if short == "2H":
+        return max(0, 90 - elapsed) + 5
+    if short == "ET":
+        return max(0, 120 - elapsed) + 5
+    if short == "BT":
+        return 20
+    if short == "P":
+        return 10
+    return 10
+
+
+def is_hot(match: Dict) -> bool:
+    status = match["fixture"]["status"]
+    short = status.get("short")
+    elapsed = status.get("elapsed") or 0
+    extra = status.get("extra") or 0
+
+    if short in HOT_STATUSES or extra:
+        return True
+    return short == "2H" and elapsed >= HOT_MINUTE
+
+
+class PollingController:
+    """Decides how long the live poller sleeps, from match state and API quota"""
+
+    def __init__(
+        self,
+        daily_budget: int = DAILY_BUDGET,
+        hot_interval: float = HOT_INTERVAL,
+        live_interval: float = LIVE_INTERVAL,
+        idle_interval: float = IDLE_INTERVAL,
+        day_end_hour: int = 24
+    ):
+        self.daily_budget = daily_budget
+        self.hot_interval = hot_interval
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.day_end_hour = day_end_hour
+
+        self.day = datetime.date.today()
+        self.used = 0
+        self.failed = 0
+        self.server_remaining: Optional[int] = None
+        self.live_count = 0
+        self.hot_count = 0
+        self.last_fixture_end: Optional[float] = None
+        self.last_kickoff: Optional[float] = None
+        self.kickoff_day: Optional[datetime.date] = None
+        self.last_interval = idle_interval
+
+    # ---------------- QUOTA ----------------
+    def _roll_day(self) -> None:
+        today = datetime.date.today()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+            self.failed = 0
+            self.server_remaining = None
+
+    def count_request(self, ok: bool = True) -> None:
+        self._roll_day()
+        self.used += 1
+        if not ok:
+            self.failed += 1
+
+    def record_request(self, snapshot) -> None:
+        """Count one API call and refresh the match-state view from its snapshot"""
+        self.count_request(snapshot is not None)
+
+        if snapshot is None:
+            return
+
+        if snapshot.quota_remaining is not None:
+            self.server_remaining = snapshot.quota_remaining
+
+        self.live_count = len(snapshot.matches)
+        self.hot_count = sum(1 for m in snapshot.matches if is_hot(m))
+
+        if snapshot.matches:
+            longest = max(remaining_minutes(m) for m in snapshot.matches)
+            self.last_fixture_end = snapshot.fetched_at + longest * 60
+        else:
+            self.last_fixture_end = None
+
+    def needs_last_kickoff(self) -> bool:
+        """True until the day's fixture list has been read once"""
+        self._roll_day()
+        return self.kickoff_day != self.day
+
+    def set_last_kickoff(self, timestamp: Optional[float]) -> None:
+        """Latest kick-off of the day (e.g. from the fixtures list), to size the budget horizon"""
+        self._roll_day()
+        self.kickoff_day = self.day
+        if timestamp is not None:
+            self.last_kickoff = timestamp
+
+    @property
+    def remaining(self) -> int:
+        local = self.daily_budget - self.used
+        if self.server_remaining is not None:
+            return max(0, min(local, self.server_remaining))
+        return max(0, local)
+
+    def _day_end(self, now: float) -> float:
+        midnight = datetime.datetime.combine(self.day, datetime.time()) + datetime.timedelta(hours=self.day_end_hour)
+        return max(now, midnight.timestamp())
+
+    def budget_end(self, now: float) -> float:
+        """When the daily budget must last until: end of the last match, else end of the day"""
+        ends = [t for t in (self.last_fixture_end, self.last_kickoff and self.last_kickoff + MATCH_MINUTES * 60) if t]
+        return max(ends) if ends else self._day_end(now)
+
+    # ---------------- INTERVAL ----------------
+    def next_interval(self, now: Optional[float] = None) -> float:
+        now = now or time.time()
+        self._roll_day()
+
+        if self.hot_count:
+            desired = self.hot_interval
+        elif self.live_count:
+            desired = self.live_interval
+        else:
+            desired = self.idle_interval
+
+        # Le budget doit tenir jusqu'à la fin du dernier match (ou de la journée)
+        horizon = max(0.0, self.budget_end(now) - now)
+
+        remaining = self.remaining
+        if remaining <= 0:
+            paced = horizon or MAX_INTERVAL
+        else:
+            paced = horizon / remaining
+
+        interval = max(MIN_INTERVAL, desired, paced) if self.live_count else max(desired, paced)
+        self.last_interval = min(MAX_INTERVAL, interval)
+        return self.last_interval
+
+    # ---------------- REPORT ----------------
+    def report(self, now: Optional[float] = None) -> Dict:
+        """Expected versus actual quota use for the current day"""
+        now = now or time.time()
+        day_start = datetime.datetime.combine(self.day, datetime.time()).timestamp()
+        # Consommation attendue : linéaire jusqu'à la fin du dernier match du jour
+        end = self.budget_end(now)
+        span = max(1.0, end - day_start)
+        fraction = min(1.0, max(0.0, (now - day_start) / span))
+
+        projected = self.used + math.ceil(max(0.0, end - now) / max(1.0, self.last_interval))
+
+        return {
+            "budget": self.daily_budget,
+            "used": self.used,
+            "failed": self.failed,
+            "remaining": self.remaining,
+            "expected_by_now": round(self.daily_budget * fraction, 1),
+            "projected_total": min(projected, self.used + self.remaining),
+            "live": self.live_count,
+            "hot": self.hot_count,
+            "interval": round(self.last_interval, 1)
+        }
+
+    def format_report(self) -> str:
+        r = self.report()
+        return (
+            f"quota {r['used']}/{r['budget']} (attendu {r['expected_by_now']}, "
+            f"projeté {r['projected_total']}) | live {r['live']} dont {r['hot']} chauds"
+        )
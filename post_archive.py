@@ -0,0 +1,326 @@
+"""
+Archive de tout ce qui a été publié, avec index plein texte (SQLite FTS5).
+
+    POST_ARCHIVE=posts.db      base de l'archive ("" pour désactiver)
+
+    python post_archive.py search "Mbappé" --days 7
+    python post_archive.py search "Real Madrid OR Barcelona" --channel @canal
+    python post_archive.py stats
+
+Les publieurs appellent record() : l'écriture est mise en file et un thread
+l'insère par lots, hors du chemin d'envoi.
+"""
+import os
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import hashlib
+import argparse
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import metrics
+
+ARCHIVE_FILE = "posts.db"
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 2.0
+DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    posted_at REAL NOT NULL,
+    source TEXT,
+    entities TEXT,
+    text TEXT NOT NULL,
+    message_id INTEGER,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_time ON posts(posted_at);
+CREATE INDEX IF NOT EXISTS posts_fingerprint ON posts(fingerprint, posted_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    text, entities, content='posts', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts(rowid, text, entities) VALUES (new.id, new.text, new.entities);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, text, entities) VALUES ('delete', old.id, old.text, old.entities);
+END;
+"""
+
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"(?<!\w)@\w{4,}")
+URL_RE = re.compile(r"https?://[^\s<>\"')]+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def fingerprint(text: str) -> str:
+    """Same text modulo markup, case, accents, emoji and spacing -> same fingerprint"""
+    text = unicodedata.normalize("NFKD", TAG_RE.sub(" ", text).lower())
+    words = re.findall(r"\w+", "".join(c for c in text if not unicodedata.combining(c)))
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def extract_entities(text: str) -> List[str]:
+    """Hashtags, mentions and links of a message, in order of appearance"""
+    seen = []
+    for pattern in (HASHTAG_RE, MENTION_RE, URL_RE):
+        for match in pattern.findall(text):
+            if match not in seen:
+                seen.append(match)
+    return seen
+
+
+def fts_query(terms: str) -> str:
+    """Free text -> FTS5 query where every word must appear (FTS syntax is kept if present)"""
+    if re.search(r'\b(AND|OR|NOT|NEAR)\b|"', terms):
+        return terms
+    words = re.findall(r"\w+", terms)
+    return " ".join(f'"{w}"' for w in words)
+
+
+def phrase(text: str) -> str:
+    """FTS5 query matching `text` as an exact phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class PostArchive:
+    """SQLite archive of outgoing messages, written in batches by a background thread"""
+
+    def __init__(self, path: str = ARCHIVE_FILE):
+        self.path = path
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        # Lecteurs et écrivain en parallèle
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Read connection of the calling thread"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+            db.row_factory = sqlite3.Row
+        return db
+
+    # ---------------- ÉCRITURE ----------------
+    def record(
+        self,
+        channel: str,
+        text: str,
+        source: str = "",
+        entities: Iterable[str] = (),
+        message_id: Optional[int] = None,
+        posted_at: Optional[float] = None
+    ) -> None:
+        """Queue one published message; never blocks on disk"""
+        if not text:
+            return
+        given = list(entities)
+        given += [e for e in extract_entities(text) if e not in given]
+        self._queue.put((
+            str(channel), posted_at or time.time(), source, " ".join(given),
+            text, message_id, fingerprint(text)
+        ))
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="post-archive", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        db = self._connect()
+        while True:
+            rows, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # flush() demandé : écrire sans attendre le lot complet
+                rows.append(item)
+                if len(rows) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    with db:
+                        db.executemany(
+                            "INSERT INTO posts (channel, posted_at, source, entities, text, message_id, fingerprint) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                        )
+                    self.written += len(rows)
+                    metrics.inc("archive_rows_total", len(rows))
+                except sqlite3.Error as e:
+                    print(f"Erreur archive ({len(rows)} message(s) perdus) :", e)
+            for waiter in waiters:
+                waiter.set()
+
+    def flush(self, timeout: float = 10) -> None:
+        """Wait until everything queued so far is written"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    # ---------------- LECTURE ----------------
+    def is_duplicate(self, text: str, within: float = DAY, channel: Optional[str] = None) -> bool:
+        """Was the same text (modulo formatting) published in the last `within` seconds?"""
+        sql = "SELECT 1 FROM posts WHERE fingerprint = ? AND posted_at >= ?"
+        args = [fingerprint(text), time.time() - within]
+        if channel:
+            sql += " AND channel = ?"
+            args.append(str(channel))
+        return self.db.execute(sql + " LIMIT 1", args).fetchone() is not None
+
+    def search(
+        self,
+        terms: str,
+        since: Optional[float] = None,
+        channel: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """Full-text search, best matches first"""
+        sql = (
+            "SELECT p.id, p.channel, p.posted_at, p.source, p.message_id, "
+            "snippet(posts_fts, 0, '[', ']', '…', 12) AS snippet "
+            "FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid WHERE posts_fts MATCH ?"
+        )
+        args: List = [fts_query(terms)]
+        if since:
+            sql += " AND p.posted_at >= ?"
+            args.append(since)
+        if channel:
+            sql += " AND p.channel = ?"
+            args.append(str(channel))
+        sql += " ORDER BY bm25(posts_fts) LIMIT ?"
+        args.append(limit)
+        return [dict(row) for row in self.db.execute(sql, args)]
+
+    def posted_about(self, terms: str, within: float = DAY, channel: Optional[str] = None) -> bool:
+        """Did we already post about these terms recently ("did we cover X today?")"""
+        return bool(self.search(terms, since=time.time() - within, channel=channel, limit=1))
+
+    def stats(self) -> Dict:
+        row = self.db.execute(
+            "SELECT COUNT(*) AS posts, MIN(posted_at) AS first, MAX(posted_at) AS last FROM posts"
+        ).fetchone()
+        per_channel = self.db.execute(
+            "SELECT channel, COUNT(*) AS n FROM posts GROUP BY channel ORDER BY n DESC"
+        ).fetchall()
+        return {**dict(row), "channels": {r["channel"]: r["n"] for r in per_channel}}
+
+
+# ---------------- ARCHIVE PARTAGÉE ----------------
+_archive: Optional[PostArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[PostArchive]:
+    """Process-wide archive, or None when POST_ARCHIVE is empty"""
+    global _archive
+    # Lu au premier envoi : un import précoce ne fige pas le chemin
+    path = os.getenv("POST_ARCHIVE", ARCHIVE_FILE)
+    if not path:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            try:
+                _archive = PostArchive(path)
+                atexit.register(_archive.flush)
+            except sqlite3.Error as e:
+                print(f"Archive {path} indisponible :", e)
+                return None
+        return _archive
+
+
+def record(channel: str, text: str, source: str = "", entities: Iterable[str] = (),
+           message_id: Optional[int] = None) -> None:
+    """Archive a published message; archive errors never reach the publisher"""
+    archive = get_archive()
+    if archive is None:
+        return
+    try:
+        archive.record(channel, text, source, entities, message_id)
+    except Exception as e:
+        print("Erreur archive :", e)
+
+
+def is_duplicate(text: str, within: float = DAY, channel: Optional[str] = None) -> bool:
+    archive = get_archive()
+    if archive is None:
+        return False
+    try:
+        return archive.is_duplicate(text, within, channel)
+    except sqlite3.Error as e:
+        print("Erreur archive :", e)
+        return False
+
+
+def posted_about(terms: str, within: float = DAY, channel: Optional[str] = None) -> bool:
+    archive = get_archive()
+    if archive is None:
+        return False
+    try:
+        return archive.posted_about(terms, within, channel)
+    except sqlite3.Error as e:
+        print("Erreur archive :", e)
+        return False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive des messages publiés")
+    parser.add_argument("--db", default=os.getenv("POST_ARCHIVE") or ARCHIVE_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="recherche plein texte")
+    search.add_argument("terms")
+    search.add_argument("--days", type=float, default=0, help="seulement les N derniers jours")
+    search.add_argument("--channel", default=None)
+    search.add_argument("--limit", type=int, default=20)
+    sub.add_parser("stats", help="volume de l'archive")
+    args = parser.parse_args(argv)
+
+    archive = PostArchive(args.db)
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), ensure_ascii=False, indent=2))
+        return 0
+
+    since = time.time() - args.days * DAY if args.days else None
+    start = time.perf_counter()
+    results = archive.search(args.terms, since=since, channel=args.channel, limit=args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    for r in results:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["posted_at"]))
+        print(f"{when}  {r['channel']:<16} #{r['message_id'] or '—':<8} {r['snippet']}")
+    print(f"{len(results)} résultat(s) en {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LEDGER_DIR = "ledger"
+DICTIONARIES_FILE = "dictionaries.json"
+
+PICKS = ["home_win", "draw", "away_win"]
+UNKNOWN = -1
+
+# Une colonne = un fichier binaire ajouté en fin, relu par memmap
+COLUMNS = {
+    "fixture_id": np.int64,
+    "ts": np.int64,
+    "league": np.uint16,
+    "source": np.uint8,
+    "pick": np.int8,
+    # Confiance brute du modèle (/10), avant calibration
+    "confidence": np.float32,
+    "odds": np.float32,
+    "outcome": np.int8,
+}
+
+# Nombre de résultats connus avant de faire confiance à un seau de calibration
+MIN_CALIBRATION_SAMPLES = 30
+
+
+class PredictionLedger:
+    """Append-only, column-per-file record of every prediction and its outcome"""
+
+    def __init__(self, directory: str = LEDGER_DIR):
+        self.directory = directory
+        self.dictionaries: Dict[str, List[str]] = {"league": [], "source": []}
+
+        path = os.path.join(directory, DICTIONARIES_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.dictionaries.update(json.load(f))
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.directory, column + ".bin")
+
+    def _code(self, dictionary: str, value: str) -> int:
+        values = self.dictionaries[dictionary]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def _save_dictionaries(self) -> None:
+        with open(os.path.join(self.directory, DICTIONARIES_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.dictionaries, f)
+
+    # ---------------- LECTURE ----------------
+    def __len__(self) -> int:
+        sizes = []
+        for column, dtype in COLUMNS.items():
+            path = self._path(column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes.append(size // np.dtype(dtype).itemsize)
+        # Une écriture interrompue ne doit pas désaligner les colonnes
+        return min(sizes)
+
+    def column(self, name: str, mode: str = "r") -> np.ndarray:
+        rows = len(self)
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._path(name), dtype=COLUMNS[name], mode=mode, shape=(rows,))
+
+    # ---------------- ÉCRITURE ----------------
+    def _truncate(self, rows: int) -> None:
+        """Cut every column file back to `rows` rows, dropping the tail of a torn append"""
+        for column, dtype in COLUMNS.items():
+            path = self._path(column)
+            size = rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def append(self, rows: Iterable[Tuple[int, str, str, str, float, float]]) -> int:
+        """Append (fixture_id, league, source, pick, confidence, odds) rows in one batch"""
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        now = int(time.time())
+        data = {
+            "fixture_id": np.array([int(r[0]) for r in rows], dtype=COLUMNS["fixture_id"]),
+            "ts": np.full(len(rows), now, dtype=COLUMNS["ts"]),
+            "league": np.array([self._code("league", r[1]) for r in rows], dtype=COLUMNS["league"]),
+            "source": np.array([self._code("source", r[2]) for r in rows], dtype=COLUMNS["source"]),
+            "pick": np.array([PICKS.index(r[3]) for r in rows], dtype=COLUMNS["pick"]),
+            "confidence": np.array([r[4] for r in rows], dtype=COLUMNS["confidence"]),
+            "odds": np.array([r[5] for r in rows], dtype=COLUMNS["odds"]),
+            "outcome": np.full(len(rows), UNKNOWN, dtype=COLUMNS["outcome"]),
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._save_dictionaries()
+        # Un ajout interrompu a pu allonger certaines colonnes seulement : on les
+        # réaligne avant d'écrire, sinon tous les ajouts suivants seraient décalés
+        self._truncate(len(self))
+        for column, values in data.items():
+            with open(self._path(column), "ab") as f:
+                f.write(values.tobytes())
+        return len(rows)
+
+    def settle(self, results: Dict[int, str]) -> int:
+        """Record outcomes {fixture_id: 'home_win'|'draw'|'away_win'} for pending rows"""
+        if not results or len(self) == 0:
+            return 0
+
+        fixture_ids = self.column("fixture_id")
+        outcome = self.column("outcome", mode="r+")
+        ids = np.fromiter((int(f) for f in results), dtype=np.int64)
+        codes = np.fromiter((PICKS.index(o) for o in results.values()), dtype=np.int8)
+
+        order = np.argsort(ids)
+        ids, codes = ids[order], codes[order]
+        pos = np.searchsorted(ids, fixture_ids)
+        pos[pos >= len(ids)] = 0
+        match = (ids[pos] == fixture_ids) & (outcome == UNKNOWN)
+
+        outcome[match] = codes[pos[match]]
+        outcome.flush()
+        return int(match.sum())
+
+    # ---------------- REQUÊTES ----------------
+    def _settled(self):
+        outcome = np.asarray(self.column("outcome"))
+        mask = outcome != UNKNOWN
+        hits = (np.asarray(self.column("pick")) == outcome)[mask]
+        return mask, hits
+
+    def hit_rate_by(self, column: str) -> Dict[str, Tuple[int, float]]:
+        """{value: (settled predictions, hit rate)} for league, source or pick"""
+        mask, hits = self._settled()
+        codes = np.asarray(self.column(column))[mask].astype(np.int64)
+        if codes.size == 0:
+            return {}
+
+        counts = np.bincount(codes)
+        wins = np.bincount(codes, weights=hits)
+        labels = PICKS if column == "pick" else self.dictionaries[column]
+        return {
+            labels[code]: (int(counts[code]), float(wins[code] / counts[code]))
+            for code in np.nonzero(counts)[0]
+        }
+
+    def hit_rate_by_confidence(self, source: Optional[str] = None) -> Dict[int, Tuple[int, float]]:
+        """{confidence bucket (floor of /10 score): (settled predictions, hit rate)}"""
+        mask, _ = self._settled()
+        if source is not None:
+            if source not in self.dictionaries["source"]:
+                return {}
+            mask &= np.asarray(self.column("source")) == self.dictionaries["source"].index(source)
+
+        outcome = np.asarray(self.column("outcome"))[mask]
+        hits = np.asarray(self.column("pick"))[mask] == outcome
+        buckets = np.floor(np.asarray(self.column("confidence"))[mask]).astype(np.int64)
+        if buckets.size == 0:
+            return {}
+
+        counts = np.bincount(buckets)
+        wins = np.bincount(buckets, weights=hits)
+        return {int(b): (int(counts[b]), float(wins[b] / counts[b])) for b in np.nonzero(counts)[0]}
+
+    def calibrated_confidence(
+        self,
+        confidence: float,
+        source: Optional[str] = None,
+        table: Optional[Dict[int, Tuple[int, float]]] = None
+    ) -> float:
+        """Observed hit rate of this confidence bucket on a /10 scale, once it has enough samples"""
+        table = self.hit_rate_by_confidence(source) if table is None else table
+        n, rate = table.get(int(confidence), (0, 0.0))
+        if n < MIN_CALIBRATION_SAMPLES:
+            return confidence
+        return round(rate * 10, 1)
+
+    def has_fixture(self, fixture_ids: Iterable[int], source: Optional[str] = None) -> np.ndarray:
+        """Which fixtures already have a row, for one source or for any source"""
+        ids = np.fromiter((int(f) for f in fixture_ids), dtype=np.int64)
+        known = np.asarray(self.column("fixture_id"))
+        if source is not None:
+            if source not in self.dictionaries["source"]:
+                return np.zeros(len(ids), dtype=bool)
+            known = known[np.asarray(self.column("source")) == self.dictionaries["source"].index(source)]
+        return np.isin(ids, known)
@@ -1,8 +1,16 @@
+import os
 from telegram_pub import publish_telegram
 from whatsapp_pub import publish_whatsapp
 from twitter_pub import publish_twitter
 
+# "mtproto" : envoi par Telethon (gros fichiers, albums), sinon Bot API
+BACKEND = os.getenv("PUBLISHER_BACKEND", "bot")
+
 def publish_everywhere(bot, channel, text, image=None):
-    publish_telegram(bot, channel, text, image)
+    if BACKEND == "mtproto":
+        from mtproto_pub import publish_mtproto
+        publish_mtproto(channel, text, image)
+    else:
+        publish_telegram(bot, channel, text, image)
     publish_whatsapp(text)
     publish_twitter(text)
@@ -0,0 +1,207 @@
+"""
+Publication par MTProto (Telethon) : gros fichiers, albums, plusieurs canaux.
+
+    PUBLISHER_BACKEND=mtproto      utilisé par dispatcher.publish_everywhere
+    TG_API_ID / TG_API_HASH        identifiants https://my.telegram.org
+    MTPROTO_SESSION=session_name   session utilisateur existante
+    MTPROTO_BOT_TOKEN=...          ou une session de bot (limite de 2 Go au lieu de 50 Mo)
+    MTPROTO_UPLOAD_WORKERS=8       morceaux envoyés en parallèle
+
+Un fichier n'est envoyé qu'une fois : le média renvoyé par Telegram est réutilisé
+pour les canaux suivants, et les images d'un même post partent en un seul album.
+"""
+import os
+import random
+import hashlib
+import asyncio
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from telethon import TelegramClient, utils
+from telethon.tl.functions.upload import SaveBigFilePartRequest, SaveFilePartRequest
+from telethon.tl.types import InputFile, InputFileBig
+
+import metrics
+
+API_ID = int(os.getenv("TG_API_ID", "0") or 0)
+API_HASH = os.getenv("TG_API_HASH", "")
+SESSION = os.getenv("MTPROTO_SESSION", "session_name")
+BOT_TOKEN = os.getenv("MTPROTO_BOT_TOKEN", "")
+UPLOAD_WORKERS = int(os.getenv("MTPROTO_UPLOAD_WORKERS", "8") or 8)
+
+# Au-delà, Telegram impose SaveBigFilePart
+BIG_FILE_SIZE = 10 * 1024 * 1024
+ALBUM_MAX = 10
+CAPTION_MAX = 1024
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".webm")
+
+Media = Union[str, object]
+FileKey = Tuple[str, int, float]
+
+
+def file_key(path: str) -> Optional[FileKey]:
+    """Identity of a local file for the upload cache (None for URLs and file ids)"""
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime
+
+
+def read_part(path: str, index: int, part_size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(index * part_size)
+        return f.read(part_size)
+
+
+def file_md5(path: str) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class MtprotoPublisher:
+    """Telethon client with parallel uploads and a per-file media cache"""
+
+    def __init__(self, client: TelegramClient, workers: int = UPLOAD_WORKERS):
+        self.client = client
+        self.workers = workers
+        # fichier local -> média déjà publié, réutilisable sans nouvel envoi
+        self.sent_media: Dict[FileKey, object] = {}
+        # fichier local -> téléversement (en cours ou fini) pas encore publié
+        self.uploaded: Dict[FileKey, asyncio.Task] = {}
+
+    # ---------------- TÉLÉVERSEMENT ----------------
+    async def upload(self, path: str):
+        """Upload a file in parts, `workers` parts in flight at a time"""
+        size = os.path.getsize(path)
+        part_size = utils.get_appropriated_part_size(size) * 1024
+        parts = max(1, (size + part_size - 1) // part_size)
+        is_big = size > BIG_FILE_SIZE
+        file_id = random.randrange(-2 ** 63, 2 ** 63)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def send_part(index: int) -> None:
+            async with semaphore:
+                data = await asyncio.to_thread(read_part, path, index, part_size)
+                if is_big:
+                    request = SaveBigFilePartRequest(file_id, index, parts, data)
+                else:
+                    request = SaveFilePartRequest(file_id, index, data)
+                if not await self.client(request):
+                    raise RuntimeError(f"Morceau {index}/{parts} refusé pour {path}")
+
+        with metrics.timer("mtproto_upload_seconds"):
+            await asyncio.gather(*(send_part(i) for i in range(parts)))
+        metrics.inc("mtproto_upload_bytes_total", size)
+
+        name = os.path.basename(path)
+        if is_big:
+            return InputFileBig(file_id, parts, name)
+        # Le md5 n'est exigé que pour les petits fichiers, calculé hors de la boucle
+        return InputFile(file_id, parts, name, await asyncio.to_thread(file_md5, path))
+
+    async def prepare(self, media: Media):
+        """Best handle for a media: already-sent media, pending upload, or a fresh upload"""
+        key = file_key(media)
+        if key is None:
+            return media  # URL, identifiant de fichier ou média Telegram
+        if key in self.sent_media:
+            metrics.inc("mtproto_media_reuse_total")
+            return self.sent_media[key]
+        # Un même fichier demandé deux fois en parallèle n'est envoyé qu'une fois
+        if key not in self.uploaded:
+            self.uploaded[key] = asyncio.ensure_future(self.upload(media))
+        try:
+            return await self.uploaded[key]
+        except Exception:
+            self.uploaded.pop(key, None)
+            raise
+
+    def _remember(self, sources: Sequence[Media], messages) -> None:
+        messages = messages if isinstance(messages, list) else [messages]
+        for source, message in zip(sources, messages):
+            key = file_key(source)
+            if key is not None and getattr(message, "media", None) is not None:
+                self.sent_media[key] = message.media
+                self.uploaded.pop(key, None)
+
+    # ---------------- ENVOI ----------------
+    async def send(self, chat, text: str, media: Sequence[Media] = (), parse_mode: str = "md"):
+        if not media:
+            return await self.client.send_message(chat, text, parse_mode=parse_mode, link_preview=False)
+
+        sent = []
+        for start in range(0, len(media), ALBUM_MAX):
+            batch = list(media[start:start + ALBUM_MAX])
+            handles = list(await asyncio.gather(*(self.prepare(m) for m in batch)))
+            # Légende sur le premier élément du premier album seulement
+            caption = text[:CAPTION_MAX] if start == 0 else ""
+            streaming = any(str(m).lower().endswith(VIDEO_EXTENSIONS) for m in batch)
+            with metrics.timer("telegram_send_seconds", channel=str(chat)):
+                if len(handles) == 1:
+                    result = await self.client.send_file(
+                        chat, handles[0], caption=caption, parse_mode=parse_mode,
+                        supports_streaming=streaming
+                    )
+                else:
+                    result = await self.client.send_file(
+                        chat, handles, caption=[caption] + [""] * (len(handles) - 1),
+                        parse_mode=parse_mode, supports_streaming=streaming
+                    )
+            self._remember(batch, result)
+            sent.extend(result if isinstance(result, list) else [result])
+        return sent
+
+    async def publish(self, chats: Sequence, text: str, media: Sequence[Media] = ()) -> int:
+        """Send one post to every chat; files are uploaded once for all of them"""
+        media = list(media)
+        # Téléversements lancés avant le premier envoi, tous en parallèle
+        await asyncio.gather(*(self.prepare(m) for m in media))
+        published = 0
+        for chat in chats:
+            try:
+                await self.send(chat, text, media)
+                published += 1
+            except Exception as e:
+                metrics.inc("telegram_send_errors_total", channel=str(chat))
+                print(f"Erreur MTProto {chat} :", e)
+        return published
+
+
+# ---------------- CLIENT PARTAGÉ ----------------
+# Un client Telethon est lié à sa boucle : une boucle dédiée sert les appels synchrones
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_publisher: Optional[MtprotoPublisher] = None
+_lock = threading.Lock()
+
+
+async def _connect() -> MtprotoPublisher:
+    client = TelegramClient(SESSION, API_ID, API_HASH)
+    if BOT_TOKEN:
+        await client.start(bot_token=BOT_TOKEN)
+    else:
+        await client.start()
+    return MtprotoPublisher(client)
+
+
+def get_publisher() -> Tuple[MtprotoPublisher, asyncio.AbstractEventLoop]:
+    global _loop, _publisher
+    with _lock:
+        if _publisher is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mtproto-publisher", daemon=True).start()
+            _publisher = asyncio.run_coroutine_threadsafe(_connect(), _loop).result()
+        return _publisher, _loop
+
+
+def publish_mtproto(channels, text: str, media: Union[Media, List[Media], None] = None) -> int:
+    """Blocking entry point for the dispatcher; media is a path, URL or a list of them"""
+    publisher, loop = get_publisher()
+    chats = channels if isinstance(channels, (list, tuple)) else [channels]
+    if media is None:
+        media = []
+    elif not isinstance(media, (list, tuple)):
+        media = [media]
+    return asyncio.run_coroutine_threadsafe(publisher.publish(chats, text, media), loop).result()
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import datetime
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import http_client
+
+RATINGS_FILE = "ratings.json"
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+# En dessous, la note d'une équipe n'est pas encore fiable
+MIN_GAMES = 5
+
+# (match_id, date ISO, home_id, away_id, home_goals, away_goals)
+Result = Tuple[str, str, str, str, int, int]
+
+
+def goal_multiplier(goal_diff: int) -> float:
+    """World Football Elo margin-of-victory factor"""
+    n = abs(goal_diff)
+    if n <= 1:
+        return 1.0
+    if n == 2:
+        return 1.5
+    return (11 + n) / 8
+
+
+class EloRatings:
+    """Elo ratings stored in flat arrays, indexed by team ID"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.ratings = array("d")
+        self.games = array("I")
+        self.seen = set()
+
+    def _slot(self, team_id: str) -> int:
+        slot = self.index.get(team_id)
+        if slot is None:
+            slot = self.index[team_id] = len(self.ratings)
+            self.ratings.append(INITIAL_RATING)
+            self.games.append(0)
+        return slot
+
+    def rating(self, team_id: str) -> Optional[float]:
+        slot = self.index.get(str(team_id))
+        if slot is None or self.games[slot] < MIN_GAMES:
+            return None
+        return self.ratings[slot]
+
+    def expected_home(self, home_id: str, away_id: str) -> float:
+        h = self.ratings[self._slot(str(home_id))]
+        a = self.ratings[self._slot(str(away_id))]
+        return 1.0 / (1.0 + 10 ** ((a - h - HOME_ADVANTAGE) / 400))
+
+    def update(self, match_id: str, home_id: str, away_id: str, home_goals: int, away_goals: int) -> bool:
+        """Apply one completed result; a match already counted is ignored"""
+        if match_id in self.seen:
+            return False
+        self.seen.add(match_id)
+
+        h = self._slot(str(home_id))
+        a = self._slot(str(away_id))
+
+        expected = 1.0 / (1.0 + 10 ** ((self.ratings[a] - self.ratings[h] - HOME_ADVANTAGE) / 400))
+        actual = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+        delta = K_FACTOR * goal_multiplier(home_goals - away_goals) * (actual - expected)
+
+        self.ratings[h] += delta
+        self.ratings[a] -= delta
+        self.games[h] += 1
+        self.games[a] += 1
+        return True
+
+    def rebuild(self, results: Iterable[Result]) -> int:
+        """Recompute every rating from scratch, in chronological order"""
+        self.index.clear()
+        self.ratings = array("d")
+        self.games = array("I")
+        self.seen.clear()
+
+        count = 0
+        for match_id, _, home_id, away_id, hg, ag in sorted(results, key=lambda r: r[1]):
+            count += self.update(match_id, home_id, away_id, hg, ag)
+        return count
+
+    # ---------------- PERSISTANCE ----------------
+    def save(self, path: str = RATINGS_FILE) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "teams": {t: [round(self.ratings[i], 2), self.games[i]] for t, i in self.index.items()},
+                "seen": sorted(self.seen)
+            }, f)
+
+    @classmethod
+    def load(cls, path: str = RATINGS_FILE) -> "EloRatings":
+        engine = cls()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for team_id, (rating, games) in data.get("teams", {}).items():
+                slot = engine._slot(team_id)
+                engine.ratings[slot] = rating
+                engine.games[slot] = games
+            engine.seen = set(data.get("seen", []))
+        return engine
+
+
+# ---------------- ESPN ----------------
+def result_from_espn_event(event: Dict) -> Optional[Result]:
+    """Completed ESPN event -> Result, or None if not usable"""
+    status = event.get("status", {}).get("type", {})
+    if not (status.get("completed") or status.get("id") == "3"):
+        return None
+
+    competitors = event.get("competitions", [{}])[0].get("competitors", [])
+    if len(competitors) < 2:
+        return None
+
+    home = next((c for c in competitors if c.get("homeAway") == "home"), competitors[0])
+    away = next((c for c in competitors if c is not home), competitors[1])
+
+    try:
+        home_goals = int(_score(home))
+        away_goals = int(_score(away))
+    except (TypeError, ValueError):
+        return None
+
+    return (
+        str(event.get("id")),
+        event.get("date", ""),
+        str(home.get("team", {}).get("id")),
+        str(away.get("team", {}).get("id")),
+        home_goals,
+        away_goals
+    )
+
+
+def _score(competitor: Dict):
+    # Le scoreboard donne "2", le calendrier d'équipe {"value": 2.0, "displayValue": "2"}
+    score = competitor.get("score")
+    if isinstance(score, dict):
+        return score.get("value", score.get("displayValue"))
+    return score
+
+
+def fetch_season_results(league: str, start: datetime.date, end: datetime.date) -> List[Result]:
+    url = (
+        f"https://site.api.espn.com/apis/site/v2/sports/soccer/{league}/scoreboard"
+        f"?dates={start.strftime('%Y%m%d')}-{end.strftime('%Y%m%d')}&limit=1000"
+    )
+    response = http_client.get(url, timeout=30)
+    response.raise_for_status()
+    results = [result_from_espn_event(e) for e in response.json().get("events", [])]
+    return [r for r in results if r]
+
+
+def main(argv=None) -> None:
+    """python ratings.py rebuild <jours> [ligue ...]"""
+    argv = argv if argv is not None else sys.argv[1:]
+    if not argv or argv[0] != "rebuild":
+        print("Usage : python ratings.py rebuild [jours] [ligue ...]")
+        return
+
+    days = int(argv[1]) if len(argv) > 1 else 365
+    leagues = argv[2:] or ["uefa.champions", "eng.1", "esp.1", "ita.1", "ger.1", "fra.1", "por.1", "ned.1"]
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=days)
+
+    results = []
+    for league in leagues:
+        try:
+            league_results = fetch_season_results(league, start, end)
+        except Exception as e:
+            print(f"[WARN] {league} : {e}")
+            continue
+        print(f"[INFO] {league} → {len(league_results)} résultat(s)")
+        results.extend(league_results)
+
+    engine = EloRatings()
+    t0 = time.perf_counter()
+    count = engine.rebuild(results)
+    print(f"✅ {count} match(s) rejoué(s) en {(time.perf_counter() - t0) * 1000:.1f} ms, {len(engine.index)} équipe(s)")
+    engine.save()
+
+
+if __name__ == "__main__":
+    main()
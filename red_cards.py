@@ -1,39 +1,29 @@
-import requests
-
-API_KEY = "API_FOOTBALL_KEY"
-URL = "https://v3.football.api-sports.io/fixtures?live=all"
-HEADERS = {"x-apisports-key": API_KEY}
-
-known_reds = set()
-
-def check_red_cards():
-    r = requests.get(URL, headers=HEADERS)
-    matches = r.json()["response"]
+from live_poller import LiveSnapshot, current_snapshot
+from live_state import RED_CARD, RED_CARD_CORRECTED
 
+def detect_red_cards(snapshot: LiveSnapshot):
     alerts = []
 
-    for m in matches:
-        fixture_id = m["fixture"]["id"]
-        league = m["league"]["name"]
-        home = m["teams"]["home"]["name"]
-        away = m["teams"]["away"]["name"]
+    for e in snapshot.events:
+        if e.kind == RED_CARD_CORRECTED:
+            alerts.append(f"✏️ **CORRECTION CARTON ROUGE**\n⚽ {e.home} 🆚 {e.away}\n👤 {e.player} ({e.minute}')")
+            continue
+        if e.kind != RED_CARD:
+            continue
 
-        for event in m["events"]:
-            if event["type"] == "Card" and event["detail"] == "Red Card":
-                key = f"{fixture_id}-{event['player']['name']}"
-                if key not in known_reds:
-                    known_reds.add(key)
+        alerts.append(
+            f"""🟥 **CARTON ROUGE !**
 
-                    alerts.append(
-                        f"""🟥 **CARTON ROUGE !**
-
-⚽ {home} 🆚 {away}
-👤 Joueur : {event['player']['name']}
-⏱ {event['time']['elapsed']}'
-🏆 {league}
+⚽ {e.home} 🆚 {e.away}
+👤 Joueur : {e.player}
+⏱ {e.minute}'
+🏆 {e.league}
 
 🔥 Match totalement relancé !
 """
-                    )
+        )
 
     return alerts
+
+def check_red_cards():
+    return detect_red_cards(current_snapshot())
@@ -0,0 +1,295 @@
+"""
+Enregistrement / rejeu des réponses HTTP (ESPN, API-Football, RSS, Telegram).
+
+Enregistrer :  HTTP_RECORD_DIR=fixtures python main3.py
+Rejouer     :  python replay.py serve --dir fixtures --port 8765
+               HTTP_REPLAY_URL=http://127.0.0.1:8765 BOT_TOKEN=0:replay CHANNEL_ID=@test python main3.py
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INDEX_FILE = "index.json"
+TELEGRAM_HOST = "api.telegram.org"
+TOKEN_RE = re.compile(r"/bot[^/]+/")
+
+
+def canonical_url(url: str) -> str:
+    """URL without bot token and with sorted query, used as the fixture key"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qs(parts.query, keep_blank_values=True).items()), doseq=True)
+    path = TOKEN_RE.sub("/bot<token>/", parts.path)
+    return f"{parts.netloc}{path}" + (f"?{query}" if query else "")
+
+
+def fixture_key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {canonical_url(url)}".encode()).hexdigest()
+
+
+class FixtureStore:
+    """Gzipped response bodies on disk, indexed by method + canonical URL"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index: Dict[str, Dict] = {}
+
+        path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def save(self, method: str, url: str, status: int, headers: Dict, content: bytes) -> None:
+        key = fixture_key(method, url)
+        with open(os.path.join(self.directory, key + ".gz"), "wb") as f:
+            f.write(gzip.compress(content))
+
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        with self._lock:
+            self.index[key] = {
+                "method": method.upper(),
+                "url": canonical_url(url),
+                "status": status,
+                "headers": keep,
+                "recorded_at": int(time.time())
+            }
+            with open(os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+
+    def load(self, method: str, url: str) -> Optional[Tuple[int, Dict, bytes]]:
+        key = fixture_key(method, url)
+        meta = self.index.get(key)
+        if meta is None:
+            return None
+        with open(os.path.join(self.directory, key + ".gz"), "rb") as f:
+            return meta["status"], meta["headers"], gzip.decompress(f.read())
+
+
+_recorder: Optional[FixtureStore] = None
+
+
+def record(method: str, url: str, status: int, headers: Dict, content: bytes) -> None:
+    """Called by http_client for every network response when HTTP_RECORD_DIR is set"""
+    global _recorder
+    if _recorder is None:
+        _recorder = FixtureStore(os.environ["HTTP_RECORD_DIR"])
+    _recorder.save(method, url, status, headers, content)
+
+
+# ---------------- FAKE BOT API ----------------
+class FakeBotAPI:
+    """Accepts sendMessage / sendPhoto like the Telegram Bot API and keeps what was sent"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 flood_rate: float = 0.0, retry_after: int = 1, seed: int = 0):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._random = random.Random(seed)
+        self.sent: List[Dict] = []
+
+        # Injection de pannes (tests de charge)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self.floods = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sent = []
+            self.requests = self.errors = self.floods = 0
+
+    def _inject(self) -> Optional[Tuple[int, Dict]]:
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            if roll < self.flood_rate:
+                self.floods += 1
+                return 429, {
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after}
+                }
+            if roll < self.flood_rate + self.error_rate:
+                self.errors += 1
+                return 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+        return None
+
+    def handle(self, method: str, params: Dict) -> Tuple[int, Dict]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        failure = self._inject()
+        if failure:
+            return failure
+
+        if method == "getMe":
+            return 200, {"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "Replay", "username": "replay_bot"
+            }}
+
+        if method not in ("sendMessage", "sendPhoto", "sendVideo", "sendMediaGroup", "pinChatMessage"):
+            return 200, {"ok": True, "result": True}
+
+        with self._lock:
+            message_id = self._next_id
+            self._next_id += 1
+            self.sent.append({"method": method, "params": params, "at": time.time()})
+
+        if method == "pinChatMessage":
+            return 200, {"ok": True, "result": True}
+
+        chat = params.get("chat_id", "0")
+        result = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(chat) if str(chat).lstrip("-").isdigit() else -100, "type": "channel"},
+        }
+        if "text" in params:
+            result["text"] = params["text"]
+        if "caption" in params:
+            result["caption"] = params["caption"]
+        return 200, {"ok": True, "result": result}
+
+
+def _parse_body(handler: BaseHTTPRequestHandler) -> Dict:
+    length = int(handler.headers.get("Content-Length") or 0)
+    body = handler.rfile.read(length) if length else b""
+    content_type = handler.headers.get("Content-Type", "")
+
+    if "application/json" in content_type:
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+    if "application/x-www-form-urlencoded" in content_type:
+        return {k: v[0] for k, v in parse_qs(body.decode("utf-8", "replace")).items()}
+    if "multipart/form-data" in content_type:
+        # Champs texte uniquement, les fichiers sont ignorés
+        params = {}
+        for name, value in re.findall(rb'name="([^"]+)"\r\n\r\n(.*?)\r\n--', body, re.S):
+            params[name.decode()] = value.decode("utf-8", "replace")
+        return params
+    return {}
+
+
+class ReplayServer:
+    """Local stand-in serving recorded fixtures and a fake Bot API"""
+
+    def __init__(self, directory: Optional[str] = None, host: str = "127.0.0.1", port: int = 0,
+                 bot_api: Optional[FakeBotAPI] = None):
+        self.store = FixtureStore(directory) if directory else None
+        self.bot_api = bot_api or FakeBotAPI()
+        self.misses: List[str] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, headers: Dict, content: bytes) -> None:
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def _original_url(self) -> str:
+                # Les clients réécrivent https://hote/chemin en http://replay/hote/chemin
+                return "https://" + self.path.lstrip("/")
+
+            def _handle(self, method: str) -> None:
+                url = self._original_url()
+                parts = urlsplit(url)
+
+                if parts.netloc == TELEGRAM_HOST:
+                    params = _parse_body(self) if method == "POST" else {}
+                    params.update({k: v[0] for k, v in parse_qs(parts.query).items()})
+                    status, payload = server.handle_bot_api(parts.path.rsplit("/", 1)[-1], params)
+                    self._reply(status, {"Content-Type": "application/json"}, json.dumps(payload).encode())
+                    return
+
+                found = server.store.load(method, url) if server.store else None
+                if found is None:
+                    server.misses.append(canonical_url(url))
+                    self._reply(404, {"Content-Type": "text/plain"}, b"not recorded")
+                    return
+                status, headers, content = found
+                self._reply(status, headers, content)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def handle_bot_api(self, method: str, params: Dict) -> Tuple[int, Dict]:
+        return self.bot_api.handle(method, params)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rejeu des réponses HTTP enregistrées")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="servir les fixtures et un faux Bot API")
+    serve.add_argument("--dir", default="fixtures")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    ls = sub.add_parser("list", help="lister les réponses enregistrées")
+    ls.add_argument("--dir", default="fixtures")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for meta in FixtureStore(args.dir).index.values():
+            print(f"{meta['method']:4} {meta['status']} {meta['url']}")
+        return
+
+    server = ReplayServer(args.dir, args.host, args.port)
+    print(f"🎞️ Rejeu sur {server.url} ({len(server.store.index)} réponse(s))")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📨 {len(server.bot_api.sent)} message(s) reçus, {len(server.misses)} requête(s) non enregistrée(s)")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
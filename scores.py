@@ -1,4 +1,4 @@
-import requests
+import http_client
 
 API_KEY = "API_FOOTBALL_KEY"
 URL = "https://v3.football.api-sports.io/fixtures?date="
@@ -9,7 +9,7 @@ def get_today_matches():
     from datetime import date
     today = date.today()
 
-    r = requests.get(URL + str(today), headers=HEADERS)
+    r = http_client.get(URL + str(today), headers=HEADERS)
     data = r.json()
 
     if not data["response"]:
@@ -1,29 +1,25 @@
-import requests
-import time
-
-API_KEY = "API_FOOTBALL_KEY"
-URL = "https://v3.football.api-sports.io/fixtures?live=all"
-HEADERS = {"x-apisports-key": API_KEY}
-
-last_scores = {}
-
-def check_live_goals():
-    r = requests.get(URL, headers=HEADERS)
-    data = r.json()["response"]
+from live_poller import LiveSnapshot, current_snapshot
+from live_state import GOAL, GOAL_CANCELLED, GOAL_CORRECTED
 
+def detect_goals(snapshot: LiveSnapshot):
     alerts = []
 
-    for match in data:
-        fixture_id = match["fixture"]["id"]
-        home = match["teams"]["home"]["name"]
-        away = match["teams"]["away"]["name"]
-        score = f'{match["goals"]["home"]}-{match["goals"]["away"]}'
-
-        if fixture_id in last_scores and last_scores[fixture_id] != score:
+    for e in snapshot.events:
+        if e.kind == GOAL:
+            scorer = f"\n👤 {e.player} ({e.minute}')" if e.player else ""
             alerts.append(
-                f"🚨 **BUT !!!**\n⚽ {home} {score} {away}\n🔥 Match en direct"
+                f"🚨 **BUT !!!**\n⚽ {e.home} {e.score} {e.away}{scorer}\n🔥 Match en direct"
+            )
+        elif e.kind == GOAL_CANCELLED:
+            alerts.append(
+                f"❌ **BUT ANNULÉ (VAR)**\n⚽ {e.home} {e.score} {e.away}\n🔥 Match en direct"
+            )
+        elif e.kind == GOAL_CORRECTED:
+            alerts.append(
+                f"✏️ **CORRECTION DU BUT**\n⚽ {e.home} {e.score} {e.away}\n👤 {e.player} ({e.minute}')"
             )
-
-        last_scores[fixture_id] = score
 
     return alerts
+
+def check_live_goals():
+    return detect_goals(current_snapshot())
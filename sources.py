@@ -1,4 +1,5 @@
 import feedparser
+import http_client
 
 RSS = [
     "https://www.lequipe.fr/rss/actu_rss_Football.xml",
@@ -10,7 +11,11 @@ def fetch_news():
     articles = []
 
     for url in RSS:
-        feed = feedparser.parse(url)
+        try:
+            feed = feedparser.parse(http_client.get(url, ttl=0).content)
+        except Exception as e:
+            print("Erreur RSS :", url, e)
+            continue
         for e in feed.entries[:3]:
             articles.append({
                 "title": e.title,
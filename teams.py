@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import difflib
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+TEAMS_FILE = "teams.json"
+
+# Seuil de similarité pour la recherche approchée
+FUZZY_CUTOFF = 0.86
+
+# Mots sans valeur discriminante dans les noms de clubs
+# ("sc" n'en fait pas partie : Barcelona SC n'est pas le FC Barcelone)
+STOP_WORDS = {"fc", "cf", "afc", "ac", "as", "ssc", "club", "de", "the", "calcio"}
+
+# Équipes réserves, jeunes et féminines : jamais rapprochées de l'équipe première
+RESERVE_WORDS = {"ii", "iii", "b", "c", "reserve", "reserves", "youth", "academy", "women", "w",
+                 "femenino", "feminine", "u17", "u18", "u19", "u20", "u21", "u23"}
+
+TIER_BIG = 1
+TIER_OTHER = 3
+
+
+@dataclass
+class TeamRecord:
+    key: str
+    name: str
+    country: str = ""
+    tier: int = TIER_OTHER
+    espn_ids: Set[str] = field(default_factory=set)
+    apifootball_ids: Set[str] = field(default_factory=set)
+    aliases: Set[str] = field(default_factory=set)
+
+    @property
+    def is_big(self) -> bool:
+        return self.tier == TIER_BIG
+
+    @property
+    def rating(self) -> Optional[float]:
+        if _ratings is None:
+            return None
+        for espn_id in self.espn_ids:
+            rating = _ratings.rating(espn_id)
+            if rating is not None:
+                return rating
+        return None
+
+
+# (clé, nom, pays, IDs ESPN, IDs API-Football, alias)
+SEED = [
+    ("real-madrid", "Real Madrid", "ES", ["86"], ["541"], ["Real Madrid CF"]),
+    ("barcelona", "Barcelona", "ES", ["83"], ["529"], ["FC Barcelona", "Barça"]),
+    ("manchester-city", "Manchester City", "GB", ["382"], ["50"], ["Man City", "Man. City"]),
+    ("bayern-munich", "Bayern Munich", "DE", ["132"], ["157"], ["FC Bayern München", "Bayern München", "Bayern"]),
+    ("paris-saint-germain", "Paris Saint-Germain", "FR", ["160"], ["85"], ["PSG", "Paris SG", "Paris Saint Germain"]),
+    ("liverpool", "Liverpool", "GB", ["364"], ["40"], ["Liverpool FC"]),
+    ("arsenal", "Arsenal", "GB", ["359"], ["42"], ["Arsenal FC"]),
+    ("inter", "Internazionale", "IT", ["110"], ["505"], ["Inter", "Inter Milan", "FC Internazionale Milano"]),
+    ("juventus", "Juventus", "IT", ["111"], ["496"], ["Juventus FC", "Juve"]),
+    ("ac-milan", "AC Milan", "IT", ["103"], ["489"], ["Milan"]),
+    ("chelsea", "Chelsea", "GB", ["363"], ["49"], ["Chelsea FC"]),
+    ("borussia-dortmund", "Borussia Dortmund", "DE", ["124"], ["165"], ["Dortmund", "BVB", "Borussia Dortmund 09"]),
+]
+
+
+def normalize(name: str) -> str:
+    """'FC Bayern München' -> 'bayern munchen'"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = [w for w in re.split(r"[^a-z0-9]+", text) if w and w not in STOP_WORDS]
+    return " ".join(words)
+
+
+class TeamIndex:
+    """ESPN IDs, API-Football IDs and name aliases -> one canonical TeamRecord"""
+
+    def __init__(self):
+        self.by_key: Dict[str, TeamRecord] = {}
+        self.by_alias: Dict[str, TeamRecord] = {}
+        self.by_espn: Dict[str, TeamRecord] = {}
+        self.by_apifootball: Dict[str, TeamRecord] = {}
+
+    def add(self, record: TeamRecord) -> TeamRecord:
+        self.by_key[record.key] = record
+        for alias in record.aliases | {record.name}:
+            self.by_alias[normalize(alias)] = record
+        for espn_id in record.espn_ids:
+            self.by_espn[espn_id] = record
+        for api_id in record.apifootball_ids:
+            self.by_apifootball[api_id] = record
+        self._resolve_name.cache_clear()
+        return record
+
+    @lru_cache(maxsize=4096)
+    def _resolve_name(self, name: str) -> Tuple[Optional[TeamRecord], bool]:
+        """(record, exact): exact alias match, else a guarded fuzzy match"""
+        norm = normalize(name)
+        if not norm:
+            return None, False
+        record = self.by_alias.get(norm)
+        if record:
+            return record, True
+        words = norm.split()
+        if RESERVE_WORDS.intersection(words):
+            return None, False
+        # Variante d'orthographe seulement : même nombre de mots, dont un identique
+        candidates = [
+            alias for alias in self.by_alias
+            if len(alias.split()) == len(words) and set(alias.split()) & set(words)
+        ]
+        close = difflib.get_close_matches(norm, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return (self.by_alias[close[0]], False) if close else (None, False)
+
+    def resolve(
+        self,
+        name: str = None,
+        espn_id: str = None,
+        apifootball_id: str = None
+    ) -> Optional[TeamRecord]:
+        """Find a team by ID first, then by exact alias, then by fuzzy name"""
+        if espn_id is not None and str(espn_id) in self.by_espn:
+            return self.by_espn[str(espn_id)]
+        if apifootball_id is not None and str(apifootball_id) in self.by_apifootball:
+            return self.by_apifootball[str(apifootball_id)]
+        if not name:
+            return None
+
+        record, exact = self._resolve_name(name)
+        # On retient l'ID pour que la prochaine recherche soit directe, jamais sur
+        # une correspondance approchée qui serait ensuite sauvegardée dans teams.json
+        if record is not None and exact:
+            if espn_id is not None:
+                record.espn_ids.add(str(espn_id))
+                self.by_espn[str(espn_id)] = record
+            if apifootball_id is not None:
+                record.apifootball_ids.add(str(apifootball_id))
+                self.by_apifootball[str(apifootball_id)] = record
+        return record
+
+    def tier(self, name: str = None, espn_id: str = None) -> int:
+        record = self.resolve(name, espn_id)
+        return record.tier if record else TIER_OTHER
+
+    def is_big(self, name: str = None, espn_id: str = None) -> bool:
+        return self.tier(name, espn_id) == TIER_BIG
+
+    def big_team_names(self) -> List[str]:
+        return [r.name for r in self.by_key.values() if r.is_big]
+
+    # ---------------- PERSISTANCE ----------------
+    def save(self, path: str = TEAMS_FILE) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([
+                {
+                    "key": r.key, "name": r.name, "country": r.country, "tier": r.tier,
+                    "espn_ids": sorted(r.espn_ids), "apifootball_ids": sorted(r.apifootball_ids),
+                    "aliases": sorted(r.aliases)
+                }
+                for r in self.by_key.values()
+            ], f, ensure_ascii=False, indent=1)
+
+    def load(self, path: str = TEAMS_FILE) -> None:
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                record = self.by_key.get(item["key"])
+                if record is None:
+                    record = TeamRecord(item["key"], item["name"], item.get("country", ""), item.get("tier", TIER_OTHER))
+                record.espn_ids.update(item.get("espn_ids", []))
+                record.apifootball_ids.update(item.get("apifootball_ids", []))
+                record.aliases.update(item.get("aliases", []))
+                self.add(record)
+
+
+def build_index() -> TeamIndex:
+    index = TeamIndex()
+    for key, name, country, espn_ids, api_ids, aliases in SEED:
+        index.add(TeamRecord(key, name, country, TIER_BIG, set(espn_ids), set(api_ids), set(aliases)))
+    index.load()
+    return index
+
+
+_ratings = None
+
+
+def attach_ratings(engine) -> None:
+    """Expose an EloRatings engine through TeamRecord.rating"""
+    global _ratings
+    _ratings = engine
+
+
+TEAMS = build_index()
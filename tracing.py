@@ -0,0 +1,176 @@
+"""
+Mesure des étapes d'un passage et profilage optionnel.
+
+    with tracing.span("form"):
+        ...
+    print(tracing.summary_table())
+
+    python main3.py --profile                  # échantillonnage -> profile.folded
+    python main3.py --profile run.prof --profile-mode cprofile
+
+Le fichier .folded (une pile par ligne, "a;b;c N") se lit avec flamegraph.pl,
+speedscope ou inferno ; le .prof de cProfile avec snakeviz ou flameprof.
+"""
+import sys
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import metrics
+
+# Intervalle d'échantillonnage du profileur (secondes)
+SAMPLE_INTERVAL = 0.005
+
+_local = threading.local()
+_lock = threading.Lock()
+# chemin "collect/form" -> [appels, total, max, temps propre]
+_spans: Dict[str, List[float]] = {}
+_order: List[str] = []
+
+
+def _stack() -> List[List]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage; nested spans are reported under their parent's path"""
+    stack = _stack()
+    path = f"{stack[-1][0]}/{name}" if stack else name
+    frame = [path, 0.0]  # temps passé dans les sous-étapes
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        with _lock:
+            stats = _spans.get(path)
+            if stats is None:
+                stats = _spans[path] = [0, 0.0, 0.0, 0.0]
+                _order.append(path)
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3] += elapsed - frame[1]
+        metrics.observe("span_seconds", elapsed, span=path, **attrs)
+
+
+def traced(name: str = None) -> Callable:
+    """Decorator form of span()"""
+    def decorator(func):
+        label = name or func.__name__
+
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
+        _order.clear()
+
+
+def report() -> Dict[str, Dict]:
+    with _lock:
+        return {
+            path: {"count": s[0], "total": s[1], "max": s[2], "self": s[3]}
+            for path, s in ((p, _spans[p]) for p in _order)
+        }
+
+
+def summary_table() -> str:
+    """Per-stage table, nested stages indented under their parent"""
+    rows = report()
+    if not rows:
+        return "(aucune étape mesurée)"
+
+    # Parents avant enfants, dans l'ordre de première apparition
+    first_seen = {path: i for i, path in enumerate(rows)}
+
+    def sort_key(path):
+        parts = path.split("/")
+        return [first_seen.get("/".join(parts[:i + 1]), 0) for i in range(len(parts))]
+
+    lines = [f"{'étape':<32} {'appels':>7} {'total s':>9} {'propre s':>9} {'moy ms':>9} {'max ms':>9}"]
+    for path in sorted(rows, key=sort_key):
+        r = rows[path]
+        depth = path.count("/")
+        label = "  " * depth + path.rsplit("/", 1)[-1]
+        lines.append(
+            f"{label:<32} {r['count']:>7} {r['total']:>9.2f} {r['self']:>9.2f} "
+            f"{r['total'] / r['count'] * 1000:>9.1f} {r['max'] * 1000:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+# ---------------- PROFILAGE ----------------
+class SamplingProfiler:
+    """Samples one thread's Python stack and counts folded stacks"""
+
+    def __init__(self, thread_id: int = None, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def run_profiled(func: Callable, output: str, mode: str = "sample", *args, **kwargs):
+    """Run func under the sampling profiler (folded stacks) or cProfile (.prof)"""
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            profiler.dump_stats(output)
+            print(f"[PROFILE] Statistiques cProfile écrites dans {output}")
+
+    profiler = SamplingProfiler().start()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.stop()
+        profiler.write_folded(output)
+        print(f"[PROFILE] {sum(profiler.samples.values())} échantillon(s) écrits dans {output}")
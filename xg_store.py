@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from teams import TEAMS, TeamRecord, normalize
+
+XG_STORE_FILE = "xg_store.npz"
+# Réponses Understat enregistrées, relues par "python xg_store.py check"
+RECORDED_DIR = os.path.join("fixtures", "understat")
+# Fichiers écrits à la main au format Understat, pas des réponses réelles
+SYNTHETIC_SUFFIX = "_synthetic"
+
+# Nombre de matchs récents moyennés pour l'attaque / la défense
+XG_WINDOW = 10
+# En dessous, la moyenne xG n'est pas encore fiable
+MIN_XG_MATCHES = 3
+
+# Ligue ESPN -> ligue Understat
+UNDERSTAT_LEAGUES = {
+    "eng.1": "EPL",
+    "esp.1": "La_Liga",
+    "ger.1": "Bundesliga",
+    "ita.1": "Serie_A",
+    "fra.1": "Ligue_1",
+}
+
+# (clé équipe, id match Understat, timestamp, xG pour, xG contre)
+Row = Tuple[str, int, int, float, float]
+
+
+def team_key(name: str) -> str:
+    """Canonical teams.TEAMS key of an Understat team, registering unknown clubs"""
+    record = TEAMS.resolve(name)
+    if record is None:
+        record = TEAMS.add(TeamRecord(normalize(name).replace(" ", "-"), name))
+    return record.key
+
+
+def rows_from_understat(matches: Iterable[Dict]) -> List[Row]:
+    """Understat league 'dates' list -> two rows (home, away) per played match"""
+    rows = []
+    for m in matches:
+        if not m.get("isResult"):
+            continue
+        try:
+            match_id = int(m["id"])
+            ts = int(datetime.datetime.strptime(m["datetime"], "%Y-%m-%d %H:%M:%S").timestamp())
+            xg_home, xg_away = float(m["xG"]["h"]), float(m["xG"]["a"])
+            home, away = team_key(m["h"]["title"]), team_key(m["a"]["title"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        rows.append((home, match_id, ts, xg_home, xg_away))
+        rows.append((away, match_id, ts, xg_away, xg_home))
+    return rows
+
+
+class XGStore:
+    """Per-team xG for/against arrays, concatenated and sliced by offsets"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.match_ids = np.empty(0, dtype=np.int64)
+        self.ts = np.empty(0, dtype=np.int64)
+        self.xg_for = np.empty(0, dtype=np.float32)
+        self.xg_against = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Row]) -> "XGStore":
+        # Dédoublonnage (équipe, match) puis tri par équipe et par date
+        unique = {(r[0], r[1]): r for r in rows}
+        rows = sorted(unique.values(), key=lambda r: (r[0], r[2]))
+
+        store = cls()
+        store.keys = sorted({r[0] for r in rows})
+        store.index = {k: i for i, k in enumerate(store.keys)}
+        counts = np.bincount([store.index[r[0]] for r in rows], minlength=len(store.keys))
+        store.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        store.match_ids = np.array([r[1] for r in rows], dtype=np.int64)
+        store.ts = np.array([r[2] for r in rows], dtype=np.int64)
+        store.xg_for = np.array([r[3] for r in rows], dtype=np.float32)
+        store.xg_against = np.array([r[4] for r in rows], dtype=np.float32)
+        return store
+
+    def rows(self) -> List[Row]:
+        rows = []
+        for key, i in self.index.items():
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                rows.append((key, int(self.match_ids[j]), int(self.ts[j]),
+                             float(self.xg_for[j]), float(self.xg_against[j])))
+        return rows
+
+    def merge(self, rows: Iterable[Row]) -> "XGStore":
+        return XGStore.from_rows(self.rows() + list(rows))
+
+    # ---------------- LECTURE ----------------
+    def strengths(self, key: str, before: int = None, window: int = XG_WINDOW) -> Optional[Tuple[float, float]]:
+        """(xG for, xG against) per match over the last `window` matches before `before`"""
+        i = self.index.get(key)
+        if i is None:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if before is not None:
+            end = start + int(np.searchsorted(self.ts[start:end], before))
+        start = max(start, end - window)
+        if end - start < MIN_XG_MATCHES:
+            return None
+        return float(self.xg_for[start:end].mean()), float(self.xg_against[start:end].mean())
+
+    def lookup(self, name: str, espn_id: str = None, before: int = None) -> Optional[Tuple[float, float]]:
+        record = TEAMS.resolve(name, espn_id)
+        key = record.key if record else normalize(name).replace(" ", "-")
+        return self.strengths(key, before)
+
+    # ---------------- PERSISTANCE ----------------
+    def save(self, path: str = XG_STORE_FILE) -> None:
+        np.savez_compressed(
+            path,
+            keys=np.array(self.keys, dtype=str),
+            offsets=self.offsets,
+            match_ids=self.match_ids,
+            ts=self.ts,
+            xg_for=self.xg_for,
+            xg_against=self.xg_against
+        )
+
+    @classmethod
+    def load(cls, path: str = XG_STORE_FILE) -> "XGStore":
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        with np.load(path) as data:
+            store.keys = [str(k) for k in data["keys"]]
+            store.offsets = data["offsets"]
+            store.match_ids = data["match_ids"]
+            store.ts = data["ts"]
+            store.xg_for = data["xg_for"]
+            store.xg_against = data["xg_against"]
+        store.index = {k: i for i, k in enumerate(store.keys)}
+        return store
+
+
+# ---------------- INGESTION ----------------
+def current_season(today: datetime.date = None) -> str:
+    """Understat seasons are named after their starting year"""
+    today = today or datetime.date.today()
+    return str(today.year if today.month >= 7 else today.year - 1)
+
+
+def fetch_league_matches(league: str, season: str, record_dir: str = None) -> List[Dict]:
+    """One bulk request per league-season, optionally recorded for offline replays"""
+    from understatapi import UnderstatClient
+
+    with UnderstatClient() as understat:
+        matches = understat.league(league=league).get_match_data(season=season)
+
+    if record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+        with open(os.path.join(record_dir, f"{league}_{season}.json"), "w", encoding="utf-8") as f:
+            json.dump(matches, f, ensure_ascii=False)
+    return matches
+
+
+def load_recorded(directory: str) -> Dict[str, List[Dict]]:
+    """Recorded league-season responses written by fetch_league_matches"""
+    recorded = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                recorded[name[:-5]] = json.load(f)
+    return recorded
+
+
+def check_recorded(directory: str = RECORDED_DIR) -> List[str]:
+    """Parse recorded responses end to end; returns the problems found (empty when all is well)"""
+    import tempfile
+
+    recorded = load_recorded(directory) if os.path.isdir(directory) else {}
+    if not recorded:
+        return [f"aucune réponse enregistrée dans {directory}"]
+
+    problems = []
+    rows = []
+    for name, matches in recorded.items():
+        played = sum(1 for m in matches if m.get("isResult"))
+        league_rows = rows_from_understat(matches)
+        if len(league_rows) != 2 * played:
+            problems.append(f"{name} : {played} match(s) joué(s), {len(league_rows) // 2} lu(s)")
+        for home, away in zip(league_rows[::2], league_rows[1::2]):
+            if home[1] != away[1] or (home[3], home[4]) != (away[4], away[3]):
+                problems.append(f"{name} : match {home[1]} mal apparié")
+            if min(home[3], home[4]) < 0:
+                problems.append(f"{name} : xG négatif pour le match {home[1]}")
+        rows.extend(league_rows)
+
+    store = XGStore.from_rows(rows)
+    for key, i in store.index.items():
+        if np.any(np.diff(store.ts[store.offsets[i]:store.offsets[i + 1]]) < 0):
+            problems.append(f"{key} : matchs hors ordre chronologique")
+
+    # Aller-retour disque : le fichier relu doit donner les mêmes lignes
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, XG_STORE_FILE)
+        store.save(path)
+        if sorted(XGStore.load(path).rows()) != sorted(store.rows()):
+            problems.append("relecture de xg_store.npz différente des lignes écrites")
+
+    synthetic = [name for name in recorded if name.endswith(SYNTHETIC_SUFFIX)]
+    if synthetic:
+        print(f"[WARN] Échantillon(s) synthétique(s), pas des réponses Understat réelles : {', '.join(synthetic)}")
+    print(f"[INFO] {len(recorded)} enregistrement(s), {len(rows) // 2} match(s), {len(store.keys)} équipe(s)")
+    return problems
+
+
+def main(argv=None) -> int:
+    """
+    python xg_store.py ingest [saison] [ligue ...] [--record DIR]
+    python xg_store.py ingest --from DIR
+    python xg_store.py check [DIR]
+    python xg_store.py show <équipe>
+    """
+    argv = list(argv if argv is not None else sys.argv[1:])
+    if not argv or argv[0] not in ("ingest", "show", "check"):
+        print(main.__doc__)
+        return 1
+
+    if argv[0] == "check":
+        problems = check_recorded(argv[1] if len(argv) > 1 else RECORDED_DIR)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print("✅ Réponses enregistrées lues sans erreur")
+        return 1 if problems else 0
+
+    if argv[0] == "show":
+        store = XGStore.load()
+        name = " ".join(argv[1:])
+        result = store.lookup(name)
+        print(f"{name} → xG pour {result[0]:.2f}, contre {result[1]:.2f}" if result else f"{name} → aucune donnée xG")
+        return 0
+
+    options = {}
+    for flag in ("--record", "--from"):
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = argv[i + 1]
+            del argv[i:i + 2]
+
+    if "--from" in options:
+        sources = load_recorded(options["--from"])
+    else:
+        season = argv[1] if len(argv) > 1 else current_season()
+        leagues = argv[2:] or list(UNDERSTAT_LEAGUES.values())
+        sources = {}
+        for league in leagues:
+            try:
+                sources[f"{league}_{season}"] = fetch_league_matches(league, season, options.get("--record"))
+            except Exception as e:
+                print(f"[WARN] {league} {season} : {e}")
+
+    rows = []
+    for name, matches in sources.items():
+        league_rows = rows_from_understat(matches)
+        print(f"[INFO] {name} → {len(league_rows) // 2} match(s)")
+        rows.extend(league_rows)
+
+    store = XGStore.load().merge(rows)
+    store.save()
+    TEAMS.save()
+    print(f"✅ {len(store)} ligne(s) xG pour {len(store.keys)} équipe(s) dans {XG_STORE_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())